@@ -2,6 +2,7 @@
 """Load scraped data into the database."""
 
 import json
+import re
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -16,6 +17,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.database.connection import init_database, verify_database
 from src.database.repository import Repository
 
+# Grade cell placeholders meaning "no grade yet"
+EMPTY_GRADES = frozenset({"", "Not available", "[ i ]", "-"})
+
+# Plain numeric grade such as "3" or "3.5"
+NUMERIC_GRADE_RE = re.compile(r"\d+(?:\.\d*)?|\.\d+")
+
 
 def load_scraped_data():
     """Load data from full_data.json into the database."""
@@ -88,15 +95,10 @@ def load_scraped_data():
         for term in ["q1", "q2", "s1"]:
             grade = course.get(term)
             # Valid grades are: numbers (1-4, 3.5), letters (A-F), P (pass)
-            if grade and grade not in ["", "Not available", "[ i ]", "-"]:
+            if grade and grade not in EMPTY_GRADES:
                 # Check if it looks like a grade (not a number > 10 which would be absences)
-                try:
-                    if grade.replace(".", "").isdigit():
-                        num = float(grade)
-                        if num > 10:  # This is probably absences, not a grade
-                            continue
-                except ValueError:
-                    pass
+                if NUMERIC_GRADE_RE.fullmatch(grade) and float(grade) > 10:
+                    continue
 
                 repo.add_grade(
                     course_id=course_id,
@@ -7,6 +7,7 @@ import json
 import re
 import sys
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -25,6 +26,12 @@ BASE_URL = get_base_url()
 RAW_HTML_DIR = Path(__file__).parent.parent / "raw_html"
 RAW_HTML_DIR.mkdir(exist_ok=True)
 
+# Home page grades table: term -> cell index
+TERM_COLUMNS = (("q1", 14), ("q2", 15), ("s1", 16), ("q3", 17), ("q4", 18), ("s2", 19))
+
+# Grade cell placeholders meaning "no grade yet"
+EMPTY_GRADES = frozenset({"[ i ]", "Not available", "-"})
+
 
 def get_students(page: Page) -> list:
     """Get list of students from the page."""
@@ -54,6 +61,16 @@ def switch_student(page: Page, student_id: str):
     page.wait_for_timeout(2000)
 
 
+def clean_grade(cells: list, cell_idx: int) -> str:
+    """Get a grade cell's text, or empty string for missing/placeholder cells."""
+    if len(cells) > cell_idx:
+        grade = cells[cell_idx].get_text(strip=True)
+        if grade in EMPTY_GRADES:
+            return ""
+        return grade
+    return ""
+
+
 def scrape_home_grades(page: Page) -> dict:
     """Scrape grades from home page."""
     print("Scraping home page grades...")
@@ -78,7 +95,7 @@ def scrape_home_grades(page: Page) -> dict:
     tables = soup.select("table.linkDescList.grid")
     if tables:
         table = tables[0]
-        rows = table.select("tr")[2:]  # Skip header rows
+        rows = islice(table.select("tr"), 2, None)  # Skip header rows
 
         for row in rows:
             cells = row.select("td")
@@ -109,20 +126,7 @@ def scrape_home_grades(page: Page) -> dict:
                     room = ""
 
                 # Extract grades
-                def clean_grade(cell_idx):
-                    if len(cells) > cell_idx:
-                        grade = cells[cell_idx].get_text(strip=True)
-                        if grade in ["[ i ]", "Not available", "-"]:
-                            return ""
-                        return grade
-                    return ""
-
-                q1 = clean_grade(14)
-                q2 = clean_grade(15)
-                s1 = clean_grade(16)
-                q3 = clean_grade(17) if len(cells) > 17 else ""
-                q4 = clean_grade(18) if len(cells) > 18 else ""
-                s2 = clean_grade(19) if len(cells) > 19 else ""
+                grades = {term: clean_grade(cells, idx) for term, idx in TERM_COLUMNS}
 
                 # Get absences/tardies (last two columns)
                 absences = cells[-2].get_text(strip=True) if len(cells) >= 2 else "0"
@@ -142,12 +146,7 @@ def scrape_home_grades(page: Page) -> dict:
                     "teacher_name": teacher_name,
                     "teacher_email": teacher_email,
                     "room": room,
-                    "q1": q1,
-                    "q2": q2,
-                    "s1": s1,
-                    "q3": q3,
-                    "q4": q4,
-                    "s2": s2,
+                    **grades,
                     "absences": absences,
                     "tardies": tardies,
                 }
@@ -176,12 +175,13 @@ def scrape_course_assignments(page: Page, course_link: str, course_name: str) ->
     table = soup.select_one("table.linkDescList")
     if table:
         rows = table.select("tr")
-        headers = []
+        keys = []
 
         for row in rows:
             header_cells = row.select("th")
             if header_cells:
-                headers = [h.get_text(strip=True).lower() for h in header_cells]
+                # Map header texts to assignment keys once per header row
+                keys = [h.get_text(strip=True).lower().replace(" ", "_") for h in header_cells]
                 continue
 
             cells = row.select("td")
@@ -189,20 +189,15 @@ def scrape_course_assignments(page: Page, course_link: str, course_name: str) ->
                 assignment = {
                     "course": course_name,
                 }
-
-                for i, cell in enumerate(cells):
-                    text = cell.get_text(strip=True)
-                    if i < len(headers):
-                        key = headers[i].replace(" ", "_")
-                        assignment[key] = text
+                assignment.update(zip(keys, (cell.get_text(strip=True) for cell in cells)))
 
                 # Determine status from flags/codes
-                row_html = str(row)
-                if "missing" in row_html.lower() or "M" in assignment.get("flags", ""):
+                row_html = str(row).lower()
+                if "missing" in row_html or "M" in assignment.get("flags", ""):
                     assignment["status"] = "Missing"
-                elif "late" in row_html.lower() or "L" in assignment.get("flags", ""):
+                elif "late" in row_html or "L" in assignment.get("flags", ""):
                     assignment["status"] = "Late"
-                elif "collected" in row_html.lower():
+                elif "collected" in row_html:
                     assignment["status"] = "Collected"
                 else:
                     assignment["status"] = "Submitted"
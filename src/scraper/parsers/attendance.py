@@ -17,11 +17,72 @@ Status codes:
     P = Present (alternative)
 """
 
+import os
 import re
-from datetime import datetime
-from typing import Dict, List, Optional
-
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from enum import IntEnum
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional
+
+from bs4 import NavigableString, SoupStrainer, Tag
+
+from .soup import make_soup
+
+_ATTENDANCE_RE = re.compile(r"attendance", re.I)
+_DATA_DATE_RE = re.compile(r"data-date\s*=", re.I)
+_DATE_STRAINER = SoupStrainer(attrs={"data-date": True})
+
+# CSS class keywords checked in priority order
+_CLASS_KEYWORDS = (
+    ("present", "Present"),
+    ("absent", "Absent"),
+    ("tardy", "Tardy"),
+    ("excused", "Excused"),
+)
+
+
+class _Status(IntEnum):
+    """Internal status codes used while tallying attendance patterns."""
+
+    PRESENT = 0
+    ABSENT = 1
+    TARDY = 2
+    EXCUSED = 3
+    UNKNOWN = 4
+
+
+_STATUS_CODES = {
+    "Present": _Status.PRESENT,
+    "Absent": _Status.ABSENT,
+    "Tardy": _Status.TARDY,
+    "Excused": _Status.EXCUSED,
+}
+
+# Per-weekday counter incremented for each status
+_DAY_COUNT_KEYS = {
+    _Status.PRESENT: "present_count",
+    _Status.ABSENT: "absence_count",
+    _Status.TARDY: "tardy_count",
+}
+
+# Day names in date.weekday() order
+_WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Attendance codes (upper-cased) to normalized status
+_CODE_MAP = {
+    ".": "Present",
+    "P": "Present",
+    "PRESENT": "Present",
+    "A": "Absent",
+    "ABSENT": "Absent",
+    "T": "Tardy",
+    "TARDY": "Tardy",
+    "E": "Excused",
+    "EX": "Excused",
+    "EXCUSED": "Excused",
+}
 
 
 def parse_daily_attendance(html: str) -> List[Dict[str, str]]:
@@ -39,35 +100,84 @@ def parse_daily_attendance(html: str) -> List[Dict[str, str]]:
     if not html or not html.strip():
         return []
 
+    # Every strategy reads dates from data-date attributes, so pages without
+    # one (most scraped pages) can be rejected without building a soup
+    if not _DATA_DATE_RE.search(html):
+        return []
+
+    # Strategy 1: Look for attendance grid table with data-date attributes.
+    # This is the common case and only needs the data-date elements, so
+    # parse just those subtrees first.
     try:
-        soup = BeautifulSoup(html, "html.parser")
+        strained = make_soup(html, parse_only=_DATE_STRAINER)
     except Exception:
         return []
 
-    records = []
-
-    # Strategy 1: Look for attendance grid table with data-date attributes
-    records = _parse_attendance_grid_table(soup)
+    records = _parse_attendance_grid_table(strained.find_all(attrs={"data-date": True}))
     if records:
         return records
 
+    # The fallbacks need attendance-day divs or an attendance table
+    if not _ATTENDANCE_RE.search(html):
+        return []
+
+    try:
+        soup = make_soup(html)
+    except Exception:
+        return []
+
+    # Walk the full tree once, collecting candidates for the fallbacks
+    day_divs = []
+    class_table = None
+    id_table = None
+
+    for el in soup.find_all(["div", "table"]):
+        if el.name == "div":
+            if "attendance-day" in el.get("class", []):
+                day_divs.append(el)
+        elif class_table is None and _ATTENDANCE_RE.search(" ".join(el.get("class", []))):
+            class_table = el
+        elif id_table is None and _ATTENDANCE_RE.search(el.get("id", "")):
+            id_table = el
+
     # Strategy 2: Look for attendance-day divs (alternative format)
-    records = _parse_attendance_day_divs(soup)
+    records = _parse_attendance_day_divs(day_divs)
     if records:
         return records
 
     # Strategy 3: Look for any table with attendance-like structure
-    records = _parse_generic_attendance_table(soup)
+    return _parse_generic_attendance_table(class_table or id_table)
 
-    return records
 
+def parse_many(htmls: List[str], workers: Optional[int] = None) -> List[List[Dict[str, str]]]:
+    """Parse many attendance pages in parallel using a process pool.
+
+    Parsing is CPU-bound and holds no shared state, so scraper pipelines
+    that collect several attendance pages should call this rather than
+    looping over parse_daily_attendance().
+
+    Args:
+        htmls: Raw HTML strings, one per attendance page
+        workers: Number of worker processes (defaults to CPU count)
+
+    Returns:
+        List of record lists, in the same order as the input pages
+    """
+    if not htmls:
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(htmls) == 1:
+        return [parse_daily_attendance(html) for html in htmls]
+
+    chunksize = max(1, len(htmls) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse_daily_attendance, htmls, chunksize=chunksize))
 
-def _parse_attendance_grid_table(soup: BeautifulSoup) -> List[Dict[str, str]]:
-    """Parse attendance from grid table with data-date attributes."""
-    records = []
 
-    # Find cells with data-date attribute
-    cells = soup.find_all(attrs={"data-date": True})
+def _parse_attendance_grid_table(cells: List[Tag]) -> List[Dict[str, str]]:
+    """Parse attendance from grid cells with data-date attributes."""
+    records = []
 
     for cell in cells:
         date_str = cell.get("data-date", "")
@@ -81,9 +191,9 @@ def _parse_attendance_grid_table(soup: BeautifulSoup) -> List[Dict[str, str]]:
         # Get the code from the cell content
         code_elem = cell.find("span", class_="code")
         if code_elem:
-            code = code_elem.get_text(strip=True)
+            code = _fast_text(code_elem)
         else:
-            code = cell.get_text(strip=True)
+            code = _fast_text(cell)
 
         # Get class names for status detection
         cell_class = " ".join(cell.get("class", []))
@@ -95,13 +205,10 @@ def _parse_attendance_grid_table(soup: BeautifulSoup) -> List[Dict[str, str]]:
     return records
 
 
-def _parse_attendance_day_divs(soup: BeautifulSoup) -> List[Dict[str, str]]:
-    """Parse attendance from day-based div structure."""
+def _parse_attendance_day_divs(day_divs: List[Tag]) -> List[Dict[str, str]]:
+    """Parse attendance from attendance-day divs."""
     records = []
 
-    # Find attendance-day divs
-    day_divs = soup.find_all("div", class_="attendance-day")
-
     for day_div in day_divs:
         date_str = day_div.get("data-date", "")
         if not date_str:
@@ -115,29 +222,24 @@ def _parse_attendance_day_divs(soup: BeautifulSoup) -> List[Dict[str, str]]:
         status_elem = day_div.find("span", class_="status")
         if status_elem:
             status_class = " ".join(status_elem.get("class", []))
-            status_text = status_elem.get_text(strip=True)
+            status_text = _fast_text(status_elem)
             status = normalize_attendance_status(status_text, status_class)
         else:
             status = "Unknown"
 
         # Find code element
         code_elem = day_div.find("span", class_="code")
-        code = code_elem.get_text(strip=True) if code_elem else ""
+        code = _fast_text(code_elem) if code_elem else ""
 
         records.append({"date": parsed_date, "status": status, "code": code})
 
     return records
 
 
-def _parse_generic_attendance_table(soup: BeautifulSoup) -> List[Dict[str, str]]:
+def _parse_generic_attendance_table(table: Optional[Tag]) -> List[Dict[str, str]]:
     """Parse attendance from generic table structure."""
     records = []
 
-    # Look for attendance grid table
-    table = soup.find("table", class_=re.compile(r"attendance", re.I))
-    if not table:
-        table = soup.find("table", id=re.compile(r"attendance", re.I))
-
     if not table:
         return records
 
@@ -146,10 +248,10 @@ def _parse_generic_attendance_table(soup: BeautifulSoup) -> List[Dict[str, str]]
     if not tbody:
         return records
 
-    rows = tbody.find_all("tr")
+    rows = tbody.find_all("tr", recursive=False)
 
     for row in rows:
-        cells = row.find_all("td")
+        cells = row.find_all("td", recursive=False)
         # Skip header-like rows
         if not cells or len(cells) < 2:
             continue
@@ -165,7 +267,7 @@ def _parse_generic_attendance_table(soup: BeautifulSoup) -> List[Dict[str, str]]
                 continue
 
             code_elem = cell.find("span", class_="code")
-            code = code_elem.get_text(strip=True) if code_elem else cell.get_text(strip=True)
+            code = _fast_text(code_elem) if code_elem else _fast_text(cell)
             cell_class = " ".join(cell.get("class", []))
 
             status = normalize_attendance_status(code, cell_class)
@@ -174,9 +276,21 @@ def _parse_generic_attendance_table(soup: BeautifulSoup) -> List[Dict[str, str]]
     return records
 
 
+def _fast_text(element: Tag) -> str:
+    """Get stripped text, skipping the recursive walk for single-string leaves."""
+    string = element.string
+    if type(string) is NavigableString:
+        return string.strip()
+    return element.get_text(strip=True)
+
+
+@lru_cache(maxsize=128)
 def normalize_attendance_status(code: str, css_class: str = "") -> str:
     """Normalize attendance status from code and CSS class.
 
+    A page only uses a handful of code/class combinations, so results are
+    cached.
+
     Args:
         code: Attendance code (., A, T, E, P, etc.)
         css_class: CSS class string from the element
@@ -184,31 +298,17 @@ def normalize_attendance_status(code: str, css_class: str = "") -> str:
     Returns:
         Normalized status string: Present, Absent, Tardy, Excused, or Unknown
     """
-    code = (code or "").strip().upper()
-    css_class = (css_class or "").lower()
-
     # Check CSS class first (more reliable)
-    if "present" in css_class:
-        return "Present"
-    if "absent" in css_class:
-        return "Absent"
-    if "tardy" in css_class:
-        return "Tardy"
-    if "excused" in css_class:
-        return "Excused"
-
-    # Check code
-    if code in (".", "P", "PRESENT"):
-        return "Present"
-    if code in ("A", "ABSENT"):
-        return "Absent"
-    if code in ("T", "TARDY"):
-        return "Tardy"
-    if code in ("E", "EX", "EXCUSED"):
-        return "Excused"
-
-    # Default to Unknown
-    return "Unknown"
+    if css_class:
+        css_class = css_class.lower()
+        for keyword, status in _CLASS_KEYWORDS:
+            if keyword in css_class:
+                return status
+
+    # Check code, defaulting to Unknown
+    if not code:
+        return "Unknown"
+    return _CODE_MAP.get(code.strip().upper(), "Unknown")
 
 
 def parse_attendance_date(date_str: Optional[str]) -> Optional[str]:
@@ -225,12 +325,25 @@ def parse_attendance_date(date_str: Optional[str]) -> Optional[str]:
 
     date_str = date_str.strip()
 
-    # Common date formats to try
+    # Numeric formats are split by hand; strptime is only needed for month names
+    if "-" in date_str:
+        # ISO: 2024-12-15
+        parsed = _iso_to_date(date_str)
+        return parsed.isoformat() if parsed else None
+
+    if "/" in date_str:
+        # US: 12/15/2024, US short: 12/15/24, EU: 15/12/2024
+        parts = date_str.split("/")
+        if len(parts) != 3 or not _is_date_parts(parts[2], parts[0], parts[1], (2, 4)):
+            return None
+        first, second, year = int(parts[0]), int(parts[1]), int(parts[2])
+        if len(parts[2]) == 2:
+            # Same pivot as strptime's %y
+            year += 2000 if year < 69 else 1900
+            return _format_iso_date(year, first, second)
+        return _format_iso_date(year, first, second) or _format_iso_date(year, second, first)
+
     formats = [
-        "%Y-%m-%d",  # ISO: 2024-12-15
-        "%m/%d/%Y",  # US: 12/15/2024
-        "%m/%d/%y",  # US short: 12/15/24
-        "%d/%m/%Y",  # EU: 15/12/2024
         "%B %d, %Y",  # Full: December 15, 2024
         "%b %d, %Y",  # Short: Dec 15, 2024
     ]
@@ -245,6 +358,38 @@ def parse_attendance_date(date_str: Optional[str]) -> Optional[str]:
     return None
 
 
+def _is_date_parts(year: str, month: str, day: str, year_lengths: tuple) -> bool:
+    """Check that date parts are all digits with plausible lengths."""
+    return (
+        len(year) in year_lengths
+        and 1 <= len(month) <= 2
+        and 1 <= len(day) <= 2
+        and year.isdigit()
+        and month.isdigit()
+        and day.isdigit()
+    )
+
+
+def _iso_to_date(date_str: str) -> Optional[date]:
+    """Parse a YYYY-MM-DD string (month/day may be unpadded) into a date."""
+    parts = date_str.split("-")
+    if len(parts) != 3 or not _is_date_parts(parts[0], parts[1], parts[2], (4,)):
+        return None
+    try:
+        return date(int(parts[0]), int(parts[1]), int(parts[2]))
+    except ValueError:
+        return None
+
+
+def _format_iso_date(year: int, month: int, day: int) -> Optional[str]:
+    """Format date components as YYYY-MM-DD, or None if not a real date."""
+    try:
+        date(year, month, day)
+    except ValueError:
+        return None
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
 def detect_attendance_patterns(records: List[Dict[str, str]]) -> Dict:
     """Detect attendance patterns from daily records.
 
@@ -267,48 +412,13 @@ def detect_attendance_patterns(records: List[Dict[str, str]]) -> Dict:
     """
     result = {
         "by_day_of_week": {
-            "Monday": {
-                "absence_count": 0,
-                "tardy_count": 0,
-                "present_count": 0,
-                "total_records": 0,
-            },
-            "Tuesday": {
-                "absence_count": 0,
-                "tardy_count": 0,
-                "present_count": 0,
-                "total_records": 0,
-            },
-            "Wednesday": {
-                "absence_count": 0,
-                "tardy_count": 0,
-                "present_count": 0,
-                "total_records": 0,
-            },
-            "Thursday": {
+            day_name: {
                 "absence_count": 0,
                 "tardy_count": 0,
                 "present_count": 0,
                 "total_records": 0,
-            },
-            "Friday": {
-                "absence_count": 0,
-                "tardy_count": 0,
-                "present_count": 0,
-                "total_records": 0,
-            },
-            "Saturday": {
-                "absence_count": 0,
-                "tardy_count": 0,
-                "present_count": 0,
-                "total_records": 0,
-            },
-            "Sunday": {
-                "absence_count": 0,
-                "tardy_count": 0,
-                "present_count": 0,
-                "total_records": 0,
-            },
+            }
+            for day_name in _WEEKDAYS
         },
         "longest_absence_streak": 0,
         "total_present": 0,
@@ -321,57 +431,55 @@ def detect_attendance_patterns(records: List[Dict[str, str]]) -> Dict:
     if not records:
         return result
 
-    # Sort records by date for streak detection
-    sorted_records = sorted(records, key=lambda r: r.get("date", ""))
-
+    # Pull the hot fields out of each record once, then sort by date for
+    # streak detection. Scraped records are usually already in date order,
+    # so only sort (in place) when they are not.
+    entries = [(record.get("date", ""), record.get("status", "Unknown")) for record in records]
+    dates = [entry[0] for entry in entries]
+    if any(earlier > later for earlier, later in zip(dates, dates[1:])):
+        entries.sort(key=itemgetter(0))
+
+    # Day counters indexed by date.weekday()
+    day_counts_by_weekday = [result["by_day_of_week"][day_name] for day_name in _WEEKDAYS]
+    status_counts = [0] * len(_Status)
     current_streak = 0
     max_streak = 0
 
-    for record in sorted_records:
-        status = record.get("status", "Unknown")
-        date_str = record.get("date", "")
+    for date_str, status_name in entries:
+        status = _STATUS_CODES.get(status_name, _Status.UNKNOWN)
 
         # Count by status
-        if status == "Present":
-            result["total_present"] += 1
-            current_streak = 0
-        elif status == "Absent":
-            result["total_absent"] += 1
+        status_counts[status] += 1
+        if status == _Status.ABSENT:
             current_streak += 1
             max_streak = max(max_streak, current_streak)
-        elif status == "Tardy":
-            result["total_tardy"] += 1
-            current_streak = 0
-        elif status == "Excused":
-            result["total_excused"] += 1
-            current_streak = 0
         else:
             current_streak = 0
 
         # Count by day of week
-        if date_str:
-            try:
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                day_name = date_obj.strftime("%A")
-
-                if day_name in result["by_day_of_week"]:
-                    result["by_day_of_week"][day_name]["total_records"] += 1
-                    if status == "Absent":
-                        result["by_day_of_week"][day_name]["absence_count"] += 1
-                    elif status == "Tardy":
-                        result["by_day_of_week"][day_name]["tardy_count"] += 1
-                    elif status == "Present":
-                        result["by_day_of_week"][day_name]["present_count"] += 1
-            except ValueError:
-                pass
-
+        parsed = _iso_to_date(date_str) if date_str else None
+        if parsed is not None:
+            day_counts = day_counts_by_weekday[parsed.weekday()]
+            day_counts["total_records"] += 1
+            count_key = _DAY_COUNT_KEYS.get(status)
+            if count_key:
+                day_counts[count_key] += 1
+
+    total_present = status_counts[_Status.PRESENT]
+    total_absent = status_counts[_Status.ABSENT]
+    total_tardy = status_counts[_Status.TARDY]
+
+    result["total_present"] = total_present
+    result["total_absent"] = total_absent
+    result["total_tardy"] = total_tardy
+    result["total_excused"] = status_counts[_Status.EXCUSED]
     result["longest_absence_streak"] = max_streak
 
     # Calculate attendance rate (Present / (Present + Absent + Tardy))
-    total = result["total_present"] + result["total_absent"] + result["total_tardy"]
+    total = total_present + total_absent + total_tardy
     if total > 0:
         # Consider both present and tardy as "attended"
-        attended = result["total_present"] + result["total_tardy"]
+        attended = total_present + total_tardy
         result["attendance_rate"] = round(100.0 * attended / total, 1)
 
     return result
@@ -386,21 +494,24 @@ def format_patterns_for_display(patterns: Dict) -> str:
     Returns:
         Formatted string for display
     """
-    lines = []
+    return "\n".join(_iter_pattern_lines(patterns))
+
 
+def _iter_pattern_lines(patterns: Dict) -> Iterator[str]:
+    """Yield the display lines for format_patterns_for_display()."""
     # Overall stats
-    lines.append("## Attendance Statistics")
-    lines.append(f"- Days Present: {patterns['total_present']}")
-    lines.append(f"- Days Absent: {patterns['total_absent']}")
-    lines.append(f"- Days Tardy: {patterns['total_tardy']}")
-    lines.append(f"- Days Excused: {patterns['total_excused']}")
-    lines.append(f"- Attendance Rate: {patterns['attendance_rate']}%")
-    lines.append("")
+    yield "## Attendance Statistics"
+    yield f"- Days Present: {patterns['total_present']}"
+    yield f"- Days Absent: {patterns['total_absent']}"
+    yield f"- Days Tardy: {patterns['total_tardy']}"
+    yield f"- Days Excused: {patterns['total_excused']}"
+    yield f"- Attendance Rate: {patterns['attendance_rate']}%"
+    yield ""
 
     # Absence streaks
     if patterns["longest_absence_streak"] > 1:
-        lines.append(f"**Longest Absence Streak**: {patterns['longest_absence_streak']} days")
-        lines.append("")
+        yield f"**Longest Absence Streak**: {patterns['longest_absence_streak']} days"
+        yield ""
 
     # Day of week patterns
     problem_days = []
@@ -413,11 +524,7 @@ def format_patterns_for_display(patterns: Dict) -> str:
                 )
 
     if problem_days:
-        lines.append("## Concerning Patterns")
-        for day, absences, total, rate in sorted(problem_days, key=lambda x: -x[3]):
-            lines.append(
-                f"- Frequently absent on **{day}**: {absences}/{total} ({rate * 100:.0f}%)"
-            )
-        lines.append("")
-
-    return "\n".join(lines)
+        yield "## Concerning Patterns"
+        for day, absences, total, rate in sorted(problem_days, key=itemgetter(3), reverse=True):
+            yield f"- Frequently absent on **{day}**: {absences}/{total} ({rate * 100:.0f}%)"
+        yield ""
@@ -8,10 +8,46 @@ This module parses the scores.html page which contains:
 Example page URL: /guardian/scores.html?frn=...
 """
 
+import re
 from typing import Any, Optional
 
 from bs4 import BeautifulSoup
 
+from .soup import make_soup
+
+_NUMBER_RE = re.compile(r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)")
+_STANDARD_RE = re.compile(r"[^,\s](?:[^,]*[^,\s])?")
+
+# Placeholder cell values PowerSchool uses for "no value"
+_EMPTY_VALUES = frozenset({"", "--", "N/A"})
+
+# Classes read from category weight rows and assignment rows
+_CATEGORY_CLASSES = frozenset({"category-name", "weight", "points-earned", "points-possible"})
+_ASSIGNMENT_CLASSES = frozenset(
+    {"assignment-name", "due-date", "category", "score", "percent", "letter-grade", "codes"}
+)
+
+# Header texts identifying fallback weight and assignment tables
+_WEIGHT_HEADERS = frozenset({"weight"})
+_ASSIGNMENT_HEADERS = frozenset({"assignment", "score"})
+
+
+def _to_float(value: str) -> Optional[float]:
+    """Convert a plain decimal string to float without raising.
+
+    Screening with a regex first avoids building a ValueError for the
+    many placeholder cells ("--", "N/A", letter codes) on score pages.
+
+    Args:
+        value: Stripped string such as "17", "8.5" or "--"
+
+    Returns:
+        Float value, or None if the string is not a plain decimal number
+    """
+    if _NUMBER_RE.fullmatch(value):
+        return float(value)
+    return None
+
 
 def parse_weight(weight_str: Optional[str]) -> Optional[float]:
     """Parse a weight string (e.g., "30%") into a float.
@@ -26,16 +62,11 @@ def parse_weight(weight_str: Optional[str]) -> Optional[float]:
         return None
 
     weight_str = weight_str.strip()
-    if not weight_str or weight_str in ("--", "N/A", ""):
+    if weight_str in _EMPTY_VALUES:
         return None
 
     # Remove % sign and parse
-    weight_str = weight_str.replace("%", "").strip()
-
-    try:
-        return float(weight_str)
-    except ValueError:
-        return None
+    return _to_float(weight_str.replace("%", "").strip())
 
 
 def parse_score(score_str: Optional[str]) -> tuple[Optional[float], Optional[float]]:
@@ -57,31 +88,14 @@ def parse_score(score_str: Optional[str]) -> tuple[Optional[float], Optional[flo
     # Handle fraction format: "17/20", "/10", etc.
     if "/" in score_str:
         parts = score_str.split("/")
-        earned = None
-        possible = None
-
-        if len(parts) >= 2:
-            # Get earned points (before /)
-            if parts[0].strip():
-                try:
-                    earned = float(parts[0].strip())
-                except ValueError:
-                    pass
-
-            # Get possible points (after /)
-            if parts[1].strip():
-                try:
-                    possible = float(parts[1].strip())
-                except ValueError:
-                    pass
 
+        # Earned points before the /, possible points after it
+        earned = _to_float(parts[0].strip())
+        possible = _to_float(parts[1].strip())
         return earned, possible
 
     # Try to parse as single number
-    try:
-        return float(score_str), None
-    except ValueError:
-        return None, None
+    return _to_float(score_str), None
 
 
 def parse_percent(percent_str: Optional[str]) -> Optional[float]:
@@ -97,16 +111,11 @@ def parse_percent(percent_str: Optional[str]) -> Optional[float]:
         return None
 
     percent_str = percent_str.strip()
-    if not percent_str or percent_str in ("--", "N/A", ""):
+    if percent_str in _EMPTY_VALUES:
         return None
 
     # Remove % sign and parse
-    percent_str = percent_str.replace("%", "").strip()
-
-    try:
-        return float(percent_str)
-    except ValueError:
-        return None
+    return _to_float(percent_str.replace("%", "").strip())
 
 
 def parse_standards(standards_str: Optional[str]) -> list[str]:
@@ -121,13 +130,8 @@ def parse_standards(standards_str: Optional[str]) -> list[str]:
     if not standards_str:
         return []
 
-    standards_str = standards_str.strip()
-    if not standards_str:
-        return []
-
-    # Split by comma and clean up
-    standards = [s.strip() for s in standards_str.split(",")]
-    return [s for s in standards if s]  # Filter empty strings
+    # Each match is one comma-separated entry without surrounding whitespace
+    return _STANDARD_RE.findall(standards_str)
 
 
 def _extract_text(element: Any, default: str = "") -> str:
@@ -145,22 +149,59 @@ def _extract_text(element: Any, default: str = "") -> str:
     return element.get_text(strip=True)
 
 
-def _find_by_class(row: Any, class_name: str) -> Optional[str]:
-    """Find element by class and extract text.
+def _scan_row(row: Any, classes: frozenset[str]) -> tuple[list[Any], dict[str, Any]]:
+    """Collect a row's td cells and class index in a single walk.
 
     Args:
         row: BeautifulSoup row element
+        classes: Class names to index; all others are ignored
+
+    Returns:
+        Tuple of (the row's own td cells, dictionary of class name to the
+        first descendant carrying it)
+    """
+    cells = []
+    by_class: dict[str, Any] = {}
+    for element in row.find_all(True):
+        if element.name == "td" and element.parent is row:
+            cells.append(element)
+        for class_name in element.get("class", ()):
+            if class_name in classes:
+                by_class.setdefault(class_name, element)
+    return cells, by_class
+
+
+def _find_by_class(by_class: dict[str, Any], class_name: str) -> Optional[str]:
+    """Find element by class and extract text.
+
+    Args:
+        by_class: Class index built by _scan_row
         class_name: CSS class to find
 
     Returns:
         Text content or None
     """
-    element = row.find(class_=class_name)
+    element = by_class.get(class_name)
     if element:
         return element.get_text(strip=True)
     return None
 
 
+def _has_header(table: Any, names: frozenset[str]) -> bool:
+    """Check whether any header cell of a table matches one of the names.
+
+    Stops at the first matching header instead of collecting all of them.
+
+    Args:
+        table: BeautifulSoup table element
+        names: Lower-cased header texts to look for
+
+    Returns:
+        True if a matching header cell exists
+    """
+    return any(th.get_text(strip=True).lower() in names for th in table.find_all("th"))
+
+
 def parse_course_scores(html: str) -> dict[str, Any]:
     """Parse a PowerSchool course scores page.
 
@@ -182,7 +223,7 @@ def parse_course_scores(html: str) -> dict[str, Any]:
     if not html:
         return {"course_name": "", "teacher_name": "", "categories": [], "assignments": []}
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html)
 
     # Extract course name from h2 in box-round
     course_name = ""
@@ -202,6 +243,10 @@ def parse_course_scores(html: str) -> dict[str, Any]:
     # Parse assignments
     assignments = _parse_assignments(soup)
 
+    # Everything above is plain strings, so tear the tree down now instead of
+    # leaving it for the garbage collector
+    soup.decompose()
+
     return {
         "course_name": course_name,
         "teacher_name": teacher_name,
@@ -225,11 +270,8 @@ def _parse_categories(soup: BeautifulSoup) -> list[dict[str, Any]]:
     weights_section = soup.find(class_="category-weights")
     if not weights_section:
         # Try alternative: look for a table with weight column
-        weight_tables = soup.find_all("table")
-        for table in weight_tables:
-            headers = table.find_all("th")
-            header_texts = [h.get_text(strip=True).lower() for h in headers]
-            if "weight" in header_texts:
+        for table in soup.find_all("table"):
+            if _has_header(table, _WEIGHT_HEADERS):
                 weights_section = table
                 break
 
@@ -239,42 +281,32 @@ def _parse_categories(soup: BeautifulSoup) -> list[dict[str, Any]]:
     # Parse rows in the weights table
     rows = weights_section.find_all("tr")
     for row in rows:
-        cells = row.find_all("td")
+        cells, by_class = _scan_row(row, _CATEGORY_CLASSES)
         if not cells:
             continue
 
         # Try to extract category info
         # Look for class-based extraction first
-        cat_name = _find_by_class(row, "category-name")
-        weight_str = _find_by_class(row, "weight")
-        points_earned_str = _find_by_class(row, "points-earned")
-        points_possible_str = _find_by_class(row, "points-possible")
+        cat_name = _find_by_class(by_class, "category-name")
+        weight_str = _find_by_class(by_class, "weight")
+        points_earned_str = _find_by_class(by_class, "points-earned")
+        points_possible_str = _find_by_class(by_class, "points-possible")
 
         # Fallback to positional extraction
         if not cat_name and len(cells) >= 2:
-            cat_name = cells[0].get_text(strip=True)
-            weight_str = cells[1].get_text(strip=True)
-            if len(cells) >= 3:
-                points_earned_str = cells[2].get_text(strip=True)
-            if len(cells) >= 4:
-                points_possible_str = cells[3].get_text(strip=True)
+            texts = [cell.get_text(strip=True) for cell in cells[:4]]
+            cat_name, weight_str = texts[0], texts[1]
+            if len(texts) >= 3:
+                points_earned_str = texts[2]
+            if len(texts) >= 4:
+                points_possible_str = texts[3]
 
         if cat_name:
             weight = parse_weight(weight_str) if weight_str else None
 
             # Parse points
-            points_earned = None
-            points_possible = None
-            if points_earned_str:
-                try:
-                    points_earned = float(points_earned_str)
-                except ValueError:
-                    pass
-            if points_possible_str:
-                try:
-                    points_possible = float(points_possible_str)
-                except ValueError:
-                    pass
+            points_earned = _to_float(points_earned_str) if points_earned_str else None
+            points_possible = _to_float(points_possible_str) if points_possible_str else None
 
             categories.append(
                 {
@@ -309,11 +341,8 @@ def _parse_assignments(soup: BeautifulSoup) -> list[dict[str, Any]]:
 
     if not score_table:
         # Last resort: look for table with assignment headers
-        tables = soup.find_all("table")
-        for table in tables:
-            headers = table.find_all("th")
-            header_texts = [h.get_text(strip=True).lower() for h in headers]
-            if "assignment" in header_texts or "score" in header_texts:
+        for table in soup.find_all("table"):
+            if _has_header(table, _ASSIGNMENT_HEADERS):
                 score_table = table
                 break
 
@@ -323,9 +352,9 @@ def _parse_assignments(soup: BeautifulSoup) -> list[dict[str, Any]]:
     # Parse assignment rows
     rows = score_table.find_all("tr", class_="assignment-row")
     if not rows:
-        # Fallback: get all tr except header
+        # Fallback: get all tr; header rows have no td and are skipped by
+        # _parse_assignment_row
         rows = score_table.find_all("tr")
-        rows = [r for r in rows if r.find("td")]  # Skip header rows
 
     for row in rows:
         assignment = _parse_assignment_row(row)
@@ -344,18 +373,18 @@ def _parse_assignment_row(row: Any) -> Optional[dict[str, Any]]:
     Returns:
         Assignment dictionary or None if not a valid assignment row
     """
-    cells = row.find_all("td")
+    cells, by_class = _scan_row(row, _ASSIGNMENT_CLASSES)
     if not cells:
         return None
 
     # Try class-based extraction
-    name_cell = row.find(class_="assignment-name")
-    due_date = _find_by_class(row, "due-date")
-    category = _find_by_class(row, "category")
-    score_str = _find_by_class(row, "score")
-    percent_str = _find_by_class(row, "percent")
-    letter_grade = _find_by_class(row, "letter-grade")
-    codes = _find_by_class(row, "codes")
+    name_cell = by_class.get("assignment-name")
+    due_date = _find_by_class(by_class, "due-date")
+    category = _find_by_class(by_class, "category")
+    score_str = _find_by_class(by_class, "score")
+    percent_str = _find_by_class(by_class, "percent")
+    letter_grade = _find_by_class(by_class, "letter-grade")
+    codes = _find_by_class(by_class, "codes")
 
     # Extract assignment name
     name = ""
@@ -0,0 +1,36 @@
+"""Shared BeautifulSoup construction for the PowerSchool parsers.
+
+The C-based lxml tree builder is much faster than the pure-Python
+html.parser, so it is used whenever it is installed. Environments without
+lxml fall back to html.parser.
+"""
+
+from typing import Optional, Type
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import TreeBuilder, builder_registry
+
+
+def _select_builder() -> Type[TreeBuilder]:
+    """Pick the fastest available BeautifulSoup tree builder class."""
+    return builder_registry.lookup("lxml") or builder_registry.lookup("html.parser")
+
+
+# Resolved once so each parse skips the feature registry lookup. The class
+# (not an instance) is passed on, because builder instances hold per-parse
+# state and must not be shared between concurrent parses.
+_BUILDER = _select_builder()
+HTML_PARSER = _BUILDER.NAME
+
+
+def make_soup(html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parse HTML with the preferred parser.
+
+    Args:
+        html: Raw HTML string
+        parse_only: Optional strainer restricting which elements are built
+
+    Returns:
+        Parsed BeautifulSoup document
+    """
+    return BeautifulSoup(html, builder=_BUILDER, parse_only=parse_only)
@@ -12,9 +12,16 @@ The HTML structure consists of a table with columns:
 """
 
 import re
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+
+# The page is a flat table with no structural ambiguity, so it is parsed
+# with selectolax's C lexbor backend rather than BeautifulSoup.
+_COMMENTS_TABLE_SELECTOR = "table.grid, table.linkDescList"
+_MAILTO_SELECTOR = 'a[href^="mailto:"]'
+
+_HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
 
 
 def parse_teacher_comments(
@@ -47,30 +54,64 @@ def parse_teacher_comments(
     if not html or not html.strip():
         return []
 
-    soup = BeautifulSoup(html, "html.parser")
+    return _comments_from_tree(LexborHTMLParser(html), comments_only)
 
-    # Find the teacher comments table
-    table = soup.find("table", class_="grid")
-    if not table:
-        # Try alternative selectors
-        table = soup.find("table", class_="linkDescList")
+
+def parse_teacher_comments_page(html: str, comments_only: bool = False) -> Dict[str, Any]:
+    """Parse both the student name and the comments from one page.
+
+    Use this instead of calling parse_teacher_comments() and
+    get_student_name_from_html() on the same HTML, which parses it twice.
+
+    Args:
+        html: Raw HTML from the teacher comments page.
+        comments_only: Passed through to the comment extraction, see
+                      parse_teacher_comments().
+
+    Returns:
+        Dictionary with:
+            - student_name: Student name if found, None otherwise
+            - comments: List of comment dictionaries
+    """
+    if not html or not html.strip():
+        return {"student_name": None, "comments": []}
+
+    tree = LexborHTMLParser(html)
+    return {
+        "student_name": _student_name_from_tree(tree),
+        "comments": _comments_from_tree(tree, comments_only),
+    }
+
+
+def _comments_from_tree(
+    tree: LexborHTMLParser, comments_only: bool
+) -> List[Dict[str, Optional[str]]]:
+    """Extract comment entries from a parsed teacher comments page.
+
+    Args:
+        tree: Parsed teacher comments page.
+        comments_only: If True, skip entries with empty comments.
+
+    Returns:
+        List of comment dictionaries (see parse_teacher_comments).
+    """
+    # Find the teacher comments table (first grid or linkDescList table)
+    table = tree.css_first(_COMMENTS_TABLE_SELECTOR)
     if not table:
         return []
 
     results: List[Dict[str, Optional[str]]] = []
 
     # Find all data rows (skip header row)
-    rows = table.find_all("tr")
+    rows = table.css("tr")
     for row in rows:
-        cells = row.find_all("td")
+        cells = [child for child in row.iter() if child.tag == "td"]
         if len(cells) < 5:
             # Not a data row (header or incomplete)
             continue
 
         # Extract data from each cell
-        expression = _extract_text(cells[0])
-        course_number = _extract_text(cells[1])
-        course_name = _extract_text(cells[2])
+        expression, course_number, course_name = [_extract_text(cell) for cell in cells[:3]]
 
         # Teacher cell contains email link
         teacher_name, teacher_email = _extract_teacher_info(cells[3])
@@ -98,11 +139,11 @@ def parse_teacher_comments(
     return results
 
 
-def _extract_text(cell) -> str:
+def _extract_text(cell: Optional[LexborNode]) -> str:
     """Extract and clean text content from a table cell.
 
     Args:
-        cell: BeautifulSoup Tag object for a table cell.
+        cell: Node for a table cell.
 
     Returns:
         Cleaned text content, stripped of whitespace.
@@ -110,16 +151,17 @@ def _extract_text(cell) -> str:
     if cell is None:
         return ""
 
-    # Get text content, handling nested elements
-    text = cell.get_text(strip=True)
-
-    # Remove HTML comments (like <!-- 3501 161117 -->)
-    text = re.sub(r"<!--.*?-->", "", text, flags=re.DOTALL)
+    # Get text content, handling nested elements. Real HTML comments
+    # (like <!-- 3501 161117 -->) are already excluded by text(), so the
+    # regex is only needed for comment markup that was escaped into text.
+    text = cell.text(strip=True)
+    if "<!--" not in text:
+        return text
 
-    return text.strip()
+    return _HTML_COMMENT_RE.sub("", text).strip()
 
 
-def _extract_teacher_info(cell) -> tuple:
+def _extract_teacher_info(cell: Optional[LexborNode]) -> tuple:
     """Extract teacher name and email from the teacher cell.
 
     The cell typically contains:
@@ -127,7 +169,7 @@ def _extract_teacher_info(cell) -> tuple:
     - An email link with "Email Teacher, Name" text
 
     Args:
-        cell: BeautifulSoup Tag object for the teacher cell.
+        cell: Node for the teacher cell.
 
     Returns:
         Tuple of (teacher_name, teacher_email).
@@ -139,23 +181,23 @@ def _extract_teacher_info(cell) -> tuple:
         return teacher_name, teacher_email
 
     # Look for email link first
-    email_link = cell.find("a", href=lambda x: x and x.startswith("mailto:"))
+    email_link = cell.css_first(_MAILTO_SELECTOR)
     if email_link:
         # Extract email from href
-        href = email_link.get("href", "")
+        href = email_link.attributes.get("href") or ""
         if href.startswith("mailto:"):
             teacher_email = href.replace("mailto:", "").strip()
 
         # Extract name from link text (format: "Email Teacher, Name")
-        link_text = email_link.get_text(strip=True)
+        link_text = email_link.text(strip=True)
         if link_text.startswith("Email "):
             teacher_name = link_text[6:].strip()  # Remove "Email " prefix
 
     # Also check for info button with title attribute
     if not teacher_name:
-        info_link = cell.find("a", title=True)
+        info_link = cell.css_first("a[title]")
         if info_link:
-            title = info_link.get("title", "")
+            title = info_link.attributes.get("title") or ""
             # Title format: "Details about Teacher, Name"
             if "Details about" in title:
                 teacher_name = title.replace("Details about", "").strip()
@@ -163,13 +205,13 @@ def _extract_teacher_info(cell) -> tuple:
     return teacher_name, teacher_email
 
 
-def _extract_comment(cell) -> str:
+def _extract_comment(cell: Optional[LexborNode]) -> str:
     """Extract comment text from the comment cell.
 
     Comments are typically wrapped in a <pre> tag.
 
     Args:
-        cell: BeautifulSoup Tag object for the comment cell.
+        cell: Node for the comment cell.
 
     Returns:
         The comment text, stripped of whitespace.
@@ -178,12 +220,12 @@ def _extract_comment(cell) -> str:
         return ""
 
     # Look for <pre> tag
-    pre_tag = cell.find("pre")
+    pre_tag = cell.css_first("pre")
     if pre_tag:
-        return pre_tag.get_text(strip=True)
+        return pre_tag.text(strip=True)
 
     # Fallback to cell text
-    return cell.get_text(strip=True)
+    return cell.text(strip=True)
 
 
 def get_student_name_from_html(html: str) -> Optional[str]:
@@ -201,19 +243,29 @@ def get_student_name_from_html(html: str) -> Optional[str]:
     if not html:
         return None
 
-    soup = BeautifulSoup(html, "html.parser")
+    return _student_name_from_tree(LexborHTMLParser(html))
 
+
+def _student_name_from_tree(tree: LexborHTMLParser) -> Optional[str]:
+    """Extract the student name from a parsed page's h1/title.
+
+    Args:
+        tree: Parsed teacher comments page.
+
+    Returns:
+        Student name if found, None otherwise.
+    """
     # Try h1 tag first
-    h1 = soup.find("h1")
+    h1 = tree.css_first("h1")
     if h1:
-        text = h1.get_text(strip=True)
+        text = h1.text(strip=True)
         if "Teacher Comments:" in text:
             return text.replace("Teacher Comments:", "").strip()
 
     # Try title tag
-    title = soup.find("title")
+    title = tree.css_first("title")
     if title:
-        text = title.get_text(strip=True)
+        text = title.text(strip=True)
         if "Teacher Comments" in text:
             # Title might just be "Teacher Comments"
             return None
@@ -1,14 +1,27 @@
 """Claude AI integration for SchoolPulse chat assistant."""
 
+import asyncio
+import atexit
+import hashlib
 import json
 import logging
 import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Any
+from threading import Lock
+from typing import Any, Awaitable, Callable, Generator, Iterator, TypeVar
 
+import httpx
 from anthropic import (
     Anthropic,
+    APIConnectionError,
     APIStatusError,
+    AsyncAnthropic,
     AuthenticationError,
     BadRequestError,
     InternalServerError,
@@ -24,13 +37,13 @@ from data_queries import (
     get_student_summary,
     get_upcoming_assignments,
 )
-from tenacity import (
-    before_sleep_log,
-    retry,
-    retry_if_exception,
-    stop_after_attempt,
-    wait_exponential,
-)
+from formatting import format_quick_response
+from semantic_cache import SemanticCache, normalize_query
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 # Configure logging for this module
 # Basic config ensures logs are visible in production
@@ -40,6 +53,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 # Custom error classes for categorization
 class APIError(Exception):
@@ -132,6 +147,11 @@ def categorize_error(error: Exception) -> APIError:
     return ServerAPIError(original_error=error)
 
 
+# Error types whose retry decision does not depend on the status code
+_RETRYABLE_ERRORS = (RateLimitError, InternalServerError)
+_NON_RETRYABLE_ERRORS = (BadRequestError, AuthenticationError)
+
+
 def is_retryable_error(error: Exception) -> bool:
     """Determine if an error should trigger a retry.
 
@@ -144,36 +164,88 @@ def is_retryable_error(error: Exception) -> bool:
     - Authentication errors (401)
     - Bad request errors (400)
     """
-    if isinstance(error, RateLimitError):
+    if isinstance(error, _RETRYABLE_ERRORS):
         return True
 
-    if isinstance(error, InternalServerError):
-        return True
+    if isinstance(error, _NON_RETRYABLE_ERRORS):
+        return False
 
     if isinstance(error, APIStatusError):
-        status_code = _get_status_code(error)
-
+        # Retry on rate limits and server errors
+        status_code = error.status_code
         if status_code:
-            # Retry on rate limits and server errors
             return status_code == 429 or status_code >= 500
 
-    if isinstance(error, (BadRequestError, AuthenticationError)):
-        return False
-
     # Default to retry for unknown errors
     return True
 
 
-# Retry decorator for API calls
+# Retry policy for API calls
 # Exponential backoff: 1s, 2s, 4s, 8s (max)
 # Max 3 retries (4 total attempts)
-api_retry = retry(
-    retry=retry_if_exception(is_retryable_error),
-    stop=stop_after_attempt(4),  # 1 initial + 3 retries
-    wait=wait_exponential(multiplier=1, min=1, max=8),
-    before_sleep=before_sleep_log(logger, logging.WARNING),
-    reraise=True,
-)
+API_MAX_ATTEMPTS = 4  # 1 initial + 3 retries
+API_RETRY_MAX_DELAY = 8
+
+# Per-attempt HTTP timeout. The SDK default of 10 minutes would let one
+# stalled connection block a Streamlit session; a timed out attempt is
+# retried like a server error.
+API_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+
+def api_retry(func: Callable[..., T]) -> Callable[..., T]:
+    """Retry a function on retryable API errors with exponential backoff.
+
+    A plain loop instead of a retry library keeps the happy path to a single
+    extra call frame. The last error is re-raised once attempts run out, and
+    non-retryable errors are raised immediately.
+    """
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        attempt = 1
+        delay = 1
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not _should_retry(func, attempt, delay, e):
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                delay = min(delay * 2, API_RETRY_MAX_DELAY)
+
+    return wrapper
+
+
+def async_api_retry(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Async counterpart of api_retry, waiting with asyncio.sleep between attempts."""
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        attempt = 1
+        delay = 1
+        while True:
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                if not _should_retry(func, attempt, delay, e):
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                delay = min(delay * 2, API_RETRY_MAX_DELAY)
+
+    return wrapper
+
+
+def _should_retry(func: Callable, attempt: int, delay: int, error: Exception) -> bool:
+    """Decide whether a failed attempt is retried, logging the retry if so."""
+    if attempt >= API_MAX_ATTEMPTS or not is_retryable_error(error):
+        return False
+    logger.warning(
+        f"Retrying {func.__name__} in {delay} seconds "
+        f"(attempt {attempt}) as it raised {type(error).__name__}: {error}"
+    )
+    return True
 
 
 # Configure logging
@@ -202,21 +274,120 @@ When answering:
 The student's name is provided in the context. Use it when querying the database."""
 
 
+# Picks a model per message, see _pick_model()
+AUTO_MODEL = "auto"
+
+# Models used by AUTO_MODEL: short data lookups go to the fast model,
+# everything else to the capable one
+FAST_MODEL = "claude-3-5-haiku-20241022"
+CAPABLE_MODEL = "claude-sonnet-4-20250514"
+
 # Available models
 AVAILABLE_MODELS = {
+    AUTO_MODEL: "Auto (Haiku for simple questions)",
     "claude-opus-4-5-20250514": "Claude Opus 4.5 (Most Capable)",
-    "claude-sonnet-4-20250514": "Claude Sonnet 4 (Balanced)",
-    "claude-haiku-3-5-20241022": "Claude Haiku 3.5 (Fastest)",
+    CAPABLE_MODEL: "Claude Sonnet 4 (Balanced)",
+    FAST_MODEL: "Claude Haiku 3.5 (Fastest)",
 }
 
-DEFAULT_MODEL = "claude-sonnet-4-20250514"
+DEFAULT_MODEL = AUTO_MODEL
+
+# Longest message still considered a simple lookup, in characters
+FAST_MODEL_MAX_CHARS = 140
+
+# Words marking a question the tools answer directly
+_LOOKUP_WORDS = frozenset(
+    {
+        "grade",
+        "grades",
+        "gpa",
+        "score",
+        "scores",
+        "missing",
+        "late",
+        "attendance",
+        "absent",
+        "absences",
+        "upcoming",
+        "due",
+        "summary",
+        "assignment",
+        "assignments",
+        "homework",
+        "course",
+        "courses",
+        "class",
+        "classes",
+    }
+)
+
+# Words marking a request for judgement or writing rather than a lookup
+_ADVICE_WORDS = frozenset(
+    {
+        "should",
+        "why",
+        "help",
+        "advice",
+        "improve",
+        "draft",
+        "write",
+        "email",
+        "plan",
+        "explain",
+        "compare",
+        "worried",
+        "concerned",
+    }
+)
+
+_MODEL_WORD_RE = re.compile(r"[a-z]+")
+
+# Output token budget for answers
+MAX_RESPONSE_TOKENS = 1024
 
 # Maximum number of tool use iterations to prevent infinite loops
 # This protects against runaway API credit consumption
 MAX_TOOL_ITERATIONS = 15
 
+# Tool results are reused across requests until the database file changes
+TOOL_CACHE_MAX_ENTRIES = 128
+
+# Upper bound on threads used when Claude requests several tools at once
+MAX_TOOL_WORKERS = 8
+
+# Tools nearly every question needs. Their results are sent in the system
+# prompt, so most questions are answered without a tool round trip.
+PREFETCH_TOOLS = ("get_student_summary", "get_current_grades", "get_missing_assignments")
+
+# Approximate input token budget for conversation messages (excluding the
+# system prompt and tools). Older tool output is dropped first when over it.
+MAX_INPUT_TOKENS = 6000
+OMITTED_TOOL_OUTPUT = "[earlier tool output omitted]"
+
+# Longest serialized tool result sent to the API, in characters. Longer
+# results are cut with a marker so the model knows data is missing.
+MAX_TOOL_RESULT_CHARS = 8192
+
+# Rolling summary of older chat history. Once the unsummarized history is
+# over HISTORY_WINDOW_TOKENS or HISTORY_MAX_MESSAGES, everything but the last
+# HISTORY_KEEP_MESSAGES is folded into a short summary by a fast model.
+HISTORY_WINDOW_TOKENS = 3000
+HISTORY_MAX_MESSAGES = 10
+HISTORY_KEEP_MESSAGES = 8
+SUMMARY_MODEL = FAST_MODEL
+SUMMARY_MAX_TOKENS = 300
+
+SUMMARY_PROMPT = """Summarize this conversation between a parent and SchoolPulse, an assistant \
+for their child's school progress, in at most 200 words. Keep student names, courses, dates, \
+grades, assignments and any open questions. Write plain notes, not a dialogue."""
 
-TOOLS = [
+# Exact-match response cache. Answers depend on live database contents, so
+# entries expire after a short TTL and whenever the database file changes.
+RESPONSE_CACHE_TTL = 60.0
+RESPONSE_CACHE_MAX_ENTRIES = 256
+
+
+TOOLS = (
     {
         "name": "get_missing_assignments",
         "description": "Get all missing or late assignments for the student. Returns assignment name, course, teacher, due date.",
@@ -275,11 +446,29 @@ TOOLS = [
         "description": "Get assignment completion statistics including total, completed, missing, and completion rate.",
         "input_schema": {"type": "object", "properties": {}, "required": []},
     },
-]
+)
+
+# Prompt caching: a breakpoint on the last tool caches the tool definitions,
+# and one on the system block caches tools + system prompt together. Both
+# are identical on every call of the tool loop and across turns.
+_EPHEMERAL_CACHE = {"type": "ephemeral"}
+_CACHED_TOOLS = (*TOOLS[:-1], {**TOOLS[-1], "cache_control": _EPHEMERAL_CACHE})
+
+# The SDK re-validates and copies every tool definition on each request
+# (milliseconds per call for this schema). The tools never change, so they
+# are built once at import and sent as a prebuilt extra_body entry, which is
+# merged into the request JSON as-is. The tuples only fix the list of tools;
+# the definition dicts inside are shared and must not be modified.
+_TOOLS_BODY = {"tools": _CACHED_TOOLS}
 
 
+@lru_cache(maxsize=1)
 def get_db_path() -> str:
-    """Get the database path."""
+    """Get the database path.
+
+    Resolved once per process, since it is looked up on every tool call.
+    Use get_db_path.cache_clear() after changing DATABASE_PATH.
+    """
     # Check environment variable first
     if os.environ.get("DATABASE_PATH"):
         return os.environ["DATABASE_PATH"]
@@ -293,34 +482,421 @@ def get_db_path() -> str:
     return str(Path(__file__).parent / "powerschool.db")
 
 
+_response_cache: OrderedDict[str, tuple[float, float | None, str]] = OrderedDict()
+_response_cache_lock = Lock()
+response_cache_stats = {"hits": 0, "misses": 0}
+
+
+# One client per API key, so keep-alive HTTP connections (and their TLS
+# sessions) are reused across requests instead of set up for every message
+_clients: dict[str, Anthropic] = {}
+_clients_lock = Lock()
+
+
+def _get_client(api_key: str) -> Anthropic:
+    """Get the shared Anthropic client for an API key, creating it once.
+
+    SDK-level retries are disabled because api_retry already retries
+    rate limit and server errors.
+    """
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _clients[api_key] = Anthropic(
+                api_key=api_key, max_retries=0, timeout=API_TIMEOUT
+            )
+        return client
+
+
+@atexit.register
+def _close_clients() -> None:
+    """Close all shared clients and their connection pools."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+_semantic_cache: SemanticCache | None = None
+
+
+def _get_semantic_cache() -> SemanticCache:
+    """Get the persistent cache for reworded first-turn questions.
+
+    Stored in SEMANTIC_CACHE_PATH, or in the user cache directory
+    ($XDG_CACHE_HOME or ~/.cache) by default, so cached student answers are
+    kept out of the source tree.
+    """
+    global _semantic_cache
+    if _semantic_cache is None:
+        path = os.environ.get("SEMANTIC_CACHE_PATH")
+        if not path:
+            cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+            path = Path(cache_home) / "schoolconnect" / "semantic_cache.db"
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                # The cache degrades to misses if its file cannot be created
+                logger.warning(f"Could not create semantic cache directory: {e}")
+        _semantic_cache = SemanticCache(Path(path))
+    return _semantic_cache
+
+
+def _response_cache_key(
+    model: str,
+    student_name: str,
+    user_message: str,
+    chat_history: list,
+    history_summary: str | None = None,
+) -> str:
+    """Build the response cache key from everything that shapes the answer."""
+    payload = {
+        "m": model,
+        "s": student_name,
+        "u": user_message,
+        "h": [(msg["role"], msg["content"]) for msg in _recent_history(chat_history)],
+        "sum": history_summary or "",
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _get_db_mtime() -> float | None:
+    """Get the database file's modification time, or None if it is missing."""
+    try:
+        return os.path.getmtime(get_db_path())
+    except OSError:
+        return None
+
+
+def _get_cached_response(key: str, db_mtime: float | None) -> str | None:
+    """Return a cached response if it is fresh and the database is unchanged."""
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is not None:
+            stored_at, stored_mtime, response = entry
+            if time.monotonic() - stored_at < RESPONSE_CACHE_TTL and stored_mtime == db_mtime:
+                _response_cache.move_to_end(key)
+                response_cache_stats["hits"] += 1
+                return response
+            del _response_cache[key]
+        response_cache_stats["misses"] += 1
+        return None
+
+
+def _store_response(key: str, db_mtime: float | None, response: str) -> None:
+    """Store a response, evicting the least recently used entry when full."""
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic(), db_mtime, response)
+        _response_cache.move_to_end(key)
+        if len(_response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+            _response_cache.popitem(last=False)
+
+
+def clear_response_cache() -> None:
+    """Drop all cached AI responses and reset the hit/miss counters."""
+    with _response_cache_lock:
+        _response_cache.clear()
+        response_cache_stats["hits"] = 0
+        response_cache_stats["misses"] = 0
+
+
+# Tool name -> callable taking (db_path, student_name, tool_input)
+_TOOL_DISPATCH = {
+    "get_missing_assignments": lambda db, name, _: get_missing_assignments(db, name),
+    "get_current_grades": lambda db, name, _: get_current_grades(db, name),
+    "get_attendance_summary": lambda db, name, _: get_attendance_summary(db, name),
+    "get_upcoming_assignments": lambda db, name, args: get_upcoming_assignments(
+        db, name, args.get("days", 7)
+    ),
+    "get_course_details": lambda db, name, args: get_course_details(
+        db, name, args.get("course_name", "")
+    ),
+    "get_student_summary": lambda db, name, _: get_student_summary(db, name),
+    "get_all_courses": lambda db, name, _: get_all_courses(db, name),
+    "get_assignment_stats": lambda db, name, _: get_assignment_stats(db, name),
+}
+
+
+_tool_result_cache: OrderedDict[tuple, Any] = OrderedDict()
+_tool_result_cache_lock = Lock()
+
+
+def clear_tool_cache() -> None:
+    """Drop all cached tool results."""
+    with _tool_result_cache_lock:
+        _tool_result_cache.clear()
+
+
 def execute_tool(tool_name: str, tool_input: dict, student_name: str) -> Any:
-    """Execute a tool and return the result."""
+    """Execute a tool and return the result.
+
+    Results are cached across requests, keyed by the database file's mtime
+    so any update to the database invalidates them, and by the current UTC
+    day because some queries compare against SQLite's date('now'). Callers
+    must treat the returned data as read-only.
+    """
+    tool = _TOOL_DISPATCH.get(tool_name)
+    if tool is None:
+        return {"error": f"Unknown tool: {tool_name}"}
+
     db_path = get_db_path()
+    try:
+        db_mtime = os.path.getmtime(db_path)
+    except OSError:
+        # No database file to key on; don't cache
+        return tool(db_path, student_name, tool_input)
+
+    key = (
+        tool_name,
+        # Most tools take no arguments; skip serializing an empty input
+        json.dumps(tool_input, sort_keys=True) if tool_input else "",
+        student_name,
+        db_path,
+        db_mtime,
+        time.strftime("%Y-%m-%d", time.gmtime()),
+    )
+    with _tool_result_cache_lock:
+        if key in _tool_result_cache:
+            _tool_result_cache.move_to_end(key)
+            return _tool_result_cache[key]
+
+    result = tool(db_path, student_name, tool_input)
+
+    with _tool_result_cache_lock:
+        _tool_result_cache[key] = result
+        if len(_tool_result_cache) > TOOL_CACHE_MAX_ENTRIES:
+            _tool_result_cache.popitem(last=False)
+    return result
 
-    if tool_name == "get_missing_assignments":
-        return get_missing_assignments(db_path, student_name)
-    elif tool_name == "get_current_grades":
-        return get_current_grades(db_path, student_name)
-    elif tool_name == "get_attendance_summary":
-        return get_attendance_summary(db_path, student_name)
-    elif tool_name == "get_upcoming_assignments":
-        days = tool_input.get("days", 7)
-        return get_upcoming_assignments(db_path, student_name, days)
-    elif tool_name == "get_course_details":
-        course_name = tool_input.get("course_name", "")
-        return get_course_details(db_path, student_name, course_name)
-    elif tool_name == "get_student_summary":
-        return get_student_summary(db_path, student_name)
-    elif tool_name == "get_all_courses":
-        return get_all_courses(db_path, student_name)
-    elif tool_name == "get_assignment_stats":
-        return get_assignment_stats(db_path, student_name)
+
+def _cache_history(messages: list) -> list:
+    """Mark the conversation prefix as cacheable.
+
+    Inside the tool loop the newest message holds tool results that every
+    later iteration re-sends unchanged, so the breakpoint goes on it and each
+    iteration reads the previous one's prefix from the cache. Otherwise it
+    goes on the message before the newest one, once the conversation exceeds
+    two turns and the shared history is long enough to be worth caching.
+    Message dicts are copied, so the caller's list is left untouched.
+
+    Args:
+        messages: Messages about to be sent to the API
+
+    Returns:
+        Messages with a cache breakpoint on the last tool results or on the
+        second-to-last entry
+    """
+    newest = messages[-1]["content"] if messages else None
+    if isinstance(newest, list) and newest and _is_tool_result(newest[-1]):
+        index = len(messages) - 1
+    elif len(messages) > 2:
+        index = len(messages) - 2
     else:
-        return {"error": f"Unknown tool: {tool_name}"}
+        return messages
+
+    prefix = messages[index]
+    content = prefix["content"]
+    if isinstance(content, str) and content:
+        blocks = [{"type": "text", "text": content, "cache_control": _EPHEMERAL_CACHE}]
+    elif isinstance(content, list) and content and isinstance(content[-1], dict):
+        blocks = [*content[:-1], {**content[-1], "cache_control": _EPHEMERAL_CACHE}]
+    else:
+        # Empty text or SDK content blocks from an earlier response
+        return messages
+
+    return [*messages[:index], {**prefix, "content": blocks}, *messages[index + 1 :]]
+
+
+def _serialize_result(result: Any) -> str:
+    """Serialize a tool result to JSON for a tool_result block.
+
+    Uses orjson when it is installed, which is several times faster on the
+    lists of row dicts the tools return and encodes dates natively.
+    """
+    if orjson is not None:
+        return orjson.dumps(result, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(result, default=str)
+
+
+def _run_tools(tool_uses: list, student_name: str, tool_cache: dict) -> list[dict]:
+    """Execute the tool calls of one response and build their tool_result blocks.
+
+    Results are memoized in tool_cache by (name, input) for the rest of the
+    request. When a response asks for several distinct tools, they run
+    concurrently in a thread pool since each one is an independent query.
+
+    Args:
+        tool_uses: tool_use blocks from the model response
+        student_name: Student name passed to every tool
+        tool_cache: Serialized results already computed for this request
+
+    Returns:
+        tool_result blocks in the same order as tool_uses
+    """
+    keys, pending = _pending_tools(tool_uses, tool_cache)
+
+    if len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=min(MAX_TOOL_WORKERS, len(pending))) as executor:
+            futures = {
+                key: executor.submit(execute_tool, tool_use.name, tool_use.input, student_name)
+                for key, tool_use in pending.items()
+            }
+            results = {key: future.result() for key, future in futures.items()}
+    else:
+        results = {
+            key: execute_tool(tool_use.name, tool_use.input, student_name)
+            for key, tool_use in pending.items()
+        }
+
+    return _tool_results(tool_uses, keys, results, tool_cache)
+
+
+async def _run_tools_async(tool_uses: list, student_name: str, tool_cache: dict) -> list[dict]:
+    """Async counterpart of _run_tools.
+
+    Distinct pending tools run concurrently in worker threads via
+    asyncio.gather, so the event loop stays free for other requests while
+    the SQLite queries run. At most MAX_TOOL_WORKERS run at once, like the
+    thread pool of the blocking path, to limit SQLite lock contention.
+    """
+    keys, pending = _pending_tools(tool_uses, tool_cache)
+    semaphore = asyncio.Semaphore(MAX_TOOL_WORKERS)
+
+    async def run(tool_use: Any) -> Any:
+        async with semaphore:
+            return await asyncio.to_thread(
+                execute_tool, tool_use.name, tool_use.input, student_name
+            )
+
+    outputs = await asyncio.gather(*[run(tool_use) for tool_use in pending.values()])
+    results = dict(zip(pending, outputs))
+    return _tool_results(tool_uses, keys, results, tool_cache)
+
+
+def _pending_tools(tool_uses: list, tool_cache: dict) -> tuple[list, dict]:
+    """Compute the memo key of each tool call and the distinct calls still to run."""
+    keys = [(tool_use.name, json.dumps(tool_use.input, sort_keys=True)) for tool_use in tool_uses]
+    pending = {}
+    for key, tool_use in zip(keys, tool_uses):
+        if key not in tool_cache:
+            pending.setdefault(key, tool_use)
+    return keys, pending
+
+
+def _cap_tool_output(content: str) -> str:
+    """Cut a serialized tool result down to MAX_TOOL_RESULT_CHARS."""
+    if len(content) <= MAX_TOOL_RESULT_CHARS:
+        return content
+    omitted = len(content) - MAX_TOOL_RESULT_CHARS
+    return f"{content[:MAX_TOOL_RESULT_CHARS]}\n[truncated: {omitted} more characters]"
+
+
+def _tool_results(tool_uses: list, keys: list, results: dict, tool_cache: dict) -> list[dict]:
+    """Memoize new tool results and build the tool_result blocks in call order."""
+    for key, result in results.items():
+        tool_cache[key] = _cap_tool_output(_serialize_result(result))
+
+    return [
+        {"type": "tool_result", "tool_use_id": tool_use.id, "content": tool_cache[key]}
+        for key, tool_use in zip(keys, tool_uses)
+    ]
+
+
+def _estimate_tokens(content: Any) -> int:
+    """Cheaply estimate the tokens in message content (~4 chars per token)."""
+    if isinstance(content, str):
+        return len(content) // 4
+    total = 0
+    for block in content:
+        if isinstance(block, dict):
+            total += len(str(block.get("content") or block.get("text") or "")) // 4
+        else:
+            total += len(getattr(block, "text", None) or str(getattr(block, "input", ""))) // 4
+    return total
+
+
+def _is_tool_result(block: Any) -> bool:
+    """Check whether a content block is a tool_result dict."""
+    return isinstance(block, dict) and block.get("type") == "tool_result"
+
+
+def _trim_messages(messages: list, max_tokens: int = MAX_INPUT_TOKENS) -> list:
+    """Keep the conversation sent to the API within an approximate token budget.
+
+    The tool loop re-sends the whole growing conversation on every round, so
+    large tool outputs would otherwise make each request bigger than the
+    last. When over budget, older tool_result contents are replaced with a
+    short placeholder (keeping their tool_use_id so the conversation stays
+    valid), then the oldest plain chat history pairs are dropped. The last
+    two messages are never touched.
+
+    Args:
+        messages: Messages about to be sent to the API
+        max_tokens: Approximate token budget for all messages
+
+    Returns:
+        The original list if within budget, otherwise a trimmed copy
+    """
+    sizes = [_estimate_tokens(message["content"]) for message in messages]
+    total = sum(sizes)
+    if total <= max_tokens:
+        return messages
+
+    trimmed = list(messages)
+
+    # Oldest tool output goes first
+    for i in range(len(trimmed) - 2):
+        if total <= max_tokens:
+            return trimmed
+        content = trimmed[i]["content"]
+        if isinstance(content, str) or not any(_is_tool_result(b) for b in content):
+            continue
+        blocks = [
+            {**block, "content": OMITTED_TOOL_OUTPUT} if _is_tool_result(block) else block
+            for block in content
+        ]
+        new_size = _estimate_tokens(blocks)
+        total -= sizes[i] - new_size
+        sizes[i] = new_size
+        trimmed[i] = {**trimmed[i], "content": blocks}
+
+    # Then the oldest plain user/assistant history pairs, keeping the
+    # conversation starting with a user message
+    while (
+        total > max_tokens
+        and len(trimmed) > 3
+        and trimmed[0]["role"] == "user"
+        and isinstance(trimmed[0]["content"], str)
+        and trimmed[1]["role"] == "assistant"
+        and isinstance(trimmed[1]["content"], str)
+    ):
+        total -= sizes[0] + sizes[1]
+        del trimmed[:2]
+        del sizes[:2]
+
+    return trimmed
+
+
+def _request_kwargs(model: str, system: list, messages: list) -> dict:
+    """Build the Messages API arguments shared by blocking and streaming calls.
+
+    The system prompt, tool definitions and conversation history are sent
+    with prompt caching breakpoints so repeated prefixes are not reprocessed,
+    and the history is trimmed to MAX_INPUT_TOKENS first.
+    """
+    return {
+        "model": model,
+        "max_tokens": MAX_RESPONSE_TOKENS,
+        "system": system,
+        "messages": _cache_history(_trim_messages(messages)),
+        "extra_body": _TOOLS_BODY,
+    }
 
 
 @api_retry
-def _make_api_call(client: Anthropic, model: str, system: str, messages: list) -> Any:
+def _make_api_call(client: Anthropic, model: str, system: list, messages: list) -> Any:
     """Make an API call with retry logic.
 
     This function is decorated with exponential backoff retry for:
@@ -329,27 +905,283 @@ def _make_api_call(client: Anthropic, model: str, system: str, messages: list) -
 
     Client errors (4xx except 429) are NOT retried.
     """
+    return client.messages.create(**_request_kwargs(model, system, messages))
+
+
+@async_api_retry
+async def _make_api_call_async(
+    client: AsyncAnthropic, model: str, system: list, messages: list
+) -> Any:
+    """Async counterpart of _make_api_call, with the same retry policy."""
+    return await client.messages.create(**_request_kwargs(model, system, messages))
+
+
+@api_retry
+def _open_stream(client: Anthropic, model: str, system: list, messages: list) -> Any:
+    """Open a streaming API call with the same retry policy as _make_api_call.
+
+    The request is sent when the stream manager is entered, so entering it
+    here lets rate limit and server errors be retried before any text has
+    been shown. The caller must close() the returned stream.
+    """
+    return client.messages.stream(**_request_kwargs(model, system, messages)).__enter__()
+
+
+def _stream_api_call(
+    client: Anthropic, model: str, system: list, messages: list
+) -> Generator[str, None, Any]:
+    """Yield response text as it arrives, then return the complete message."""
+    stream = _open_stream(client, model, system, messages)
+    try:
+        yield from stream.text_stream
+        return stream.get_final_message()
+    finally:
+        stream.close()
+
+
+# The static prompt is its own cached block, so the cached prefix (tools plus
+# instructions) is byte-identical for every student
+_SYSTEM_BLOCK = {"type": "text", "text": SYSTEM_PROMPT, "cache_control": _EPHEMERAL_CACHE}
+
+
+def _pick_model(user_message: str) -> str:
+    """Choose the model for a message when AUTO_MODEL is selected.
+
+    Short, single questions about data the tools return (grades, missing
+    work, attendance...) go to FAST_MODEL. Longer messages, several
+    questions at once, and requests for advice or writing go to
+    CAPABLE_MODEL.
+    """
+    if len(user_message) > FAST_MODEL_MAX_CHARS or user_message.count("?") > 1:
+        return CAPABLE_MODEL
+    words = set(_MODEL_WORD_RE.findall(user_message.lower()))
+    if words & _ADVICE_WORDS or not words & _LOOKUP_WORDS:
+        return CAPABLE_MODEL
+    return FAST_MODEL
+
+
+def _resolve_model(model: str | None, user_message: str) -> str:
+    """Turn the requested model (None for the default, or AUTO_MODEL) into a model ID."""
+    model = model or DEFAULT_MODEL
+    return _pick_model(user_message) if model == AUTO_MODEL else model
+
+
+@lru_cache(maxsize=64)
+def _build_system_prompt(student_name: str) -> list[dict]:
+    """Add the current student context to the system prompt.
+
+    The student context follows the cached instructions as a separate
+    block. Cached per student, so every request about a student sends the
+    same blocks instead of rebuilding the prompt.
+    """
+    context = f"""Current student context:
+- Student name: {student_name}
+- Use this name when calling database query tools."""
+    return [_SYSTEM_BLOCK, {"type": "text", "text": context}]
+
+
+def _recent_history(chat_history: list) -> deque:
+    """Return the last 10 messages not yet folded into the history summary.
+
+    A bounded deque keeps the window in one pass over the history without
+    building a filtered copy of it first.
+    """
+    return deque((msg for msg in chat_history if not msg.get("summarized")), maxlen=10)
+
+
+@lru_cache(maxsize=32)
+def _system_blocks(student_name: str, history_summary: str | None) -> list[dict]:
+    """Build the system prompt, followed by the summary of older history if any.
+
+    The summary only changes when older history is folded in, so the
+    blocks are cached and every turn in between sends the same objects.
+    """
+    system = _build_system_prompt(student_name)
+    if history_summary:
+        summary_text = f"Summary of the earlier conversation:\n{history_summary}"
+        system = [*system, {"type": "text", "text": summary_text}]
+    return system
+
+
+def _with_student_data(system: list[dict], student_name: str, db_mtime: float | None) -> list[dict]:
+    """Append the student's PREFETCH_TOOLS results to the system prompt.
+
+    The data is its own block after the cached ones and has no cache
+    breakpoint, so the cached prefix stays byte-identical for every student.
+    The results come from the tool cache, so repeat requests do not query
+    the database again. Skipped when the database file is missing (opening
+    it would create an empty file) or a query fails; Claude can still call
+    the tools then.
+
+    Args:
+        system: System prompt blocks for the request
+        student_name: Student the request is about
+        db_mtime: Current database modification time, None if it is missing
+
+    Returns:
+        System prompt blocks, with the student data block last
+    """
+    if db_mtime is None:
+        return system
+    try:
+        data = {
+            tool_name: execute_tool(tool_name, {}, student_name) for tool_name in PREFETCH_TOOLS
+        }
+    except sqlite3.Error as e:
+        logger.warning(f"Could not prefetch student data: {e}")
+        return system
+    text = (
+        f"Current data for {student_name} ({', '.join(PREFETCH_TOOLS)} results). "
+        "Answer from it when it covers the question, and use the tools for anything else:\n"
+        f"{_cap_tool_output(_serialize_result(data))}"
+    )
+    return [*system, {"type": "text", "text": text}]
+
+
+@api_retry
+def _summary_call(client: Anthropic, transcript: str) -> Any:
+    """Ask the summary model to compress a transcript, with retry logic."""
     return client.messages.create(
-        model=model, max_tokens=1024, system=system, tools=TOOLS, messages=messages
+        model=SUMMARY_MODEL,
+        max_tokens=SUMMARY_MAX_TOKENS,
+        system=SUMMARY_PROMPT,
+        messages=[{"role": "user", "content": transcript}],
+    )
+
+
+def summarize_history(
+    messages: list, api_key: str, previous_summary: str | None = None
+) -> str | None:
+    """Compress chat messages, and any earlier summary, into a short summary.
+
+    Args:
+        messages: Chat messages (role and text content) to summarize
+        api_key: Anthropic API key
+        previous_summary: Summary of the messages before these, if any
+
+    Returns:
+        The new summary, or None if it could not be generated
+    """
+    transcript = "\n\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+    if previous_summary:
+        transcript = f"Summary so far:\n{previous_summary}\n\n{transcript}"
+
+    try:
+        response = _summary_call(_get_client(api_key), transcript)
+    except Exception as e:
+        logger.warning(f"History summary failed: {type(e).__name__}: {e}")
+        return None
+    return _response_text(response)
+
+
+def compact_history(chat_history: list, history_summary: str | None, api_key: str) -> str | None:
+    """Fold older chat history into the rolling summary once it grows too long.
+
+    Messages that are folded in are flagged with "summarized", so later
+    requests send the summary in their place and they are never summarized
+    twice. If the summary cannot be generated, nothing is flagged and the
+    history is sent as before.
+
+    Args:
+        chat_history: Chat messages before the new user message (modified in place)
+        history_summary: Current summary of earlier messages, if any
+        api_key: Anthropic API key
+
+    Returns:
+        The summary to send with the next request
+    """
+    recent = [msg for msg in chat_history if not msg.get("summarized")]
+    if len(recent) <= HISTORY_KEEP_MESSAGES:
+        return history_summary
+    if (
+        len(recent) <= HISTORY_MAX_MESSAGES
+        and sum(_estimate_tokens(msg["content"]) for msg in recent) <= HISTORY_WINDOW_TOKENS
+    ):
+        return history_summary
+
+    evicted = recent[:-HISTORY_KEEP_MESSAGES]
+    summary = summarize_history(evicted, api_key, history_summary)
+    if summary is None:
+        return history_summary
+
+    for msg in evicted:
+        msg["summarized"] = True
+    return summary
+
+
+def _build_messages(chat_history: list, user_message: str) -> list:
+    """Convert chat history to API format and append the new user message."""
+    messages = []
+    for msg in _recent_history(chat_history):  # Keep last 10 messages for context
+        messages.append({"role": msg["role"], "content": msg["content"]})
+
+    # Add current user message
+    messages.append({"role": "user", "content": user_message})
+    return messages
+
+
+def _tool_limit_message(response: Any, tool_iterations: int, student_name: str) -> str:
+    """Log the runaway tool loop and build the user-facing error."""
+    # Log the tools that were called for debugging
+    tool_uses = [block for block in response.content if block.type == "tool_use"]
+    tool_names = [tool_use.name for tool_use in tool_uses]
+    logger.warning(
+        f"Tool iteration limit reached. Iteration: {tool_iterations}, "
+        f"Tools called: {tool_names}, Student: {student_name}"
+    )
+    return (
+        f"Error: Maximum tool iteration limit ({MAX_TOOL_ITERATIONS}) reached. "
+        "This may indicate an infinite loop. Please try rephrasing your question."
     )
 
 
+def _response_text(response: Any) -> str | None:
+    """Join the text blocks of a final response, or None if there is no text."""
+    return "\n".join(block.text for block in response.content if block.type == "text") or None
+
+
+def _error_message(error: Exception) -> str:
+    """Log an error from the AI loop and build the user-facing message."""
+    if isinstance(error, (RateLimitError, InternalServerError, APIStatusError, APIConnectionError)):
+        # Categorize error for user-friendly message (timeouts and
+        # connection failures count as the service being unavailable)
+        categorized = categorize_error(error)
+        logger.error(f"API error after retries: {error}")
+        return f"Error: {categorized.user_message}"
+
+    # Generic error handling - log full error but return sanitized message
+    # to avoid leaking sensitive information (API keys, internal paths, etc.)
+    logger.error(f"Unexpected error: {type(error).__name__}: {error}")
+    return "An unexpected error occurred. Please try again later."
+
+
 def get_ai_response(
     user_message: str,
     student_context: dict,
     chat_history: list,
     api_key: str | None = None,
     model: str | None = None,
+    history_summary: str | None = None,
 ) -> str:
     """Get AI response using Claude with tool use.
 
     Features exponential backoff retry on rate limits and server errors.
-    Returns user-friendly error messages on failure.
+    Returns user-friendly error messages on failure. Successful answers are
+    cached briefly, so repeating a question skips the API entirely, and
+    first-turn answers are also kept in the persistent semantic cache so
+    reworded repeats are answered without the API.
+
+    Messages flagged by compact_history() are left out of the request, and
+    history_summary (its result) is sent in the system prompt instead.
+    Simple opening questions ("show grades") are answered straight from the
+    database without calling Claude.
     """
+    quick = _quick_answer(user_message, student_context, chat_history)
+    if quick is not None:
+        return quick
 
     # Use default model if not specified
-    if not model:
-        model = DEFAULT_MODEL
+    model = _resolve_model(model, user_message)
 
     # Get API key
     if not api_key:
@@ -358,60 +1190,48 @@ def get_ai_response(
     if not api_key:
         return "Error: ANTHROPIC_API_KEY not set. Please configure your API key."
 
-    client = Anthropic(api_key=api_key)
-
     student_name = student_context.get("student_name", "Delilah")
 
-    # Build messages with context
-    system_with_context = f"""{SYSTEM_PROMPT}
-
-Current student context:
-- Student name: {student_name}
-- Use this name when calling database query tools."""
+    cache_key = _response_cache_key(
+        model, student_name, user_message, chat_history, history_summary
+    )
+    db_mtime = _get_db_mtime()
+    cached = _get_cached_response(cache_key, db_mtime)
+    if cached is None and not chat_history:
+        # Reworded first-turn questions; follow-ups depend on the history
+        cached = _get_semantic_cache().get(model, student_name, user_message, db_mtime)
+    if cached is not None:
+        return cached
 
-    # Convert chat history to API format
-    messages = []
-    for msg in chat_history[-10:]:  # Keep last 10 messages for context
-        messages.append({"role": msg["role"], "content": msg["content"]})
+    client = _get_client(api_key)
 
-    # Add current user message
-    messages.append({"role": "user", "content": user_message})
+    # Build messages with context
+    system_with_context = _with_student_data(
+        _system_blocks(student_name, history_summary), student_name, db_mtime
+    )
+    messages = _build_messages(chat_history, user_message)
 
     try:
         # Initial API call with tools (with retry)
         response = _make_api_call(client, model, system_with_context, messages)
 
+        # Serialized tool results for this request, keyed by (name, input), so
+        # a tool Claude calls again with the same arguments is not re-run
+        tool_cache: dict[tuple[str, str], str] = {}
+
         # Handle tool use loop with iteration limit to prevent infinite loops
         tool_iterations = 0
         while response.stop_reason == "tool_use":
             tool_iterations += 1
             if tool_iterations > MAX_TOOL_ITERATIONS:
-                # Log the tools that were called for debugging
-                tool_uses = [block for block in response.content if block.type == "tool_use"]
-                tool_names = [tool_use.name for tool_use in tool_uses]
-                logger.warning(
-                    f"Tool iteration limit reached. Iteration: {tool_iterations}, "
-                    f"Tools called: {tool_names}, Student: {student_name}"
-                )
-                return (
-                    f"Error: Maximum tool iteration limit ({MAX_TOOL_ITERATIONS}) reached. "
-                    "This may indicate an infinite loop. Please try rephrasing your question."
-                )
+                return _tool_limit_message(response, tool_iterations, student_name)
 
             # Find tool use blocks
             tool_uses = [block for block in response.content if block.type == "tool_use"]
 
-            # Execute each tool and collect results
-            tool_results = []
-            for tool_use in tool_uses:
-                result = execute_tool(tool_use.name, tool_use.input, student_name)
-                tool_results.append(
-                    {
-                        "type": "tool_result",
-                        "tool_use_id": tool_use.id,
-                        "content": json.dumps(result, default=str),
-                    }
-                )
+            # Execute the tools (concurrently when there are several) and
+            # collect results
+            tool_results = _run_tools(tool_uses, student_name, tool_cache)
 
             # Add assistant's response and tool results to messages
             messages.append({"role": "assistant", "content": response.content})
@@ -421,40 +1241,288 @@ Current student context:
             response = _make_api_call(client, model, system_with_context, messages)
 
         # Extract text response
-        text_blocks = [block.text for block in response.content if hasattr(block, "text")]
-        return "\n".join(text_blocks) if text_blocks else "I couldn't generate a response."
+        answer = _response_text(response)
+        if answer is None:
+            return "I couldn't generate a response."
 
-    except (RateLimitError, InternalServerError, APIStatusError) as e:
-        # Categorize error for user-friendly message
-        categorized = categorize_error(e)
-        logger.error(f"API error after retries: {e}")
-        return f"Error: {categorized.user_message}"
+        _store_response(cache_key, db_mtime, answer)
+        if not chat_history:
+            _get_semantic_cache().put(model, student_name, user_message, db_mtime, answer)
+        return answer
+
+    except Exception as e:
+        return _error_message(e)
+
+
+def stream_ai_response(
+    user_message: str,
+    student_context: dict,
+    chat_history: list,
+    api_key: str | None = None,
+    model: str | None = None,
+    history_summary: str | None = None,
+) -> Iterator[str]:
+    """Stream the AI response as it is generated.
+
+    Streaming counterpart of get_ai_response() for use with st.write_stream:
+    text is yielded as soon as Claude produces it instead of after the whole
+    tool loop finishes. Any text Claude writes before calling tools is shown
+    too, followed by the final answer once the tools have run. Errors are
+    yielded as the same user-friendly messages get_ai_response() returns.
+    Simple opening questions are answered from the database, like there.
+    """
+    quick = _quick_answer(user_message, student_context, chat_history)
+    if quick is not None:
+        yield quick
+        return
+
+    model = _resolve_model(model, user_message)
+
+    if not api_key:
+        api_key = os.environ.get("ANTHROPIC_API_KEY")
+
+    if not api_key:
+        yield "Error: ANTHROPIC_API_KEY not set. Please configure your API key."
+        return
+
+    student_name = student_context.get("student_name", "Delilah")
+
+    cache_key = _response_cache_key(
+        model, student_name, user_message, chat_history, history_summary
+    )
+    db_mtime = _get_db_mtime()
+    cached = _get_cached_response(cache_key, db_mtime)
+    if cached is None and not chat_history:
+        cached = _get_semantic_cache().get(model, student_name, user_message, db_mtime)
+    if cached is not None:
+        yield cached
+        return
+
+    client = _get_client(api_key)
+    system_with_context = _with_student_data(
+        _system_blocks(student_name, history_summary), student_name, db_mtime
+    )
+    messages = _build_messages(chat_history, user_message)
+
+    try:
+        response = yield from _stream_api_call(client, model, system_with_context, messages)
+
+        tool_cache: dict[tuple[str, str], str] = {}
+        tool_iterations = 0
+        while response.stop_reason == "tool_use":
+            tool_iterations += 1
+            if tool_iterations > MAX_TOOL_ITERATIONS:
+                yield _tool_limit_message(response, tool_iterations, student_name)
+                return
+
+            # Separate any text shown before the tool call from what follows
+            if _response_text(response):
+                yield "\n\n"
+
+            tool_uses = [block for block in response.content if block.type == "tool_use"]
+            tool_results = _run_tools(tool_uses, student_name, tool_cache)
+
+            messages.append({"role": "assistant", "content": response.content})
+            messages.append({"role": "user", "content": tool_results})
+
+            response = yield from _stream_api_call(client, model, system_with_context, messages)
+
+        answer = _response_text(response)
+        if answer is None:
+            yield "I couldn't generate a response."
+            return
+
+        _store_response(cache_key, db_mtime, answer)
+        if not chat_history:
+            _get_semantic_cache().put(model, student_name, user_message, db_mtime, answer)
+
+    except Exception as e:
+        yield _error_message(e)
+
+
+async def get_ai_response_async(
+    user_message: str,
+    student_context: dict,
+    chat_history: list,
+    api_key: str | None = None,
+    model: str | None = None,
+    history_summary: str | None = None,
+    client: AsyncAnthropic | None = None,
+) -> str:
+    """Async counterpart of get_ai_response().
+
+    Uses AsyncAnthropic and runs each round's tool calls concurrently in
+    worker threads, so several chat requests (e.g. one per student on a
+    dashboard) can be awaited together with asyncio.gather and take about
+    as long as the slowest one. Caching and error handling match
+    get_ai_response().
+
+    Concurrent callers can pass a shared client so all their requests use
+    one connection pool; a client passed in is left open. Otherwise one is
+    created for the call and closed afterwards.
+    """
+    quick = await asyncio.to_thread(_quick_answer, user_message, student_context, chat_history)
+    if quick is not None:
+        return quick
+
+    model = _resolve_model(model, user_message)
+
+    if not api_key:
+        api_key = os.environ.get("ANTHROPIC_API_KEY")
+
+    if not api_key and client is None:
+        return "Error: ANTHROPIC_API_KEY not set. Please configure your API key."
+
+    student_name = student_context.get("student_name", "Delilah")
+
+    cache_key = _response_cache_key(
+        model, student_name, user_message, chat_history, history_summary
+    )
+    db_mtime = _get_db_mtime()
+    cached = _get_cached_response(cache_key, db_mtime)
+    if cached is None and not chat_history:
+        cached = _get_semantic_cache().get(model, student_name, user_message, db_mtime)
+    if cached is not None:
+        return cached
+
+    # Async clients are bound to the event loop they were first used on, so
+    # unlike the sync client they are not cached across calls
+    owns_client = client is None
+    if owns_client:
+        client = AsyncAnthropic(api_key=api_key, max_retries=0, timeout=API_TIMEOUT)
+    system_with_context = await asyncio.to_thread(
+        _with_student_data, _system_blocks(student_name, history_summary), student_name, db_mtime
+    )
+    messages = _build_messages(chat_history, user_message)
+
+    try:
+        response = await _make_api_call_async(client, model, system_with_context, messages)
+
+        tool_cache: dict[tuple[str, str], str] = {}
+        tool_iterations = 0
+        while response.stop_reason == "tool_use":
+            tool_iterations += 1
+            if tool_iterations > MAX_TOOL_ITERATIONS:
+                return _tool_limit_message(response, tool_iterations, student_name)
+
+            tool_uses = [block for block in response.content if block.type == "tool_use"]
+            tool_results = await _run_tools_async(tool_uses, student_name, tool_cache)
+
+            messages.append({"role": "assistant", "content": response.content})
+            messages.append({"role": "user", "content": tool_results})
+
+            response = await _make_api_call_async(client, model, system_with_context, messages)
+
+        answer = _response_text(response)
+        if answer is None:
+            return "I couldn't generate a response."
+
+        _store_response(cache_key, db_mtime, answer)
+        if not chat_history:
+            _get_semantic_cache().put(model, student_name, user_message, db_mtime, answer)
+        return answer
 
     except Exception as e:
-        # Generic error handling - log full error but return sanitized message
-        # to avoid leaking sensitive information (API keys, internal paths, etc.)
-        logger.error(f"Unexpected error: {type(e).__name__}: {e}")
-        return "An unexpected error occurred. Please try again later."
+        return _error_message(e)
+    finally:
+        if owns_client:
+            await client.close()
+
+
+# Phrasings of the questions get_quick_response() answers. A message is
+# routed to a quick response only when its content words match one of these
+# exactly, so anything more specific ("why are her grades dropping?") still
+# goes to Claude.
+_QUICK_INTENT_PHRASES = {
+    "grades": ("grades", "current grades"),
+    "missing": ("missing assignments", "missing work", "missing homework"),
+    "upcoming": ("due this week", "assignments due this week", "homework due this week"),
+    "attendance": ("attendance",),
+}
+
+# Words that do not change these simple questions ("how's the attendance?")
+_QUICK_INTENT_FILLER = frozenset({"how"})
+
+
+def _quick_intent_key(text: str) -> str:
+    """Normalize a message for quick intent matching."""
+    return " ".join(
+        word
+        for word in normalize_query(text).split()
+        if len(word) > 1 and word not in _QUICK_INTENT_FILLER
+    )
+
+
+_QUICK_INTENTS = {
+    _quick_intent_key(phrase): intent
+    for intent, phrases in _QUICK_INTENT_PHRASES.items()
+    for phrase in phrases
+}
+
+
+def classify_quick_intent(user_message: str) -> str | None:
+    """Match a message to a get_quick_response() query type.
+
+    Args:
+        user_message: User question
+
+    Returns:
+        Query type for get_quick_response(), or None if the question needs Claude
+    """
+    return _QUICK_INTENTS.get(_quick_intent_key(user_message))
+
+
+# Quick query type -> (title, tool name, tool input, include a count)
+_QUICK_QUERIES = {
+    "missing": ("Missing Assignments", "get_missing_assignments", {}, True),
+    "grades": ("Current Grades", "get_current_grades", {}, True),
+    "attendance": ("Attendance Summary", "get_attendance_summary", {}, False),
+    "upcoming": ("Due This Week", "get_upcoming_assignments", {"days": 7}, True),
+    "summary": ("Student Summary", "get_student_summary", {}, False),
+}
 
 
 def get_quick_response(query_type: str, student_name: str = "Delilah") -> dict:
-    """Get a quick response for pre-built queries without AI."""
-    db_path = get_db_path()
+    """Get a quick response for pre-built queries without AI.
 
-    if query_type == "missing":
-        data = get_missing_assignments(db_path, student_name)
-        return {"title": "Missing Assignments", "data": data, "count": len(data)}
-    elif query_type == "grades":
-        data = get_current_grades(db_path, student_name)
-        return {"title": "Current Grades", "data": data, "count": len(data)}
-    elif query_type == "attendance":
-        data = get_attendance_summary(db_path, student_name)
-        return {"title": "Attendance Summary", "data": data}
-    elif query_type == "upcoming":
-        data = get_upcoming_assignments(db_path, student_name, days=7)
-        return {"title": "Due This Week", "data": data, "count": len(data)}
-    elif query_type == "summary":
-        data = get_student_summary(db_path, student_name)
-        return {"title": "Student Summary", "data": data}
-    else:
+    Goes through execute_tool(), so repeated quick queries are served from
+    the tool result cache until the database changes.
+    """
+    query = _QUICK_QUERIES.get(query_type)
+    if query is None:
         return {"error": f"Unknown query type: {query_type}"}
+
+    title, tool_name, tool_input, counted = query
+    data = execute_tool(tool_name, tool_input, student_name)
+    if counted:
+        return {"title": title, "data": data, "count": len(data)}
+    return {"title": title, "data": data}
+
+
+def _quick_answer(user_message: str, student_context: dict, chat_history: list) -> str | None:
+    """Answer a simple opening question from the database instead of Claude.
+
+    Only first-turn messages qualify, since follow-ups depend on the
+    conversation. Skipped when the database file is missing (opening it
+    would create an empty file); a failing query also returns None, so
+    Claude handles the question (and reports the error) as usual.
+
+    Args:
+        user_message: User question
+        student_context: Context with the student name
+        chat_history: Earlier messages of the conversation
+
+    Returns:
+        Formatted quick response, or None if the question needs Claude
+    """
+    if chat_history or _get_db_mtime() is None:
+        return None
+    intent = classify_quick_intent(user_message)
+    if intent is None:
+        return None
+    student_name = student_context.get("student_name", "Delilah")
+    try:
+        return format_quick_response(get_quick_response(intent, student_name))
+    except sqlite3.Error as e:
+        logger.warning(f"Quick answer failed: {e}")
+        return None
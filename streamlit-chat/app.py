@@ -11,15 +11,24 @@ FERPA Compliant Implementation:
 - MED-3: Google-style docstrings on all functions
 """
 
+import logging
+import os
+import sqlite3
+from collections import deque
+from collections.abc import Sequence
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 
 import streamlit as st
 from ai_assistant import (
     AVAILABLE_MODELS,
     DEFAULT_MODEL,
-    get_ai_response,
+    classify_quick_intent,
+    compact_history,
     get_db_path,
     get_quick_response,
+    stream_ai_response,
 )
 from auth import (
     can_access_student,
@@ -29,7 +38,14 @@ from auth import (
     render_login_page,
 )
 from data_queries import get_student_summary
+from formatting import (
+    STATUS_EMOJIS,
+    attendance_severity,
+    format_quick_response,
+    missing_severity,
+)
 from session_manager import (
+    ACTIVITY_REFRESH_SECONDS,
     create_session,
     logout,
     refresh_session,
@@ -38,33 +54,84 @@ from session_manager import (
     validate_session,
 )
 
+logger = logging.getLogger(__name__)
+
 # Message buffer constants (HIGH-3)
 MAX_MESSAGES_STORED = 50  # Maximum messages to keep in session state
 MAX_MESSAGES_TO_AI = 10  # Maximum messages to send to AI for context
 
+# Model selector options and each model's position among them
+_MODEL_OPTIONS = tuple(AVAILABLE_MODELS)
+_MODEL_INDEX = {model: i for i, model in enumerate(_MODEL_OPTIONS)}
+
+# Quick action buttons: (label, widget key, quick query type, question shown)
+_QUICK_ACTIONS = (
+    ("📝 Missing Work", "btn_missing", "missing", "What are the missing assignments?"),
+    ("📊 Current Grades", "btn_grades", "grades", "What are the current grades?"),
+    ("📅 Due This Week", "btn_upcoming", "upcoming", "What's due this week?"),
+    ("🏫 Attendance", "btn_attendance", "attendance", "How's the attendance?"),
+)
 
-def get_contextual_starters(summary: dict) -> list[dict]:
+# Dashboard badge classes, indexed by severity (see formatting.py)
+_BADGE_CLASSES = ("badge-success", "badge-warning", "badge-danger")
+# Shown instead of a status when there is nothing to rate (no attendance yet)
+_NO_DATA_EMOJI = "➖"
+_NO_DATA_BADGE_CLASS = "badge-neutral"
+
+
+# Conversation starters shown regardless of the student's data
+MAX_STARTERS = 6
+_OPENING_STARTERS = (
+    {"icon": "🎯", "text": "What should we prioritize this week?"},
+    {"icon": "📊", "text": "How is my child doing overall?"},
+)
+_CLOSING_STARTERS = (
+    {"icon": "✉️", "text": "Help me write an email to a teacher"},
+    {"icon": "💡", "text": "Suggest study strategies for middle school"},
+)
+_GOOD_ATTENDANCE_STARTER = {"icon": "🏫", "text": "Great attendance! How can we maintain it?"}
+
+
+def get_contextual_starters(summary: dict) -> tuple[dict, ...]:
     """Generate conversation starters based on student data.
 
     Creates dynamic conversation starter suggestions based on the student's
     current academic status, including attendance, missing assignments, etc.
+    The result is shared between calls; callers must not modify it.
 
     Args:
         summary: Dictionary containing student summary data with keys like
             'missing_assignments', 'attendance_rate', 'days_absent'.
 
     Returns:
-        List of up to 6 conversation starter dictionaries, each with
+        Tuple of up to 6 conversation starter dictionaries, each with
         'icon' (emoji) and 'text' (starter question) keys.
     """
-    starters = []
+    return _starters_for(
+        summary.get("missing_assignments", 0),
+        summary.get("attendance_rate", 100),
+        summary.get("days_absent", 0),
+    )
+
+
+@lru_cache(maxsize=256)
+def _starters_for(missing: int, attendance: float | None, days_absent: int) -> tuple[dict, ...]:
+    """Build the conversation starters for one set of summary values.
 
+    The result depends only on these three values, so it is cached.
+
+    Args:
+        missing: Number of missing assignments.
+        attendance: Attendance rate in percent, or None if not recorded.
+        days_absent: Number of days absent.
+
+    Returns:
+        Tuple of up to MAX_STARTERS starter dictionaries.
+    """
     # Always include general starters
-    starters.append({"icon": "🎯", "text": "What should we prioritize this week?"})
-    starters.append({"icon": "📊", "text": "How is my child doing overall?"})
+    starters = list(_OPENING_STARTERS)
 
     # Context-based starters
-    missing = summary.get("missing_assignments", 0)
     if missing > 0:
         starters.append(
             {
@@ -73,15 +140,15 @@ def get_contextual_starters(summary: dict) -> list[dict]:
             }
         )
 
-    attendance = summary.get("attendance_rate", 100)
-    if attendance < 90:
+    # None means no attendance has been recorded yet
+    severity = None if attendance is None else attendance_severity(attendance)
+    if severity == 2:
         starters.append(
             {"icon": "🏫", "text": f"Attendance is at {attendance}%. Should I be concerned?"}
         )
-    elif attendance >= 95:
-        starters.append({"icon": "🏫", "text": "Great attendance! How can we maintain it?"})
+    elif severity == 0:
+        starters.append(_GOOD_ATTENDANCE_STARTER)
 
-    days_absent = summary.get("days_absent", 0)
     if days_absent > 3:
         starters.append(
             {
@@ -90,28 +157,34 @@ def get_contextual_starters(summary: dict) -> list[dict]:
             }
         )
 
-    # Add helpful general starters
-    starters.append({"icon": "✉️", "text": "Help me write an email to a teacher"})
-    starters.append({"icon": "💡", "text": "Suggest study strategies for middle school"})
+    # Fill the remaining slots with helpful general starters
+    starters.extend(_CLOSING_STARTERS[: MAX_STARTERS - len(starters)])
+    return tuple(starters)
 
-    return starters[:6]  # Limit to 6 starters
 
+# App header shown on both the login page and the main app
+_APP_HEADER_HTML = """
+    <div class="app-header">
+        <h1 class="app-title">📚 SchoolPulse</h1>
+        <p class="app-subtitle">Your child's academic progress at a glance</p>
+    </div>
+    """
 
-def load_css() -> None:
-    """Load custom CSS from external file.
 
-    MED-2: Moves ~200 lines of inline CSS to an external file for better
-    maintainability. Falls back to minimal inline CSS if file not found.
+@st.cache_resource
+def _css_markup() -> str:
+    """Build the custom CSS style element once per process.
+
+    Returns:
+        <style> element with .streamlit/custom.css, or minimal fallback CSS
+        if the file is missing.
     """
     css_path = Path(__file__).parent / ".streamlit" / "custom.css"
     try:
         css_content = css_path.read_text()
-        st.markdown(f"<style>{css_content}</style>", unsafe_allow_html=True)
     except FileNotFoundError:
         # Minimal fallback CSS if external file is missing
-        st.markdown(
-            """
-            <style>
+        css_content = """
             .app-header {
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 padding: 2rem;
@@ -121,18 +194,49 @@ def load_css() -> None:
             }
             .app-title { font-size: 2.5rem; font-weight: 700; color: white; }
             .app-subtitle { font-size: 1.1rem; color: white; opacity: 0.95; }
-            </style>
-            """,
-            unsafe_allow_html=True,
-        )
+            """
+    return f"<style>{css_content}</style>"
+
+
+def load_css() -> None:
+    """Load custom CSS from external file.
+
+    MED-2: Moves ~200 lines of inline CSS to an external file for better
+    maintainability. Falls back to minimal inline CSS if file not found.
+    The file is read once per process; the style element is still emitted
+    on every run, since Streamlit removes elements a rerun does not repeat.
+    """
+    st.markdown(_css_markup(), unsafe_allow_html=True)
+
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def _load_student_summary(db_path: str, student_name: str, db_mtime: float | None) -> dict:
+    """Query the student summary; cached per database version.
+
+    Database errors are returned as an error dict so the failure is cached
+    too, rather than retried on every rerun until the database changes.
+
+    Args:
+        db_path: Path to the SQLite database.
+        student_name: Name of the student to look up.
+        db_mtime: Database modification time, part of the cache key only.
+
+    Returns:
+        Dictionary containing student summary data, or an 'error' key.
+    """
+    try:
+        return get_student_summary(db_path, student_name)
+    except sqlite3.Error as e:
+        logger.warning(f"Student summary query failed: {e}")
+        return {"error": str(e)}
 
 
-@st.cache_data(ttl=60)
 def get_cached_student_summary(db_path: str, student_name: str) -> dict:
     """Get student summary with caching.
 
-    MED-1: Caches expensive database queries for 60 seconds to reduce
-    load and improve responsiveness.
+    MED-1: Caches expensive database queries for up to 5 minutes to reduce
+    load and improve responsiveness. The cache is keyed on the database
+    file's modification time, so an updated database is picked up at once.
 
     Args:
         db_path: Path to the SQLite database.
@@ -141,34 +245,57 @@ def get_cached_student_summary(db_path: str, student_name: str) -> dict:
     Returns:
         Dictionary containing student summary data.
     """
-    return get_student_summary(db_path, student_name)
+    try:
+        db_mtime = os.path.getmtime(db_path)
+    except OSError:
+        db_mtime = None
+    return _load_student_summary(db_path, student_name, db_mtime)
+
+
+def invalidate_student_summaries() -> None:
+    """Drop all cached student summaries."""
+    _load_student_summary.clear()
 
 
 def add_message_to_buffer(
-    messages: list[dict[str, str]], role: str, content: str
-) -> list[dict[str, str]]:
+    messages: deque[dict[str, str]], role: str, content: str
+) -> deque[dict[str, str]]:
     """Add a message to the buffer, enforcing maximum size.
 
     HIGH-3: Implements circular buffer pattern - stores max 50 messages,
     removing oldest when limit is exceeded.
 
     Args:
-        messages: Current list of messages.
+        messages: Message buffer, a deque bounded to MAX_MESSAGES_STORED.
         role: Message role ('user' or 'assistant').
         content: Message content text.
 
     Returns:
-        Updated messages list with new message added and oldest
-        removed if buffer was at capacity.
+        The same buffer with the new message added; the deque's maxlen
+        evicts the oldest message if it was at capacity.
     """
     messages.append({"role": role, "content": content})
-    # Trim to max size if exceeded
-    if len(messages) > MAX_MESSAGES_STORED:
-        messages = messages[-MAX_MESSAGES_STORED:]
     return messages
 
 
-def get_messages_for_ai(messages: list[dict[str, str]]) -> list[dict[str, str]]:
+def _handle_quick_action(query_type: str, question: str) -> None:
+    """Answer a quick action button and add the exchange to the chat.
+
+    Args:
+        query_type: Quick query type passed to get_quick_response().
+        question: User question shown in the chat for this action.
+    """
+    response_text = format_quick_response(
+        get_quick_response(query_type, st.session_state.student_name)
+    )
+    messages = st.session_state.messages
+    add_message_to_buffer(messages, "user", question)
+    add_message_to_buffer(messages, "assistant", response_text)
+
+
+def get_messages_for_ai(
+    messages: Sequence[dict[str, str]], exclude_tail: int = 0
+) -> list[dict[str, str]]:
     """Get the most recent messages to send to AI.
 
     HIGH-3: Only sends the last 10 messages to the AI API to manage
@@ -176,11 +303,13 @@ def get_messages_for_ai(messages: list[dict[str, str]]) -> list[dict[str, str]]:
 
     Args:
         messages: Full message history from session state.
+        exclude_tail: Number of newest messages to leave out.
 
     Returns:
         List of the most recent messages (up to MAX_MESSAGES_TO_AI).
     """
-    return messages[-MAX_MESSAGES_TO_AI:] if messages else []
+    end = max(0, len(messages) - exclude_tail)
+    return list(islice(messages, max(0, end - MAX_MESSAGES_TO_AI), end))
 
 
 # Page configuration - mobile friendly
@@ -192,6 +321,18 @@ st.set_page_config(
 load_css()
 
 
+# Session state keys and factories for their initial values; factories so
+# each session gets its own message buffer
+_SESSION_DEFAULTS = (
+    ("messages", lambda: deque(maxlen=MAX_MESSAGES_STORED)),
+    ("history_summary", lambda: None),
+    ("model", lambda: DEFAULT_MODEL),
+    ("session_token", lambda: None),
+    ("authenticated", lambda: False),
+    ("user_info", lambda: None),
+)
+
+
 def init_session_state() -> None:
     """Initialize session state variables.
 
@@ -200,26 +341,17 @@ def init_session_state() -> None:
     AI model selection, and user information.
 
     Session State Keys:
-        messages: List of chat message dicts (role, content)
+        messages: Bounded deque of chat message dicts (role, content)
         model: Selected AI model identifier
         session_token: Authentication session token
         authenticated: Boolean authentication status
         user_info: Dict with user details and allowed students
+        history_summary: Rolling summary of chat messages older than those
+            sent to the AI
     """
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-
-    if "model" not in st.session_state:
-        st.session_state.model = DEFAULT_MODEL
-
-    if "session_token" not in st.session_state:
-        st.session_state.session_token = None
-
-    if "authenticated" not in st.session_state:
-        st.session_state.authenticated = False
-
-    if "user_info" not in st.session_state:
-        st.session_state.user_info = None
+    for key, make_default in _SESSION_DEFAULTS:
+        if key not in st.session_state:
+            st.session_state[key] = make_default()
 
 
 def handle_login() -> None:
@@ -232,15 +364,7 @@ def handle_login() -> None:
     HIGH-4: Uses dynamic student selection from auth context instead of
     hardcoded values.
     """
-    st.markdown(
-        """
-    <div class="app-header">
-        <h1 class="app-title">📚 SchoolPulse</h1>
-        <p class="app-subtitle">Your child's academic progress at a glance</p>
-    </div>
-    """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(_APP_HEADER_HTML, unsafe_allow_html=True)
 
     result = render_login_page()
 
@@ -272,7 +396,9 @@ def handle_logout() -> None:
     st.session_state.session_token = None
     st.session_state.authenticated = False
     st.session_state.user_info = None
-    st.session_state.messages = []
+    st.session_state.messages.clear()
+    st.session_state.history_summary = None
+    invalidate_student_summaries()
     st.rerun()
 
 
@@ -294,149 +420,86 @@ def validate_current_session() -> bool:
         st.session_state.user_info = None
         return False
 
-    # Refresh session on activity
-    refresh_session(token)
+    # Refresh session on activity (throttled, since every interaction reruns)
+    refresh_session(token, min_interval=ACTIVITY_REFRESH_SECONDS)
     return True
 
 
-def format_quick_response(result: dict) -> str:
-    """Format a quick response result with enhanced visual styling.
+# Welcome screen cards; the indentation inside the strings is part of the HTML sent
+_WELCOME_CARD_HTML = """
+            <div style="background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+                        padding: 2rem;
+                        border-radius: 15px;
+                        border-left: 5px solid #667eea;
+                        box-shadow: 0 4px 15px rgba(0,0,0,0.1);">
+                <h3 style="color: #667eea; margin-top: 0;">👋 Welcome to SchoolPulse!</h3>
+                <p style="font-size: 1.1rem; margin-bottom: 1.5rem;">
+                    Here's a quick overview for <strong>{name}</strong>:
+                </p>
+                <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem;">
+                    <div style="background: white; padding: 1rem; border-radius: 10px; text-align: center;">
+                        <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.5rem;">📚 Courses</div>
+                        <div style="font-size: 1.8rem; font-weight: 700; color: #667eea;">{course_count}</div>
+                    </div>
+                    <div style="background: white; padding: 1rem; border-radius: 10px; text-align: center;">
+                        <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.5rem;">📝 Missing Work</div>
+                        <div style="font-size: 1.8rem; font-weight: 700; color: #667eea;">{missing_emoji} {missing}</div>
+                    </div>
+                    <div style="background: white; padding: 1rem; border-radius: 10px; text-align: center;">
+                        <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.5rem;">🏫 Attendance</div>
+                        <div style="font-size: 1.8rem; font-weight: 700; color: #667eea;">{attendance_emoji} {attendance}</div>
+                    </div>
+                </div>
+                <p style="margin-top: 1.5rem; margin-bottom: 0; font-size: 1rem; color: #555;">
+                    💡 <strong>Tip:</strong> Use the quick action buttons above or try the conversation starters below!
+                </p>
+            </div>
+            """
+_WELCOME_FALLBACK_HTML = """
+            <div style="background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
+                        padding: 2rem;
+                        border-radius: 15px;
+                        border-left: 5px solid #667eea;
+                        box-shadow: 0 4px 15px rgba(0,0,0,0.1);">
+                <h3 style="color: #667eea; margin-top: 0;">👋 Welcome to SchoolPulse!</h3>
+                <p style="font-size: 1.1rem;">
+                    Your intelligent assistant for tracking your child's academic progress.
+                </p>
+                <p style="margin-bottom: 0;">
+                    💡 Use the quick action buttons above or ask me about your child's progress!
+                </p>
+            </div>
+            """
+
 
-    Converts raw data from quick action queries into formatted markdown
-    with visual enhancements like colored badges, tables, and status
-    indicators.
+@lru_cache(maxsize=64)
+def _welcome_card_html(
+    name: str, course_count: int, missing: int, attendance_rate: float | None
+) -> str:
+    """Render the welcome card with the student's overview.
 
     Args:
-        result: Dictionary containing query results with 'title' and 'data'
-            keys, or an 'error' key if the query failed.
+        name: Student name to greet.
+        course_count: Number of courses.
+        missing: Number of missing assignments.
+        attendance_rate: Attendance rate in percent, or None if not recorded.
 
     Returns:
-        Formatted markdown string ready for display in the chat interface.
+        HTML for the welcome card.
     """
-    if "error" in result:
-        return f"❌ **Error:** {result['error']}"
-
-    title = result.get("title", "Results")
-    data = result.get("data", [])
-
-    output = f"### 📋 {title}\n\n"
-
-    if title == "Missing Assignments":
-        if not data:
-            output += """
-<div style="background: linear-gradient(135deg, #10b981 0%, #059669 100%);
-            color: white;
-            padding: 1.5rem;
-            border-radius: 12px;
-            text-align: center;
-            font-size: 1.1rem;
-            font-weight: 600;
-            box-shadow: 0 4px 15px rgba(16, 185, 129, 0.3);">
-    ✅ No missing assignments! Excellent work!
-</div>
-"""
-        else:
-            output += "<div style='background: #fef3c7; padding: 1rem; border-radius: 10px; border-left: 4px solid #f59e0b; margin-bottom: 1rem;'>"
-            output += f"<strong>⚠️ Found {len(data)} missing assignment(s)</strong></div>\n\n"
-            for i, item in enumerate(data, 1):
-                output += f"**{i}. {item['assignment_name']}**\n"
-                output += f"- 📚 Course: `{item['course_name']}`\n"
-                output += f"- 👨‍🏫 Teacher: {item.get('teacher_name', 'N/A')}\n"
-                output += f"- 📅 Due: {item.get('due_date', 'N/A')}\n\n"
-
-    elif title == "Current Grades":
-        if not data:
-            output += "📊 No grade data available."
-        else:
-            output += "| Course | Teacher | Grade |\n"
-            output += "|--------|---------|-------|\n"
-            for item in data:
-                grade = item.get("letter_grade") or item.get("percent") or "N/A"
-                percent = f" ({item['percent']}%)" if item.get("percent") else ""
-                teacher = item.get("teacher_name", "N/A")
-                output += f"| {item['course_name']} | {teacher} | **{grade}**{percent} |\n"
-
-    elif title == "Attendance Summary":
-        if isinstance(data, dict) and "error" not in data:
-            rate = data.get("rate", 0)
-
-            if rate >= 95:
-                bg_color = "#10b981"
-                status_emoji = "✅"
-                status_text = "Excellent"
-            elif rate >= 90:
-                bg_color = "#f59e0b"
-                status_emoji = "⚠️"
-                status_text = "Good"
-            else:
-                bg_color = "#ef4444"
-                status_emoji = "🔴"
-                status_text = "Needs Attention"
-
-            output += f"""
-<div style="background: linear-gradient(135deg, {bg_color} 0%, {bg_color}dd 100%);
-            color: white;
-            padding: 1.5rem;
-            border-radius: 12px;
-            margin-bottom: 1rem;
-            box-shadow: 0 4px 15px rgba(0,0,0,0.2);">
-    <div style="font-size: 1.5rem; font-weight: 700; margin-bottom: 0.5rem;">
-        {status_emoji} {rate}% Attendance Rate
-    </div>
-    <div style="font-size: 1rem; opacity: 0.95;">
-        Status: {status_text}
-    </div>
-</div>
-"""
-            output += "\n**📊 Details:**\n"
-            output += f"- Days Absent: `{data.get('days_absent', 0)}`\n"
-            output += f"- Tardies: `{data.get('tardies', 0)}`\n"
-            output += f"- Total School Days: `{data.get('total_days', 0)}`\n"
-
-            if rate < 90:
-                output += "\n> ⚠️ **Note:** Attendance is below 90%. Consider reviewing attendance records."
-        else:
-            output += "No attendance data available."
-
-    elif title == "Due This Week":
-        if not data:
-            output += """
-<div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 1.5rem;
-            border-radius: 12px;
-            text-align: center;
-            font-size: 1.1rem;
-            font-weight: 600;
-            box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);">
-    📅 No assignments due this week! Enjoy your free time!
-</div>
-"""
-        else:
-            output += "<div style='background: #dbeafe; padding: 1rem; border-radius: 10px; border-left: 4px solid #3b82f6; margin-bottom: 1rem;'>"
-            output += f"<strong>📌 {len(data)} assignment(s) coming up</strong></div>\n\n"
-            for i, item in enumerate(data, 1):
-                output += f"**{i}. {item['assignment_name']}**\n"
-                output += f"- 📚 Course: `{item['course_name']}`\n"
-                output += f"- 📅 Due: {item.get('due_date', 'N/A')}\n\n"
-
-    elif title == "Student Summary":
-        if isinstance(data, dict) and "error" not in data:
-            output += f"### 👨‍🎓 {data.get('name', 'Student')} - Grade {data.get('grade_level', 'N/A')}\n\n"
-
-            missing = data.get("missing_assignments", 0)
-            attendance = data.get("attendance_rate", 0)
-
-            output += "| Metric | Value |\n"
-            output += "|--------|-------|\n"
-            output += f"| 📚 Courses | {data.get('course_count', 0)} |\n"
-            output += f"| 📝 Missing Work | {missing} |\n"
-            output += f"| 🏫 Attendance | {attendance}% |\n"
-            output += f"| 📅 Days Absent | {data.get('days_absent', 0)} |\n"
-        else:
-            output += "Unable to retrieve student summary."
-
-    return output
+    if attendance_rate is None:
+        attendance_emoji, attendance = _NO_DATA_EMOJI, "N/A"
+    else:
+        attendance_emoji = STATUS_EMOJIS[attendance_severity(attendance_rate)]
+        attendance = f"{attendance_rate}%"
+    return _WELCOME_CARD_HTML.format(
+        name=name,
+        course_count=course_count,
+        missing_emoji=STATUS_EMOJIS[missing_severity(missing)],
+        missing=missing,
+        attendance_emoji=attendance_emoji,
+        attendance=attendance,
+    )
 
 
 def render_main_app() -> None:
@@ -470,15 +533,7 @@ def render_main_app() -> None:
     api_key = get_api_key()
 
     # Header
-    st.markdown(
-        """
-    <div class="app-header">
-        <h1 class="app-title">📚 SchoolPulse</h1>
-        <p class="app-subtitle">Your child's academic progress at a glance</p>
-    </div>
-    """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(_APP_HEADER_HTML, unsafe_allow_html=True)
 
     # Sidebar for settings
     with st.sidebar:
@@ -500,18 +555,11 @@ def render_main_app() -> None:
         st.divider()
 
         # Model selection
-        model_options = list(AVAILABLE_MODELS.keys())
-        current_index = (
-            model_options.index(st.session_state.model)
-            if st.session_state.model in model_options
-            else 0
-        )
-
         selected_model = st.selectbox(
             "AI Model",
-            options=model_options,
-            format_func=lambda x: AVAILABLE_MODELS[x],
-            index=current_index,
+            options=_MODEL_OPTIONS,
+            format_func=AVAILABLE_MODELS.__getitem__,
+            index=_MODEL_INDEX.get(st.session_state.model, 0),
             help="Select the Claude model to use",
         )
         if selected_model != st.session_state.model:
@@ -522,19 +570,19 @@ def render_main_app() -> None:
         # Student selection (only show students the user has access to)
         allowed_students = get_current_user_students(user_info)
         if len(allowed_students) > 1:
+            student_index = {name: i for i, name in enumerate(allowed_students)}
             student_input = st.selectbox(
                 "Select Student",
                 options=allowed_students,
-                index=allowed_students.index(st.session_state.student_name)
-                if st.session_state.student_name in allowed_students
-                else 0,
+                index=student_index.get(st.session_state.student_name, 0),
                 help="Select which student to view",
             )
             if student_input != st.session_state.student_name:
                 # Verify access (FERPA authorization)
                 if can_access_student(user_info["user_id"], student_input):
                     st.session_state.student_name = student_input
-                    st.session_state.messages = []  # Clear chat for new student
+                    st.session_state.messages.clear()  # Clear chat for new student
+                    st.session_state.history_summary = None
                 else:
                     st.error("Access denied to this student.")
         else:
@@ -543,7 +591,10 @@ def render_main_app() -> None:
         st.divider()
 
         if st.button("🗑️ Clear Chat", use_container_width=True):
-            st.session_state.messages = []
+            st.session_state.messages.clear()
+            st.session_state.history_summary = None
+            # Also reload the dashboard data
+            invalidate_student_summaries()
             st.rerun()
 
     # Check API key
@@ -584,13 +635,7 @@ def render_main_app() -> None:
 
             with col2:
                 missing = summary.get("missing_assignments", 0)
-                badge_class = (
-                    "badge-success"
-                    if missing == 0
-                    else "badge-warning"
-                    if missing < 3
-                    else "badge-danger"
-                )
+                badge_class = _BADGE_CLASSES[missing_severity(missing)]
                 st.markdown(
                     f"""
                 <div class="metric-card">
@@ -602,19 +647,18 @@ def render_main_app() -> None:
                 )
 
             with col3:
-                attendance_rate = summary.get("attendance_rate", 0)
-                badge_class = (
-                    "badge-success"
-                    if attendance_rate >= 95
-                    else "badge-warning"
-                    if attendance_rate >= 90
-                    else "badge-danger"
-                )
+                attendance_rate = summary.get("attendance_rate")
+                if attendance_rate is None:
+                    # No attendance has been recorded yet
+                    badge_class, attendance = _NO_DATA_BADGE_CLASS, "N/A"
+                else:
+                    badge_class = _BADGE_CLASSES[attendance_severity(attendance_rate)]
+                    attendance = f"{attendance_rate}%"
                 st.markdown(
                     f"""
                 <div class="metric-card">
                     <div class="metric-label">🏫 Attendance</div>
-                    <div class="metric-value"><span class="badge {badge_class}">{attendance_rate}%</span></div>
+                    <div class="metric-value"><span class="badge {badge_class}">{attendance}</span></div>
                 </div>
                 """,
                     unsafe_allow_html=True,
@@ -633,59 +677,21 @@ def render_main_app() -> None:
                 )
 
             st.markdown("<br>", unsafe_allow_html=True)
-    except Exception:
-        pass
+    except (OSError, KeyError) as e:
+        # E.g. the connection pool timing out; not cached, retried next run
+        logger.warning(f"Dashboard unavailable: {e}")
 
     # Quick action buttons
     st.markdown("### ⚡ Quick Actions")
     col1, col2 = st.columns(2)
 
     # Quick action handlers use message buffer (HIGH-3)
-    with col1:
-        if st.button("📝 Missing Work", use_container_width=True, key="btn_missing"):
-            result = get_quick_response("missing", st.session_state.student_name)
-            response_text = format_quick_response(result)
-            st.session_state.messages = add_message_to_buffer(
-                st.session_state.messages, "user", "What are the missing assignments?"
-            )
-            st.session_state.messages = add_message_to_buffer(
-                st.session_state.messages, "assistant", response_text
-            )
-            st.rerun()
-
-        if st.button("📊 Current Grades", use_container_width=True, key="btn_grades"):
-            result = get_quick_response("grades", st.session_state.student_name)
-            response_text = format_quick_response(result)
-            st.session_state.messages = add_message_to_buffer(
-                st.session_state.messages, "user", "What are the current grades?"
-            )
-            st.session_state.messages = add_message_to_buffer(
-                st.session_state.messages, "assistant", response_text
-            )
-            st.rerun()
-
-    with col2:
-        if st.button("📅 Due This Week", use_container_width=True, key="btn_upcoming"):
-            result = get_quick_response("upcoming", st.session_state.student_name)
-            response_text = format_quick_response(result)
-            st.session_state.messages = add_message_to_buffer(
-                st.session_state.messages, "user", "What's due this week?"
-            )
-            st.session_state.messages = add_message_to_buffer(
-                st.session_state.messages, "assistant", response_text
-            )
-            st.rerun()
-
-        if st.button("🏫 Attendance", use_container_width=True, key="btn_attendance"):
-            result = get_quick_response("attendance", st.session_state.student_name)
-            response_text = format_quick_response(result)
-            st.session_state.messages = add_message_to_buffer(
-                st.session_state.messages, "user", "How's the attendance?"
-            )
-            st.session_state.messages = add_message_to_buffer(
-                st.session_state.messages, "assistant", response_text
-            )
-            st.rerun()
+    columns = (col1, col1, col2, col2)
+    for column, (label, key, query_type, question) in zip(columns, _QUICK_ACTIONS):
+        with column:
+            if st.button(label, use_container_width=True, key=key):
+                _handle_quick_action(query_type, question)
+                st.rerun()
 
     st.divider()
 
@@ -698,7 +704,11 @@ def render_main_app() -> None:
             st.markdown(message["content"], unsafe_allow_html=True)
 
     # Chat input (HIGH-3: uses message buffer)
-    if prompt := st.chat_input("💭 Ask about your child's progress..."):
+    # Starter questions are queued by their buttons and answered like typed ones
+    prompt = st.chat_input("💭 Ask about your child's progress...")
+    if not prompt:
+        prompt = st.session_state.pop("pending_prompt", None)
+    if prompt:
         # Add user message to buffer
         st.session_state.messages = add_message_to_buffer(st.session_state.messages, "user", prompt)
 
@@ -708,24 +718,39 @@ def render_main_app() -> None:
 
         # Get AI response (HIGH-3: only send last 10 messages to AI)
         with st.chat_message("assistant"):
-            with st.spinner("🔍 Looking up..."):
-                if not api_key:
-                    response = (
-                        "⚠️ Please configure your Anthropic API key in secrets or environment."
-                    )
-                else:
-                    # Get limited message history for AI context
-                    messages_for_ai = get_messages_for_ai(
-                        st.session_state.messages[:-1]  # Exclude the message we just added
-                    )
-                    response = get_ai_response(
+            # Get limited message history for AI context, excluding the
+            # message we just added
+            messages_for_ai = get_messages_for_ai(st.session_state.messages, exclude_tail=1)
+            # Simple opening questions are answered straight from the database
+            quick_intent = None if messages_for_ai else classify_quick_intent(prompt)
+            if quick_intent:
+                response = format_quick_response(
+                    get_quick_response(quick_intent, st.session_state.student_name)
+                )
+                st.markdown(response, unsafe_allow_html=True)
+            elif not api_key:
+                response = "⚠️ Please configure your Anthropic API key in secrets or environment."
+                st.markdown(response)
+            else:
+                # Fold older messages into a short summary once the history
+                # grows long, instead of dropping them
+                earlier = list(
+                    islice(st.session_state.messages, len(st.session_state.messages) - 1)
+                )
+                st.session_state.history_summary = compact_history(
+                    earlier, st.session_state.history_summary, api_key
+                )
+                # Stream the answer so text appears as soon as it is generated
+                response = st.write_stream(
+                    stream_ai_response(
                         prompt,
                         {"student_name": st.session_state.student_name},
                         messages_for_ai,
                         api_key,
                         st.session_state.model,
+                        st.session_state.history_summary,
                     )
-            st.markdown(response)
+                )
 
         # Add assistant response to buffer
         st.session_state.messages = add_message_to_buffer(
@@ -741,49 +766,17 @@ def render_main_app() -> None:
             db_path = get_db_path()
             # MED-1: Use cached student summary
             summary = get_cached_student_summary(db_path, st.session_state.student_name)
-        except Exception:
-            pass  # summary remains None, will show fallback
+        except (OSError, KeyError) as e:
+            logger.warning(f"Student summary unavailable: {e}")  # will show fallback
 
         if summary and "error" not in summary:
-            attendance_rate = summary.get("attendance_rate", 0)
-            missing = summary.get("missing_assignments", 0)
-
-            # Status emojis
-            attendance_emoji = (
-                "✅" if attendance_rate >= 95 else "⚠️" if attendance_rate >= 90 else "🔴"
-            )
-            missing_emoji = "✅" if missing == 0 else "⚠️" if missing < 3 else "🔴"
-
             st.markdown(
-                f"""
-            <div style="background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-                        padding: 2rem;
-                        border-radius: 15px;
-                        border-left: 5px solid #667eea;
-                        box-shadow: 0 4px 15px rgba(0,0,0,0.1);">
-                <h3 style="color: #667eea; margin-top: 0;">👋 Welcome to SchoolPulse!</h3>
-                <p style="font-size: 1.1rem; margin-bottom: 1.5rem;">
-                    Here's a quick overview for <strong>{summary.get("name", "your student")}</strong>:
-                </p>
-                <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem;">
-                    <div style="background: white; padding: 1rem; border-radius: 10px; text-align: center;">
-                        <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.5rem;">📚 Courses</div>
-                        <div style="font-size: 1.8rem; font-weight: 700; color: #667eea;">{summary.get("course_count", 0)}</div>
-                    </div>
-                    <div style="background: white; padding: 1rem; border-radius: 10px; text-align: center;">
-                        <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.5rem;">📝 Missing Work</div>
-                        <div style="font-size: 1.8rem; font-weight: 700; color: #667eea;">{missing_emoji} {missing}</div>
-                    </div>
-                    <div style="background: white; padding: 1rem; border-radius: 10px; text-align: center;">
-                        <div style="font-size: 0.9rem; color: #666; margin-bottom: 0.5rem;">🏫 Attendance</div>
-                        <div style="font-size: 1.8rem; font-weight: 700; color: #667eea;">{attendance_emoji} {attendance_rate}%</div>
-                    </div>
-                </div>
-                <p style="margin-top: 1.5rem; margin-bottom: 0; font-size: 1rem; color: #555;">
-                    💡 <strong>Tip:</strong> Use the quick action buttons above or try the conversation starters below!
-                </p>
-            </div>
-            """,
+                _welcome_card_html(
+                    summary.get("name", "your student"),
+                    summary.get("course_count", 0),
+                    summary.get("missing_assignments", 0),
+                    summary.get("attendance_rate"),
+                ),
                 unsafe_allow_html=True,
             )
 
@@ -803,45 +796,12 @@ def render_main_app() -> None:
                                 key=f"starter_{i + j}",
                                 use_container_width=True,
                             ):
-                                # Add user message to buffer (HIGH-3)
-                                st.session_state.messages = add_message_to_buffer(
-                                    st.session_state.messages, "user", starter["text"]
-                                )
-                                # Get AI response
-                                if api_key:
-                                    response = get_ai_response(
-                                        starter["text"],
-                                        {"student_name": st.session_state.student_name},
-                                        [],  # No history for first message
-                                        api_key,
-                                        st.session_state.model,
-                                    )
-                                else:
-                                    response = "Please configure your Anthropic API key in secrets or environment."
-                                # Add response to buffer (HIGH-3)
-                                st.session_state.messages = add_message_to_buffer(
-                                    st.session_state.messages, "assistant", response
-                                )
+                                # Answer it through the chat input flow on the
+                                # next run, so the response streams in
+                                st.session_state.pending_prompt = starter["text"]
                                 st.rerun()
         else:
-            st.markdown(
-                """
-            <div style="background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-                        padding: 2rem;
-                        border-radius: 15px;
-                        border-left: 5px solid #667eea;
-                        box-shadow: 0 4px 15px rgba(0,0,0,0.1);">
-                <h3 style="color: #667eea; margin-top: 0;">👋 Welcome to SchoolPulse!</h3>
-                <p style="font-size: 1.1rem;">
-                    Your intelligent assistant for tracking your child's academic progress.
-                </p>
-                <p style="margin-bottom: 0;">
-                    💡 Use the quick action buttons above or ask me about your child's progress!
-                </p>
-            </div>
-            """,
-                unsafe_allow_html=True,
-            )
+            st.markdown(_WELCOME_FALLBACK_HTML, unsafe_allow_html=True)
 
 
 # Main entry point
@@ -343,6 +343,24 @@ def mock_anthropic_client(mock_ai_responses: dict):
     return mock_client
 
 
+@pytest.fixture(autouse=True)
+def clear_ai_response_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Generator[None, None, None]:
+    """Clear cached AI responses and clients so each test reaches the mocked client."""
+    from ai_assistant import _close_clients, clear_response_cache, clear_tool_cache
+    from semantic_cache import SemanticCache
+
+    monkeypatch.setattr("ai_assistant._semantic_cache", SemanticCache(tmp_path / "cache.db"))
+    clear_response_cache()
+    clear_tool_cache()
+    _close_clients()
+    yield
+    clear_response_cache()
+    clear_tool_cache()
+    _close_clients()
+
+
 @pytest.fixture
 def mock_ai_assistant(mock_anthropic_client, mock_ai_responses: dict):
     """Provide a patched AI assistant module for testing.
@@ -385,7 +403,7 @@ def mock_session_state(primary_student: dict) -> dict:
         "student_name": primary_student.get("first_name", "TestStudent"),
         "messages": [],
         "api_key": "test-api-key",
-        "selected_model": "claude-haiku-3-5-20241022",
+        "selected_model": "claude-3-5-haiku-20241022",
     }
 
 
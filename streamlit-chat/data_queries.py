@@ -10,15 +10,20 @@ Addresses:
 - CRIT-5: Connection pooling via RepositoryAdapter's get_db() context manager
 """
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 from repository_adapter import RepositoryAdapter
 
 
+@lru_cache(maxsize=8)
 def _get_adapter(db_path: str) -> RepositoryAdapter:
     """Get a RepositoryAdapter instance for the given database path.
 
+    Adapters hold nothing but their path, so one is shared per path instead
+    of being built for every query.
+
     Args:
         db_path: Path to the SQLite database file.
 
@@ -0,0 +1,185 @@
+"""Formatting of quick query results for the chat.
+
+Shared by the Streamlit app (quick action buttons, dashboard badges) and
+the AI assistant, which answers simple opening questions with these
+templates instead of calling Claude.
+"""
+
+from bisect import bisect_right
+
+# Status levels shared by the dashboard, welcome card and quick responses,
+# indexed by severity: 0 = good, 1 = warning, 2 = needs attention
+_ATTENDANCE_THRESHOLDS = (90, 95)  # Lower bounds of "good" and "excellent"
+_MISSING_THRESHOLDS = (1, 3)  # Lower bounds of "warning" and "needs attention"
+STATUS_EMOJIS = ("✅", "⚠️", "🔴")
+_ATTENDANCE_STYLES = (  # (card color, status text)
+    ("#10b981", "Excellent"),
+    ("#f59e0b", "Good"),
+    ("#ef4444", "Needs Attention"),
+)
+
+
+def attendance_severity(rate: float) -> int:
+    """Classify an attendance rate as 0 (>= 95%), 1 (>= 90%) or 2 (below)."""
+    return len(_ATTENDANCE_THRESHOLDS) - bisect_right(_ATTENDANCE_THRESHOLDS, rate)
+
+
+def missing_severity(missing: int) -> int:
+    """Classify a missing assignment count as 0 (none), 1 (1-2) or 2 (3+)."""
+    return bisect_right(_MISSING_THRESHOLDS, missing)
+
+
+# HTML blocks for format_quick_response, built once at import
+_NO_MISSING_HTML = """
+<div style="background: linear-gradient(135deg, #10b981 0%, #059669 100%);
+            color: white;
+            padding: 1.5rem;
+            border-radius: 12px;
+            text-align: center;
+            font-size: 1.1rem;
+            font-weight: 600;
+            box-shadow: 0 4px 15px rgba(16, 185, 129, 0.3);">
+    ✅ No missing assignments! Excellent work!
+</div>
+"""
+_MISSING_BANNER_HTML = (
+    "<div style='background: #fef3c7; padding: 1rem; border-radius: 10px; "
+    "border-left: 4px solid #f59e0b; margin-bottom: 1rem;'>"
+    "<strong>⚠️ Found {count} missing assignment(s)</strong></div>\n\n"
+)
+_ATTENDANCE_CARD_HTML = """
+<div style="background: linear-gradient(135deg, {bg_color} 0%, {bg_color}dd 100%);
+            color: white;
+            padding: 1.5rem;
+            border-radius: 12px;
+            margin-bottom: 1rem;
+            box-shadow: 0 4px 15px rgba(0,0,0,0.2);">
+    <div style="font-size: 1.5rem; font-weight: 700; margin-bottom: 0.5rem;">
+        {status_emoji} {rate}% Attendance Rate
+    </div>
+    <div style="font-size: 1rem; opacity: 0.95;">
+        Status: {status_text}
+    </div>
+</div>
+"""
+_NO_UPCOMING_HTML = """
+<div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 1.5rem;
+            border-radius: 12px;
+            text-align: center;
+            font-size: 1.1rem;
+            font-weight: 600;
+            box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);">
+    📅 No assignments due this week! Enjoy your free time!
+</div>
+"""
+_UPCOMING_BANNER_HTML = (
+    "<div style='background: #dbeafe; padding: 1rem; border-radius: 10px; "
+    "border-left: 4px solid #3b82f6; margin-bottom: 1rem;'>"
+    "<strong>📌 {count} assignment(s) coming up</strong></div>\n\n"
+)
+
+
+def format_quick_response(result: dict) -> str:
+    """Format a quick response result with enhanced visual styling.
+
+    Converts raw data from quick action queries into formatted markdown
+    with visual enhancements like colored badges, tables, and status
+    indicators.
+
+    Args:
+        result: Dictionary containing query results with 'title' and 'data'
+            keys, or an 'error' key if the query failed.
+
+    Returns:
+        Formatted markdown string ready for display in the chat interface.
+    """
+    if "error" in result:
+        return f"❌ **Error:** {result['error']}"
+
+    title = result.get("title", "Results")
+    data = result.get("data", [])
+
+    # Collected and joined once rather than concatenated piece by piece
+    parts = [f"### 📋 {title}\n\n"]
+
+    if title == "Missing Assignments":
+        if not data:
+            parts.append(_NO_MISSING_HTML)
+        else:
+            parts.append(_MISSING_BANNER_HTML.format(count=len(data)))
+            for i, item in enumerate(data, 1):
+                parts.append(
+                    f"**{i}. {item['assignment_name']}**\n"
+                    f"- 📚 Course: `{item['course_name']}`\n"
+                    f"- 👨‍🏫 Teacher: {item.get('teacher_name', 'N/A')}\n"
+                    f"- 📅 Due: {item.get('due_date', 'N/A')}\n\n"
+                )
+
+    elif title == "Current Grades":
+        if not data:
+            parts.append("📊 No grade data available.")
+        else:
+            parts.append("| Course | Teacher | Grade |\n|--------|---------|-------|\n")
+            for item in data:
+                grade = item.get("letter_grade") or item.get("percent") or "N/A"
+                percent = f" ({item['percent']}%)" if item.get("percent") else ""
+                teacher = item.get("teacher_name", "N/A")
+                parts.append(f"| {item['course_name']} | {teacher} | **{grade}**{percent} |\n")
+
+    elif title == "Attendance Summary":
+        if isinstance(data, dict) and "error" not in data:
+            rate = data.get("rate", 0)
+            severity = attendance_severity(rate)
+            bg_color, status_text = _ATTENDANCE_STYLES[severity]
+
+            parts.append(
+                _ATTENDANCE_CARD_HTML.format(
+                    bg_color=bg_color,
+                    status_emoji=STATUS_EMOJIS[severity],
+                    rate=rate,
+                    status_text=status_text,
+                )
+            )
+            parts.append(
+                "\n**📊 Details:**\n"
+                f"- Days Absent: `{data.get('days_absent', 0)}`\n"
+                f"- Tardies: `{data.get('tardies', 0)}`\n"
+                f"- Total School Days: `{data.get('total_days', 0)}`\n"
+            )
+
+            if severity == 2:
+                parts.append(
+                    "\n> ⚠️ **Note:** Attendance is below 90%. Consider reviewing attendance records."
+                )
+        else:
+            parts.append("No attendance data available.")
+
+    elif title == "Due This Week":
+        if not data:
+            parts.append(_NO_UPCOMING_HTML)
+        else:
+            parts.append(_UPCOMING_BANNER_HTML.format(count=len(data)))
+            for i, item in enumerate(data, 1):
+                parts.append(
+                    f"**{i}. {item['assignment_name']}**\n"
+                    f"- 📚 Course: `{item['course_name']}`\n"
+                    f"- 📅 Due: {item.get('due_date', 'N/A')}\n\n"
+                )
+
+    elif title == "Student Summary":
+        if isinstance(data, dict) and "error" not in data:
+            parts.append(
+                f"### 👨‍🎓 {data.get('name', 'Student')} - Grade {data.get('grade_level', 'N/A')}\n\n"
+                "| Metric | Value |\n"
+                "|--------|-------|\n"
+                f"| 📚 Courses | {data.get('course_count', 0)} |\n"
+                f"| 📝 Missing Work | {data.get('missing_assignments', 0)} |\n"
+                f"| 🏫 Attendance | {data.get('attendance_rate', 0)}% |\n"
+                f"| 📅 Days Absent | {data.get('days_absent', 0)} |\n"
+            )
+        else:
+            parts.append("Unable to retrieve student summary.")
+
+    return "".join(parts)
@@ -30,6 +30,10 @@ MAX_NAME_LENGTH = 100
 _POOL_SIZE = 5
 _POOL_TIMEOUT = 30.0
 
+# Page cache per connection in KiB (negative values are KiB for SQLite), so
+# pooled connections keep hot pages across the queries of a tool loop
+_CACHE_SIZE_KIB = 20000
+
 
 def escape_like_pattern(value: str) -> str:
     """Escape special characters in LIKE pattern values.
@@ -100,7 +104,8 @@ class ConnectionPool:
     """Thread-safe SQLite connection pool for the Streamlit chat app.
 
     Provides connection pooling to reduce connection overhead and
-    enable efficient concurrent access.
+    enable efficient concurrent access. Connections are opened lazily, up to
+    pool_size at a time, and reused for the life of the process.
     """
 
     def __init__(self, db_path: Path, pool_size: int = 5, timeout: float = 30.0):
@@ -116,6 +121,8 @@ class ConnectionPool:
         self._timeout = timeout
         self._pool: Queue[sqlite3.Connection] = Queue(maxsize=pool_size)
         self._lock = Lock()
+        # Connections opened and not yet closed, whether idle or checked out
+        self._open_count = 0
 
     def _create_connection(self) -> sqlite3.Connection:
         """Create a new database connection with optimal settings.
@@ -135,12 +142,34 @@ class ConnectionPool:
         conn.execute("PRAGMA foreign_keys = ON")
         conn.execute("PRAGMA busy_timeout = 5000")
         conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{_CACHE_SIZE_KIB}")
 
         return conn
 
+    def _open_connection(self) -> Optional[sqlite3.Connection]:
+        """Open a new connection if the pool is below its size limit.
+
+        Returns:
+            New connection, or None if pool_size connections are already open.
+        """
+        with self._lock:
+            if self._open_count >= self._pool_size:
+                return None
+            self._open_count += 1
+        try:
+            return self._create_connection()
+        except Exception:
+            with self._lock:
+                self._open_count -= 1
+            raise
+
     def get_connection(self) -> sqlite3.Connection:
         """Get a connection from the pool.
 
+        An idle connection is reused if there is one, otherwise a new one is
+        opened while fewer than pool_size exist. Only when every connection
+        is checked out does this wait for one to be returned.
+
         Returns:
             SQLite connection from the pool.
 
@@ -148,20 +177,23 @@ class ConnectionPool:
             TimeoutError: If no connection available within timeout.
         """
         try:
-            conn = self._pool.get(block=True, timeout=self._timeout)
-            # Verify connection is still valid
-            try:
-                conn.execute("SELECT 1")
-                return conn
-            except sqlite3.Error:
-                # Connection is dead, create a new one
-                return self._create_connection()
+            conn = self._pool.get_nowait()
         except Empty:
-            # Pool is empty, try to create a new connection
-            with self._lock:
-                if self._pool.qsize() < self._pool_size:
-                    return self._create_connection()
-            raise TimeoutError(f"Connection pool exhausted after {self._timeout}s")
+            new_conn = self._open_connection()
+            if new_conn is not None:
+                return new_conn
+            try:
+                conn = self._pool.get(block=True, timeout=self._timeout)
+            except Empty:
+                raise TimeoutError(f"Connection pool exhausted after {self._timeout}s") from None
+
+        # Verify connection is still valid
+        try:
+            conn.execute("SELECT 1")
+            return conn
+        except sqlite3.Error:
+            # Connection is dead, replace it (the open count is unchanged)
+            return self._create_connection()
 
     def return_connection(self, conn: sqlite3.Connection) -> None:
         """Return a connection to the pool.
@@ -173,6 +205,8 @@ class ConnectionPool:
             self._pool.put_nowait(conn)
         except Exception:
             # Pool is full, close the connection
+            with self._lock:
+                self._open_count -= 1
             try:
                 conn.close()
             except sqlite3.Error:
@@ -183,8 +217,13 @@ class ConnectionPool:
         while not self._pool.empty():
             try:
                 conn = self._pool.get_nowait()
+            except Empty:
+                break
+            with self._lock:
+                self._open_count -= 1
+            try:
                 conn.close()
-            except (Empty, sqlite3.Error):
+            except sqlite3.Error:
                 pass
 
 
@@ -192,6 +231,10 @@ class ConnectionPool:
 _pools: Dict[Path, ConnectionPool] = {}
 _pools_lock = Lock()
 
+# Pools by absolute path as given, so repeat lookups skip resolve()'s filesystem
+# calls. Relative paths are not indexed, since they depend on the working directory.
+_pools_by_path: Dict[Path, ConnectionPool] = {}
+
 
 def _get_pool(db_path: Path) -> ConnectionPool:
     """Get or create a connection pool for the given path.
@@ -202,11 +245,17 @@ def _get_pool(db_path: Path) -> ConnectionPool:
     Returns:
         ConnectionPool instance for the path.
     """
+    pool = _pools_by_path.get(db_path)
+    if pool is not None:
+        return pool
+
     path = db_path.resolve()
 
     with _pools_lock:
         if path not in _pools:
             _pools[path] = ConnectionPool(path, _POOL_SIZE, _POOL_TIMEOUT)
+        if db_path.is_absolute():
+            _pools_by_path[db_path] = _pools[path]
         return _pools[path]
 
 
@@ -313,58 +362,40 @@ class RepositoryAdapter:
             return {"error": f"Student '{student_name}' not found"}
 
         with get_db(self.db_path) as conn:
-            # Get student info
-            cursor = conn.execute(
+            # Student info, missing count, course count and the latest
+            # attendance record in a single statement
+            row = conn.execute(
                 """
-                SELECT first_name, last_name, grade_level, school_name
-                FROM students WHERE id = ?
+                SELECT s.first_name, s.last_name, s.grade_level, s.school_name,
+                       (SELECT COUNT(*) FROM assignments
+                        WHERE student_id = s.id AND status = 'Missing') AS missing_count,
+                       (SELECT COUNT(DISTINCT course_name) FROM courses
+                        WHERE student_id = s.id) AS course_count,
+                       a.id AS attendance_id, a.attendance_rate, a.days_absent,
+                       a.tardies, a.total_days
+                FROM students s
+                LEFT JOIN attendance_summary a ON a.id = (
+                    SELECT id FROM attendance_summary WHERE student_id = s.id
+                    ORDER BY recorded_at DESC LIMIT 1
+                )
+                WHERE s.id = ?
                 """,
                 (student_id,),
-            )
-            student = cursor.fetchone()
-
-            # Get missing assignment count
-            cursor = conn.execute(
-                """
-                SELECT COUNT(*) as count FROM assignments
-                WHERE student_id = ? AND status = 'Missing'
-                """,
-                (student_id,),
-            )
-            missing_count = cursor.fetchone()["count"]
-
-            # Get attendance
-            cursor = conn.execute(
-                """
-                SELECT attendance_rate, days_absent, tardies, total_days
-                FROM attendance_summary WHERE student_id = ?
-                ORDER BY recorded_at DESC LIMIT 1
-                """,
-                (student_id,),
-            )
-            attendance = cursor.fetchone()
-
-            # Get course count
-            cursor = conn.execute(
-                """
-                SELECT COUNT(DISTINCT course_name) as count FROM courses WHERE student_id = ?
-                """,
-                (student_id,),
-            )
-            course_count = cursor.fetchone()["count"]
-
-            return {
-                "student_id": student_id,
-                "name": f"{student['first_name']} {student['last_name'] or ''}".strip(),
-                "grade_level": student["grade_level"],
-                "school_name": student["school_name"],
-                "missing_assignments": missing_count,
-                "attendance_rate": attendance["attendance_rate"] if attendance else None,
-                "days_absent": attendance["days_absent"] if attendance else 0,
-                "tardies": attendance["tardies"] if attendance else 0,
-                "total_days": attendance["total_days"] if attendance else 0,
-                "course_count": course_count,
-            }
+            ).fetchone()
+
+        has_attendance = row["attendance_id"] is not None
+        return {
+            "student_id": student_id,
+            "name": f"{row['first_name']} {row['last_name'] or ''}".strip(),
+            "grade_level": row["grade_level"],
+            "school_name": row["school_name"],
+            "missing_assignments": row["missing_count"],
+            "attendance_rate": row["attendance_rate"] if has_attendance else None,
+            "days_absent": row["days_absent"] if has_attendance else 0,
+            "tardies": row["tardies"] if has_attendance else 0,
+            "total_days": row["total_days"] if has_attendance else 0,
+            "course_count": row["course_count"],
+        }
 
     def get_missing_assignments(self, student_name: str) -> List[Dict[str, Any]]:
         """Get list of missing assignments for a student.
@@ -0,0 +1,243 @@
+"""Persistent cache of AI answers for reworded repeat questions.
+
+Parents often ask the same thing in slightly different words ("What are
+her grades?" vs "show grades please"). Questions are reduced to a
+normalized key (lowercased content words in their original order, light
+plural stemming, filler words ignored) and answers are stored in a small
+SQLite file, so equivalent first-turn questions skip the API even across
+app restarts.
+
+Matching is deliberately conservative: words that change meaning (course
+names, "not", "late", "when", tense and obligation words such as "did" and
+"have to", single letters that may be grades) and word order are kept, so
+only genuinely equivalent phrasings share an answer. Words that only refer
+to the student ("my son", the student's own name) are dropped, since
+answers are already stored per student. Entries are invalidated whenever
+the student database changes, and at the end of each (UTC) day, because
+answers such as "what is due tomorrow?" depend on the date.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Default maximum age of a cached answer, in seconds
+DEFAULT_TTL = 24 * 60 * 60
+
+# Filler words that do not change what is being asked
+STOPWORDS = frozenset(
+    {
+        "the",
+        "is",
+        "are",
+        "be",
+        "do",
+        "does",
+        "what",
+        "which",
+        "can",
+        "could",
+        "would",
+        "you",
+        "me",
+        "my",
+        "he",
+        "she",
+        "his",
+        "her",
+        "they",
+        "their",
+        "our",
+        # The student being asked about; answers are already stored per student
+        "child",
+        "kid",
+        "son",
+        "daughter",
+        "please",
+        "show",
+        "tell",
+        "give",
+        "list",
+        "of",
+        "for",
+        "about",
+        "any",
+        "currently",
+        "right",
+        "now",
+    }
+)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Possessive and contraction endings ("son's", "what's"), dropped before splitting
+_APOSTROPHE_S_RE = re.compile(r"['\u2019]s\b")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS semantic_cache (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    db_mtime REAL,
+    created_at REAL NOT NULL
+)
+"""
+
+
+def normalize_query(text: str) -> str:
+    """Reduce a question to the content words that determine its answer.
+
+    Args:
+        text: User question
+
+    Returns:
+        Space-separated content words, in the order they were asked
+    """
+    words = []
+    for word in _WORD_RE.findall(_APOSTROPHE_S_RE.sub("", text.lower())):
+        if word in STOPWORDS:
+            continue
+        # Light plural stemming so "grades" and "grade" match
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+def _strip_student_name(query: str, student_name: str) -> str:
+    """Remove references to the student by name from a question.
+
+    Only the full name and possessive name parts ("Ava's") are removed; a
+    bare name part is kept, since it may also be a content word (a student
+    named "Art" asking about "art grades").
+
+    Args:
+        query: User question
+        student_name: Student the question is about
+
+    Returns:
+        Question with the name references replaced by spaces
+    """
+    parts = [re.escape(part) for part in student_name.lower().split()]
+    if not parts:
+        return query
+    full_name = r"\s+".join(parts)
+    first_or_last = "|".join(parts)
+    pattern = rf"\b(?:{full_name}|(?:{first_or_last})(?=['\u2019]s\b))\b"
+    return re.sub(pattern, " ", query.lower())
+
+
+class SemanticCache:
+    """SQLite-backed store of answers keyed by normalized question."""
+
+    def __init__(self, path: Path, ttl: float = DEFAULT_TTL):
+        """Initialize the cache.
+
+        Args:
+            path: SQLite file to store answers in (created on first use).
+            ttl: Maximum age of a cached answer in seconds.
+        """
+        self._path = Path(path)
+        self._ttl = ttl
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the table on first use."""
+        conn = sqlite3.connect(str(self._path), timeout=5.0)
+        if not self._initialized:
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    @staticmethod
+    def _key(model: str, student_name: str, query: str) -> Optional[str]:
+        """Build the storage key, or None if the question has no content words."""
+        normalized = normalize_query(_strip_student_name(query, student_name))
+        if not normalized:
+            return None
+        # The day is part of the key so date-relative answers are not reused tomorrow
+        day = time.strftime("%Y-%m-%d", time.gmtime())
+        raw = f"{model}\0{student_name}\0{day}\0{normalized}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()
+
+    def get(
+        self, model: str, student_name: str, query: str, db_mtime: Optional[float]
+    ) -> Optional[str]:
+        """Look up the answer to an equivalent earlier question.
+
+        Args:
+            model: Model that produced the answer.
+            student_name: Student the question was about.
+            query: User question.
+            db_mtime: Current modification time of the student database.
+
+        Returns:
+            Cached answer, or None on a miss, a stale entry, or a cache error.
+        """
+        key = self._key(model, student_name, query)
+        if key is None:
+            return None
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT response, db_mtime, created_at FROM semantic_cache WHERE key = ?",
+                    (key,),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None
+
+        if row is None:
+            return None
+        response, stored_mtime, created_at = row
+        if stored_mtime != db_mtime or time.time() - created_at > self._ttl:
+            return None
+        return response
+
+    def put(
+        self,
+        model: str,
+        student_name: str,
+        query: str,
+        db_mtime: Optional[float],
+        response: str,
+    ) -> None:
+        """Store the answer to a question, dropping expired answers.
+
+        Args:
+            model: Model that produced the answer.
+            student_name: Student the question was about.
+            query: User question.
+            db_mtime: Modification time of the student database it was based on.
+            response: Answer text.
+        """
+        key = self._key(model, student_name, query)
+        if key is None:
+            return
+        try:
+            with closing(self._connect()) as conn, conn:
+                now = time.time()
+                # Expired rows are never served again; delete them so the file stays small
+                conn.execute("DELETE FROM semantic_cache WHERE created_at < ?", (now - self._ttl,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO semantic_cache (key, response, db_mtime, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, response, db_mtime, now),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Semantic cache write failed: {e}")
+
+    def clear(self) -> None:
+        """Remove all cached answers."""
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM semantic_cache")
+        except sqlite3.Error as e:
+            logger.warning(f"Semantic cache clear failed: {e}")
@@ -19,6 +19,10 @@ SESSION_TIMEOUT_MINUTES = 30
 # Warning threshold - show warning when this many minutes remain
 WARNING_THRESHOLD_MINUTES = 5
 
+# Minimum seconds between activity refreshes from the app; small next to
+# the 30-minute timeout, so skipped refreshes shorten it by at most this much
+ACTIVITY_REFRESH_SECONDS = 30
+
 # In-memory session storage
 # In production, use Redis or database-backed storage
 _sessions: dict[str, dict] = {}
@@ -81,14 +85,17 @@ def validate_session(token: str) -> Optional[dict]:
     }
 
 
-def refresh_session(token: str) -> bool:
+def refresh_session(token: str, min_interval: float = 0.0) -> bool:
     """Refresh a session's last activity timestamp.
 
     Args:
         token: Session token to refresh
+        min_interval: Leave the timestamp alone if it was refreshed less
+            than this many seconds ago
 
     Returns:
-        True if session was refreshed, False if token invalid
+        True if session is still valid (refreshed or recently active),
+        False if token invalid
     """
     if not token:
         return False
@@ -107,7 +114,9 @@ def refresh_session(token: str) -> bool:
         return False
 
     # Refresh the timestamp
-    session["last_activity"] = datetime.now()
+    now = datetime.now()
+    if now - last_activity >= timedelta(seconds=min_interval):
+        session["last_activity"] = now
     return True
 
 
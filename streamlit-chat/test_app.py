@@ -259,7 +259,7 @@ class TestAIAssistant:
 
         with patch.dict("os.environ", {"ANTHROPIC_API_KEY": ""}, clear=False):
             response = get_ai_response(
-                "What are the missing assignments?",
+                "Which missing assignments matter most?",
                 {"student_name": "TestStudent"},
                 [],
                 api_key=None,
@@ -290,7 +290,7 @@ class TestAIAssistant:
         with patch("ai_assistant.Anthropic", return_value=mock_client):
             with patch("ai_assistant.get_db_path", return_value=test_db_path):
                 response = get_ai_response(
-                    "What are the missing assignments?",
+                    "Which missing assignments matter most?",
                     {"student_name": student_name},
                     [],
                     api_key="test-key",
@@ -332,7 +332,7 @@ class TestAIAssistant:
         with patch("ai_assistant.Anthropic", return_value=mock_client):
             with patch("ai_assistant.get_db_path", return_value=test_db_path):
                 response = get_ai_response(
-                    "What are the missing assignments?",
+                    "Which missing assignments matter most?",
                     {"student_name": student_name},
                     [],
                     api_key="test-key",
@@ -353,7 +353,7 @@ class TestAIAssistant:
 
         with patch("ai_assistant.Anthropic", return_value=mock_client):
             response = get_ai_response(
-                "What are the missing assignments?",
+                "Which missing assignments matter most?",
                 {"student_name": student_name},
                 [],
                 api_key="test-key",
@@ -384,7 +384,7 @@ class TestAIAssistant:
         with patch("ai_assistant.Anthropic", return_value=mock_client):
             with patch("ai_assistant.get_db_path", return_value=test_db_path):
                 response = get_ai_response(
-                    "What are the missing assignments?",
+                    "Which missing assignments matter most?",
                     {"student_name": student_name},
                     [],
                     api_key="test-key",
@@ -433,7 +433,7 @@ class TestAIAssistant:
         with patch("ai_assistant.Anthropic", return_value=mock_client):
             with patch("ai_assistant.get_db_path", return_value=test_db_path):
                 response = get_ai_response(
-                    "What are the missing assignments?",
+                    "Which missing assignments matter most?",
                     {"student_name": student_name},
                     [],
                     api_key="test-key",
@@ -480,7 +480,7 @@ class TestAIAssistant:
         with patch("ai_assistant.Anthropic", return_value=mock_client):
             with patch("ai_assistant.get_db_path", return_value=test_db_path):
                 response = get_ai_response(
-                    "What are the missing assignments?",
+                    "Which missing assignments matter most?",
                     {"student_name": student_name},
                     [],
                     api_key="test-key",
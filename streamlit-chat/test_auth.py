@@ -224,6 +224,20 @@ class TestSessionManager:
         # After refresh, remaining time should be reset to near max
         assert remaining2 >= remaining1 - 1  # Allow 1 second tolerance
 
+    def test_refresh_throttled_by_min_interval(self):
+        """A refresh within min_interval leaves last activity unchanged."""
+        from session_manager import _sessions, create_session, refresh_session
+
+        token = create_session("test_user", ["Student1"])
+        started = datetime.now() - timedelta(seconds=10)
+        _sessions[token]["last_activity"] = started
+
+        assert refresh_session(token, min_interval=30) is True
+        assert _sessions[token]["last_activity"] == started
+
+        assert refresh_session(token, min_interval=5) is True
+        assert _sessions[token]["last_activity"] > started
+
     def test_logout_invalidates_session(self):
         """logout should invalidate the session."""
         from session_manager import create_session, logout, validate_session
@@ -421,6 +421,68 @@ class TestConnectionPooling:
             result = adapter.get_student_summary("NonExistent")
             assert "error" in result
 
+    def test_empty_pool_opens_connection_without_waiting(self, tmp_path: Path):
+        """A new pool should open connections immediately and reuse them."""
+        import time
+
+        from repository_adapter import ConnectionPool
+
+        pool = ConnectionPool(tmp_path / "pool.db", pool_size=2, timeout=5.0)
+
+        start = time.monotonic()
+        first = pool.get_connection()
+        second = pool.get_connection()
+        assert time.monotonic() - start < 1.0
+        assert first is not second
+
+        pool.return_connection(first)
+        assert pool.get_connection() is first
+
+        pool.return_connection(first)
+        pool.return_connection(second)
+        pool.close_all()
+
+    def test_pool_lookup_resolves_path_once(self, tmp_path: Path):
+        """Repeat lookups for a path should reuse the pool without resolving again."""
+        from unittest.mock import patch
+
+        from repository_adapter import _get_pool
+
+        db_path = tmp_path / "lookup.db"
+        pool = _get_pool(db_path)
+
+        with patch.object(Path, "resolve") as mock_resolve:
+            assert _get_pool(db_path) is pool
+
+        mock_resolve.assert_not_called()
+
+    def test_relative_path_follows_working_directory(self, tmp_path: Path, monkeypatch):
+        """A relative path should map to the pool of the current directory."""
+        from repository_adapter import _get_pool
+
+        (tmp_path / "a").mkdir()
+        (tmp_path / "b").mkdir()
+        monkeypatch.chdir(tmp_path / "a")
+        first = _get_pool(Path("rel.db"))
+        monkeypatch.chdir(tmp_path / "b")
+        second = _get_pool(Path("rel.db"))
+
+        assert first is not second
+        assert second is _get_pool(tmp_path / "b" / "rel.db")
+
+    def test_exhausted_pool_times_out(self, tmp_path: Path):
+        """Waiting for a connection beyond pool_size should time out."""
+        from repository_adapter import ConnectionPool
+
+        pool = ConnectionPool(tmp_path / "pool.db", pool_size=1, timeout=0.1)
+        conn = pool.get_connection()
+
+        with pytest.raises(TimeoutError):
+            pool.get_connection()
+
+        pool.return_connection(conn)
+        pool.close_all()
+
 
 # =============================================================================
 # Integration with data_queries.py Tests
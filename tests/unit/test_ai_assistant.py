@@ -1,8 +1,11 @@
 """Tests for AI assistant retry logic and error handling."""
 
+import json
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
 
 # Add streamlit-chat directory to path for imports
 streamlit_chat_dir = Path(__file__).parent.parent.parent / "streamlit-chat"
@@ -13,8 +16,11 @@ from ai_assistant import (  # noqa: E402
     ClientAPIError,
     RateLimitAPIError,
     ServerAPIError,
+    _close_clients,
     _get_status_code,
     categorize_error,
+    clear_response_cache,
+    clear_tool_cache,
     get_ai_response,
 )
 from anthropic import (  # noqa: E402
@@ -27,6 +33,21 @@ from anthropic import (  # noqa: E402
 from httpx import Request, Response  # noqa: E402
 
 
+@pytest.fixture(autouse=True)
+def _fresh_response_cache(tmp_path, monkeypatch):
+    """Keep cached answers and clients from one test out of the next."""
+    from semantic_cache import SemanticCache
+
+    monkeypatch.setattr("ai_assistant._semantic_cache", SemanticCache(tmp_path / "cache.db"))
+    clear_response_cache()
+    clear_tool_cache()
+    _close_clients()
+    yield
+    clear_response_cache()
+    clear_tool_cache()
+    _close_clients()
+
+
 class TestGetStatusCode:
     """Test the _get_status_code helper function."""
 
@@ -405,7 +426,7 @@ class TestToolLoopRetry:
         mock_execute_tool.return_value = {"grades": [{"course": "Math", "grade": "A"}]}
 
         result = get_ai_response(
-            user_message="Show my grades",
+            user_message="Why did her grades change?",
             student_context={"student_name": "Test"},
             chat_history=[],
             api_key="test-key",
@@ -462,7 +483,7 @@ class TestToolLoopRetry:
         mock_execute_tool.return_value = {"attendance_rate": 95.0}
 
         result = get_ai_response(
-            user_message="Show attendance",
+            user_message="Why was she absent?",
             student_context={"student_name": "Test"},
             chat_history=[],
             api_key="test-key",
@@ -471,3 +492,1246 @@ class TestToolLoopRetry:
         assert "Attendance is 95%" in result
         assert mock_client.messages.create.call_count == 3
         assert mock_execute_tool.call_count == 1
+
+
+class TestPromptCaching:
+    """Test prompt caching breakpoints sent with each API call."""
+
+    @patch("ai_assistant.Anthropic")
+    def test_system_and_tools_marked_cacheable(self, mock_anthropic_class):
+        """System prompt and last tool should carry cache_control."""
+        mock_client = MagicMock()
+        mock_anthropic_class.return_value = mock_client
+
+        mock_response = MagicMock()
+        mock_response.stop_reason = "end_turn"
+        mock_response.content = [MagicMock(text="Hi", type="text")]
+        mock_response.content[0].text = "Hi"
+        mock_client.messages.create.return_value = mock_response
+
+        get_ai_response(
+            user_message="Hello",
+            student_context={"student_name": "Test"},
+            chat_history=[],
+            api_key="test-key",
+        )
+
+        kwargs = mock_client.messages.create.call_args.kwargs
+        # The static instructions are cached; the student context follows them
+        assert kwargs["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert "Test" not in kwargs["system"][0]["text"]
+        assert "Test" in kwargs["system"][1]["text"]
+        assert "cache_control" not in kwargs["system"][1]
+        tools = kwargs["extra_body"]["tools"]
+        assert tools[-1]["cache_control"] == {"type": "ephemeral"}
+        assert all("cache_control" not in tool for tool in tools[:-1])
+        # Single-message conversations get no history breakpoint
+        assert kwargs["messages"] == [{"role": "user", "content": "Hello"}]
+
+    def test_history_breakpoint_on_previous_message(self):
+        """The message before the newest one should be marked cacheable."""
+        from ai_assistant import _cache_history
+
+        messages = [
+            {"role": "user", "content": "What are the grades?"},
+            {"role": "assistant", "content": "Math: A"},
+            {"role": "user", "content": "And attendance?"},
+        ]
+
+        cached = _cache_history(messages)
+
+        assert cached[1]["content"] == [
+            {"type": "text", "text": "Math: A", "cache_control": {"type": "ephemeral"}}
+        ]
+        assert cached[2] == messages[2]
+        # Original messages are not modified
+        assert messages[1]["content"] == "Math: A"
+
+    def test_history_breakpoint_on_latest_tool_results(self):
+        """In the tool loop the newest tool results should be marked cacheable."""
+        from ai_assistant import _cache_history
+
+        tool_results = [
+            {"type": "tool_result", "tool_use_id": "a", "content": "[]"},
+            {"type": "tool_result", "tool_use_id": "b", "content": "{}"},
+        ]
+        messages = [
+            {"role": "user", "content": "How is she doing?"},
+            {"role": "assistant", "content": [MagicMock(type="tool_use")]},
+            {"role": "user", "content": tool_results},
+        ]
+
+        cached = _cache_history(messages)
+
+        assert cached[2]["content"][0] == tool_results[0]
+        assert cached[2]["content"][1] == {
+            **tool_results[1],
+            "cache_control": {"type": "ephemeral"},
+        }
+        assert cached[:2] == messages[:2]
+        assert "cache_control" not in tool_results[1]
+
+    def test_breakpoints_within_api_limit(self):
+        """A request never carries more than the API's 4 cache breakpoints."""
+        from ai_assistant import _request_kwargs, _system_blocks
+
+        messages = [
+            {"role": "user", "content": "How is she doing?"},
+            {"role": "assistant", "content": "Let me check."},
+            {"role": "user", "content": "Grades?"},
+            {"role": "assistant", "content": [{"type": "text", "text": "Checking"}]},
+            {
+                "role": "user",
+                "content": [{"type": "tool_result", "tool_use_id": "a", "content": "[]"}],
+            },
+        ]
+
+        kwargs = _request_kwargs("model", _system_blocks("Test", "Earlier chat"), messages)
+
+        blocks = [
+            *kwargs["system"],
+            *kwargs["extra_body"]["tools"],
+            *(
+                block
+                for message in kwargs["messages"]
+                if isinstance(message["content"], list)
+                for block in message["content"]
+            ),
+        ]
+        assert 0 < sum("cache_control" in block for block in blocks) <= 4
+
+
+class TestResponseCache:
+    """Test the exact-match response cache around get_ai_response."""
+
+    def _mock_client(self, mock_anthropic_class, text: str) -> MagicMock:
+        """Configure the patched client to answer every call with text."""
+        mock_client = MagicMock()
+        mock_anthropic_class.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.stop_reason = "end_turn"
+        mock_response.content = [MagicMock(text=text, type="text")]
+        mock_response.content[0].text = text
+        mock_client.messages.create.return_value = mock_response
+        return mock_client
+
+    @patch("ai_assistant.Anthropic")
+    def test_repeated_question_served_from_cache(self, mock_anthropic_class):
+        """Identical requests should only hit the API once."""
+        from ai_assistant import response_cache_stats
+
+        mock_client = self._mock_client(mock_anthropic_class, "Math: A")
+        kwargs = {
+            "user_message": "What are the grades?",
+            "student_context": {"student_name": "Test"},
+            "chat_history": [],
+            "api_key": "test-key",
+        }
+
+        assert get_ai_response(**kwargs) == "Math: A"
+        assert get_ai_response(**kwargs) == "Math: A"
+
+        assert mock_client.messages.create.call_count == 1
+        assert response_cache_stats["hits"] == 1
+
+    @patch("ai_assistant.Anthropic")
+    def test_different_history_misses_cache(self, mock_anthropic_class):
+        """Changing the conversation history should bypass the cache."""
+        mock_client = self._mock_client(mock_anthropic_class, "Math: A")
+
+        get_ai_response("Grades?", {"student_name": "Test"}, [], api_key="test-key")
+        get_ai_response(
+            "Grades?",
+            {"student_name": "Test"},
+            [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}],
+            api_key="test-key",
+        )
+
+        assert mock_client.messages.create.call_count == 2
+
+    @patch("ai_assistant.Anthropic")
+    def test_expired_entry_refetched(self, mock_anthropic_class):
+        """Entries older than the TTL should not be served."""
+        mock_client = self._mock_client(mock_anthropic_class, "Math: A")
+
+        # Follow-up questions only use the exact-match cache
+        history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]
+        with patch("ai_assistant.RESPONSE_CACHE_TTL", 0.0):
+            get_ai_response("Grades?", {"student_name": "Test"}, history, api_key="test-key")
+            get_ai_response("Grades?", {"student_name": "Test"}, history, api_key="test-key")
+
+        assert mock_client.messages.create.call_count == 2
+
+
+class TestToolMemoization:
+    """Test that repeated tool calls within one request run once."""
+
+    @patch("ai_assistant.Anthropic")
+    @patch("ai_assistant.execute_tool")
+    def test_same_tool_and_input_executed_once(self, mock_execute_tool, mock_anthropic_class):
+        """A tool repeated with identical input should reuse the first result."""
+        mock_client = MagicMock()
+        mock_anthropic_class.return_value = mock_client
+
+        def tool_use_response(tool_id: str) -> MagicMock:
+            block = MagicMock()
+            block.type = "tool_use"
+            block.name = "get_current_grades"
+            block.input = {}
+            block.id = tool_id
+            response = MagicMock()
+            response.stop_reason = "tool_use"
+            response.content = [block]
+            return response
+
+        final_response = MagicMock()
+        final_response.stop_reason = "end_turn"
+        final_response.content = [MagicMock(text="Math: A", type="text")]
+        final_response.content[0].text = "Math: A"
+
+        mock_client.messages.create.side_effect = [
+            tool_use_response("tool_1"),
+            tool_use_response("tool_2"),
+            final_response,
+        ]
+        mock_execute_tool.return_value = [{"course": "Math", "grade": "A"}]
+
+        result = get_ai_response(
+            user_message="Why did her grades change?",
+            student_context={"student_name": "Test"},
+            chat_history=[],
+            api_key="test-key",
+        )
+
+        assert result == "Math: A"
+        assert mock_execute_tool.call_count == 1
+        # Both tool_use ids still receive a result
+        last_messages = mock_client.messages.create.call_args.kwargs["messages"]
+        assert last_messages[-1]["content"][0]["tool_use_id"] == "tool_2"
+        assert last_messages[-3]["content"][0]["tool_use_id"] == "tool_1"
+
+
+class TestParallelTools:
+    """Test execution of several tool calls from one response."""
+
+    def test_parallel_tools_keep_request_order(self):
+        """Results should line up with tool_use ids even when run concurrently."""
+        import time
+
+        from ai_assistant import _run_tools
+
+        def make_block(tool_id: str, name: str) -> MagicMock:
+            block = MagicMock()
+            block.id = tool_id
+            block.name = name
+            block.input = {}
+            return block
+
+        def fake_execute(tool_name, tool_input, student_name):
+            # The first tool finishes last
+            time.sleep(0.05 if tool_name == "get_current_grades" else 0)
+            return {"tool": tool_name}
+
+        blocks = [
+            make_block("a", "get_current_grades"),
+            make_block("b", "get_attendance_summary"),
+            make_block("c", "get_current_grades"),
+        ]
+
+        with patch("ai_assistant.execute_tool", side_effect=fake_execute) as mock_execute:
+            results = _run_tools(blocks, "Test", {})
+
+        assert [r["tool_use_id"] for r in results] == ["a", "b", "c"]
+        assert json.loads(results[0]["content"]) == {"tool": "get_current_grades"}
+        assert json.loads(results[1]["content"]) == {"tool": "get_attendance_summary"}
+        assert results[2]["content"] == results[0]["content"]
+        # The duplicate call is served from the per-request cache
+        assert mock_execute.call_count == 2
+
+
+class TestGetDbPath:
+    """Test database path resolution."""
+
+    def test_env_path_resolved_once(self, monkeypatch):
+        """The path is cached until cache_clear() is called."""
+        from ai_assistant import get_db_path
+
+        get_db_path.cache_clear()
+        try:
+            monkeypatch.setenv("DATABASE_PATH", "/tmp/first.db")
+            assert get_db_path() == "/tmp/first.db"
+
+            monkeypatch.setenv("DATABASE_PATH", "/tmp/second.db")
+            assert get_db_path() == "/tmp/first.db"
+
+            get_db_path.cache_clear()
+            assert get_db_path() == "/tmp/second.db"
+        finally:
+            get_db_path.cache_clear()
+
+
+class TestStreamAIResponse:
+    """Test the streaming variant of get_ai_response."""
+
+    @staticmethod
+    def _stream(chunks: list, final_message: MagicMock) -> MagicMock:
+        """Build a stream manager whose stream yields chunks then final_message."""
+        stream = MagicMock()
+        stream.text_stream = iter(chunks)
+        stream.get_final_message.return_value = final_message
+        manager = MagicMock()
+        manager.__enter__.return_value = stream
+        return manager
+
+    @patch("ai_assistant.Anthropic")
+    @patch("ai_assistant.execute_tool")
+    def test_streams_text_across_tool_rounds(self, mock_execute_tool, mock_anthropic_class):
+        """Text chunks from every round are yielded in order."""
+        from ai_assistant import stream_ai_response
+
+        mock_client = MagicMock()
+        mock_anthropic_class.return_value = mock_client
+
+        tool_block = MagicMock(spec=["type", "name", "input", "id"])
+        tool_block.type = "tool_use"
+        tool_block.name = "get_current_grades"
+        tool_block.input = {}
+        tool_block.id = "tool_1"
+        preamble = MagicMock(spec=["type", "text"], type="text", text="Checking.")
+        tool_message = MagicMock(stop_reason="tool_use", content=[preamble, tool_block])
+
+        answer = MagicMock(spec=["type", "text"], type="text", text="Math: A")
+        final_message = MagicMock(stop_reason="end_turn", content=[answer])
+
+        mock_client.messages.stream.side_effect = [
+            self._stream(["Checking."], tool_message),
+            self._stream(["Math", ": A"], final_message),
+        ]
+        mock_execute_tool.return_value = [{"course": "Math", "grade": "A"}]
+
+        chunks = list(
+            stream_ai_response(
+                user_message="Why did her grades change?",
+                student_context={"student_name": "Test"},
+                chat_history=[],
+                api_key="test-key",
+            )
+        )
+
+        assert chunks == ["Checking.", "\n\n", "Math", ": A"]
+        assert mock_execute_tool.call_count == 1
+        # The final answer is cached for the blocking API as well
+        assert get_ai_response(
+            "Why did her grades change?", {"student_name": "Test"}, [], "test-key"
+        ) == ("Math: A")
+        mock_client.messages.create.assert_not_called()
+
+    def test_missing_api_key_yields_error(self, monkeypatch):
+        """Without an API key a single error message is yielded."""
+        from ai_assistant import stream_ai_response
+
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+        chunks = list(stream_ai_response("Hi", {"student_name": "Test"}, []))
+
+        assert chunks == ["Error: ANTHROPIC_API_KEY not set. Please configure your API key."]
+
+
+class TestSharedClient:
+    """Test reuse of the Anthropic client across requests."""
+
+    @patch("ai_assistant.Anthropic")
+    def test_client_created_once_per_api_key(self, mock_anthropic_class):
+        """Repeated requests with one key share a client without SDK retries."""
+        from ai_assistant import API_TIMEOUT, _get_client
+
+        first = _get_client("key-a")
+        assert _get_client("key-a") is first
+        _get_client("key-b")
+
+        assert mock_anthropic_class.call_count == 2
+        mock_anthropic_class.assert_any_call(api_key="key-a", max_retries=0, timeout=API_TIMEOUT)
+
+    @patch("ai_assistant.Anthropic")
+    def test_close_clients_closes_and_forgets(self, mock_anthropic_class):
+        """Closing releases each client so the next request builds a new one."""
+        from ai_assistant import _get_client
+
+        client = _get_client("key-a")
+        _close_clients()
+
+        client.close.assert_called_once()
+        _get_client("key-a")
+        assert mock_anthropic_class.call_count == 2
+
+
+class TestSerializeResult:
+    """Test JSON serialization of tool results."""
+
+    def test_serializes_dates_and_non_string_keys(self):
+        """Dates, decimals and integer keys should all serialize."""
+        from datetime import date
+        from decimal import Decimal
+
+        from ai_assistant import _serialize_result
+
+        result = {"due": date(2025, 1, 15), "percent": Decimal("92.5"), 1: "first"}
+
+        assert json.loads(_serialize_result(result)) == {
+            "due": "2025-01-15",
+            "percent": "92.5",
+            "1": "first",
+        }
+
+    def test_falls_back_to_stdlib_json(self):
+        """Without orjson the stdlib encoder is used."""
+        from ai_assistant import _serialize_result
+
+        with patch("ai_assistant.orjson", None):
+            assert _serialize_result([{"course": "Math"}]) == '[{"course": "Math"}]'
+
+
+class TestTrimMessages:
+    """Test the input token budget applied to outgoing messages."""
+
+    @staticmethod
+    def _tool_round(tool_id: str, output: str) -> list:
+        """Build an assistant tool_use message and its tool_result reply."""
+        tool_block = MagicMock(spec=["type", "name", "input", "id"])
+        tool_block.type = "tool_use"
+        tool_block.input = {}
+        return [
+            {"role": "assistant", "content": [tool_block]},
+            {
+                "role": "user",
+                "content": [{"type": "tool_result", "tool_use_id": tool_id, "content": output}],
+            },
+        ]
+
+    def test_within_budget_unchanged(self):
+        """Small conversations are passed through as-is."""
+        from ai_assistant import _trim_messages
+
+        messages = [{"role": "user", "content": "Hi"}]
+
+        assert _trim_messages(messages, max_tokens=100) is messages
+
+    def test_old_tool_output_omitted_first(self):
+        """Older tool results are replaced before anything else is dropped."""
+        from ai_assistant import OMITTED_TOOL_OUTPUT, _trim_messages
+
+        messages = [
+            {"role": "user", "content": "Grades and attendance?"},
+            *self._tool_round("tool_1", "x" * 4000),
+            *self._tool_round("tool_2", "y" * 400),
+        ]
+
+        trimmed = _trim_messages(messages, max_tokens=200)
+
+        assert len(trimmed) == len(messages)
+        assert trimmed[2]["content"][0] == {
+            "type": "tool_result",
+            "tool_use_id": "tool_1",
+            "content": OMITTED_TOOL_OUTPUT,
+        }
+        # The newest round is kept intact
+        assert trimmed[-1] is messages[-1]
+        # The caller's messages are not modified
+        assert messages[2]["content"][0]["content"] == "x" * 4000
+
+    def test_old_history_pairs_dropped(self):
+        """Plain history is dropped in user/assistant pairs when still over budget."""
+        from ai_assistant import _trim_messages
+
+        messages = [
+            {"role": "user", "content": "a" * 800},
+            {"role": "assistant", "content": "b" * 800},
+            {"role": "user", "content": "c" * 40},
+            {"role": "assistant", "content": "d" * 40},
+            {"role": "user", "content": "Now?"},
+        ]
+
+        trimmed = _trim_messages(messages, max_tokens=100)
+
+        assert trimmed == messages[2:]
+
+
+class TestSemanticCacheIntegration:
+    """Test the persistent cache for reworded first-turn questions."""
+
+    @patch("ai_assistant.Anthropic")
+    def test_reworded_first_question_served_from_cache(self, mock_anthropic_class):
+        """A rephrased first question should reuse the earlier answer."""
+        mock_client = MagicMock()
+        mock_anthropic_class.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.stop_reason = "end_turn"
+        mock_response.content = [MagicMock(text="Math: A", type="text")]
+        mock_response.content[0].text = "Math: A"
+        mock_client.messages.create.return_value = mock_response
+
+        first = get_ai_response("What are her grades?", {"student_name": "Test"}, [], "test-key")
+        second = get_ai_response("show grades", {"student_name": "Test"}, [], "test-key")
+
+        assert first == second == "Math: A"
+        assert mock_client.messages.create.call_count == 1
+
+    @patch("ai_assistant.Anthropic")
+    def test_follow_up_questions_bypass_semantic_cache(self, mock_anthropic_class):
+        """Questions with history depend on context and always reach the API."""
+        mock_client = MagicMock()
+        mock_anthropic_class.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.stop_reason = "end_turn"
+        mock_response.content = [MagicMock(text="Math: A", type="text")]
+        mock_response.content[0].text = "Math: A"
+        mock_client.messages.create.return_value = mock_response
+        history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]
+
+        get_ai_response("What are her grades?", {"student_name": "Test"}, history, "test-key")
+        get_ai_response("show grades", {"student_name": "Test"}, history, "test-key")
+
+        assert mock_client.messages.create.call_count == 2
+
+
+class TestToolResultCache:
+    """Test reuse of tool results across requests."""
+
+    def test_results_reused_until_database_changes(self, tmp_path):
+        """A tool re-runs only after the database file is modified."""
+        import os
+
+        from ai_assistant import _TOOL_DISPATCH, execute_tool
+
+        db_file = tmp_path / "student.db"
+        db_file.write_text("")
+        os.utime(db_file, (1_000, 1_000))
+        mock_tool = MagicMock(return_value=[{"course": "Math"}])
+
+        with (
+            patch("ai_assistant.get_db_path", return_value=str(db_file)),
+            patch.dict(_TOOL_DISPATCH, {"get_current_grades": mock_tool}),
+        ):
+            first = execute_tool("get_current_grades", {}, "Test")
+            second = execute_tool("get_current_grades", {}, "Test")
+            assert mock_tool.call_count == 1
+            assert second is first
+
+            # Different student is a different entry
+            execute_tool("get_current_grades", {}, "Other")
+            assert mock_tool.call_count == 2
+
+            os.utime(db_file, (2_000, 2_000))
+            execute_tool("get_current_grades", {}, "Test")
+            assert mock_tool.call_count == 3
+
+    def test_missing_database_not_cached(self, tmp_path):
+        """Without a database file every call runs the tool."""
+        from ai_assistant import _TOOL_DISPATCH, execute_tool
+
+        mock_tool = MagicMock(return_value={"error": "no data"})
+
+        with (
+            patch("ai_assistant.get_db_path", return_value=str(tmp_path / "missing.db")),
+            patch.dict(_TOOL_DISPATCH, {"get_current_grades": mock_tool}),
+        ):
+            execute_tool("get_current_grades", {}, "Test")
+            execute_tool("get_current_grades", {}, "Test")
+
+        assert mock_tool.call_count == 2
+
+    def test_results_expire_at_day_change(self, tmp_path):
+        """Date-relative results are not reused on the next (UTC) day."""
+        from ai_assistant import _TOOL_DISPATCH, execute_tool
+
+        db_file = tmp_path / "student.db"
+        db_file.write_text("")
+        mock_tool = MagicMock(return_value=[])
+
+        with (
+            patch("ai_assistant.get_db_path", return_value=str(db_file)),
+            patch.dict(_TOOL_DISPATCH, {"get_upcoming_assignments": mock_tool}),
+            patch("ai_assistant.time.strftime", side_effect=["2026-01-01", "2026-01-02"]),
+        ):
+            execute_tool("get_upcoming_assignments", {"days": 7}, "Test")
+            execute_tool("get_upcoming_assignments", {"days": 7}, "Test")
+
+        assert mock_tool.call_count == 2
+
+    def test_quick_responses_use_cache(self, tmp_path):
+        """Repeated quick responses reuse the cached tool result."""
+        from ai_assistant import _TOOL_DISPATCH, get_quick_response
+
+        db_file = tmp_path / "student.db"
+        db_file.write_text("")
+        mock_tool = MagicMock(return_value=[{"assignment_name": "Essay"}])
+
+        with (
+            patch("ai_assistant.get_db_path", return_value=str(db_file)),
+            patch.dict(_TOOL_DISPATCH, {"get_missing_assignments": mock_tool}),
+        ):
+            first = get_quick_response("missing", "Test")
+            second = get_quick_response("missing", "Test")
+
+        assert mock_tool.call_count == 1
+        assert (
+            first
+            == second
+            == {
+                "title": "Missing Assignments",
+                "data": [{"assignment_name": "Essay"}],
+                "count": 1,
+            }
+        )
+
+
+class TestRetryBackoff:
+    """Test the retry loop's backoff schedule."""
+
+    def test_exponential_delays_then_reraise(self):
+        """Retryable errors back off 1s, 2s, 4s and the last error is raised."""
+        from ai_assistant import api_retry
+
+        calls = []
+
+        @api_retry
+        def flaky():
+            calls.append(1)
+            raise ConnectionError("network down")
+
+        with patch("ai_assistant.time.sleep") as mock_sleep:
+            with pytest.raises(ConnectionError):
+                flaky()
+
+        assert len(calls) == 4
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [1, 2, 4]
+
+    def test_non_retryable_error_raised_immediately(self):
+        """Client errors are not retried."""
+        from ai_assistant import api_retry
+
+        mock_request = Request(method="POST", url="https://api.anthropic.com/v1/messages")
+        error = BadRequestError(
+            message="Bad request",
+            response=Response(status_code=400, request=mock_request),
+            body=None,
+        )
+        func = MagicMock(side_effect=error, __name__="func")
+
+        with patch("ai_assistant.time.sleep") as mock_sleep:
+            with pytest.raises(BadRequestError):
+                api_retry(func)()
+
+        assert func.call_count == 1
+        mock_sleep.assert_not_called()
+
+
+class TestAsyncAIResponse:
+    """Test the asyncio entry point."""
+
+    @staticmethod
+    def _async_client(responses: list) -> MagicMock:
+        client = MagicMock()
+        client.messages.create = AsyncMock(side_effect=responses)
+        client.close = AsyncMock()
+        return client
+
+    @staticmethod
+    def _tool_response(*names: str) -> MagicMock:
+        blocks = []
+        for i, name in enumerate(names):
+            block = MagicMock(spec=["type", "name", "input", "id"])
+            block.type = "tool_use"
+            block.name = name
+            block.input = {}
+            block.id = f"tool_{i}"
+            blocks.append(block)
+        response = MagicMock()
+        response.stop_reason = "tool_use"
+        response.content = blocks
+        return response
+
+    @staticmethod
+    def _text_response(text: str) -> MagicMock:
+        response = MagicMock()
+        response.stop_reason = "end_turn"
+        response.content = [MagicMock(text=text, type="text")]
+        return response
+
+    @patch("ai_assistant.execute_tool")
+    @patch("ai_assistant.AsyncAnthropic")
+    async def test_tool_loop_and_client_closed(self, mock_async_class, mock_execute_tool):
+        """Tools run for each round and the per-call client is closed."""
+        from ai_assistant import get_ai_response_async
+
+        client = self._async_client(
+            [
+                self._tool_response("get_current_grades", "get_attendance_summary"),
+                self._text_response("All good"),
+            ]
+        )
+        mock_async_class.return_value = client
+        mock_execute_tool.side_effect = lambda name, tool_input, student: {"tool": name}
+
+        result = await get_ai_response_async(
+            user_message="How is she doing?",
+            student_context={"student_name": "Test"},
+            chat_history=[],
+            api_key="test-key",
+        )
+
+        assert result == "All good"
+        assert mock_execute_tool.call_count == 2
+        tool_results = client.messages.create.call_args.kwargs["messages"][-1]["content"]
+        assert [r["tool_use_id"] for r in tool_results] == ["tool_0", "tool_1"]
+        assert json.loads(tool_results[1]["content"]) == {"tool": "get_attendance_summary"}
+        client.close.assert_awaited_once()
+
+    @patch("ai_assistant.AsyncAnthropic")
+    async def test_retries_with_asyncio_sleep(self, mock_async_class):
+        """Retryable errors back off without blocking the event loop."""
+        from ai_assistant import get_ai_response_async
+
+        mock_request = Request(method="POST", url="https://api.anthropic.com/v1/messages")
+        rate_limit = RateLimitError(
+            message="Rate limit exceeded",
+            response=Response(status_code=429, request=mock_request),
+            body=None,
+        )
+        client = self._async_client([rate_limit, self._text_response("Recovered")])
+        mock_async_class.return_value = client
+
+        with patch("ai_assistant.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            result = await get_ai_response_async(
+                user_message="Grades?",
+                student_context={"student_name": "Test"},
+                chat_history=[],
+                api_key="test-key",
+            )
+
+        assert result == "Recovered"
+        mock_sleep.assert_awaited_once_with(1)
+
+    @patch("ai_assistant.AsyncAnthropic")
+    async def test_cached_answer_skips_client(self, mock_async_class):
+        """A cached answer is returned without creating a client."""
+        from ai_assistant import get_ai_response_async
+
+        mock_async_class.return_value = self._async_client([self._text_response("Math: A")])
+        kwargs = {
+            "user_message": "Grades?",
+            "student_context": {"student_name": "Test"},
+            "chat_history": [],
+            "api_key": "test-key",
+        }
+
+        assert await get_ai_response_async(**kwargs) == "Math: A"
+        assert await get_ai_response_async(**kwargs) == "Math: A"
+        assert mock_async_class.call_count == 1
+
+
+class TestClassifyQuickIntent:
+    """Test routing of simple questions to quick responses."""
+
+    @pytest.mark.parametrize(
+        ("message", "intent"),
+        [
+            ("show grades", "grades"),
+            ("What are her current grades?", "grades"),
+            ("Is she missing any assignments?", "missing"),
+            ("What's due this week?", "upcoming"),
+            ("How's the attendance?", "attendance"),
+        ],
+    )
+    def test_simple_questions_match(self, message, intent):
+        """Plain phrasings of the quick actions are recognized."""
+        from ai_assistant import classify_quick_intent
+
+        assert classify_quick_intent(message) == intent
+
+    @pytest.mark.parametrize(
+        "message",
+        ["Why are her grades dropping?", "grades in math", "late assignments", ""],
+    )
+    def test_specific_questions_go_to_claude(self, message):
+        """Anything beyond the plain question is left to the model."""
+        from ai_assistant import classify_quick_intent
+
+        assert classify_quick_intent(message) is None
+
+
+class TestQuickAnswer:
+    """Test answering simple opening questions without Claude."""
+
+    @pytest.fixture
+    def db_file(self, tmp_path):
+        db_file = tmp_path / "student.db"
+        db_file.write_text("")
+        grades = [{"course_name": "Math", "letter_grade": "A", "percent": 95}]
+        with (
+            patch("ai_assistant.get_db_path", return_value=str(db_file)),
+            patch("ai_assistant.execute_tool", return_value=grades) as mock_execute,
+        ):
+            yield mock_execute
+
+    @patch("ai_assistant.Anthropic")
+    def test_blocking_answers_from_database(self, mock_anthropic_class, db_file):
+        """A first-turn quick question is formatted from the query result."""
+        result = get_ai_response("Show grades", {"student_name": "Test"}, [], "test-key")
+
+        assert "Current Grades" in result
+        assert "Math" in result
+        db_file.assert_called_once_with("get_current_grades", {}, "Test")
+        mock_anthropic_class.assert_not_called()
+
+    @patch("ai_assistant.Anthropic")
+    def test_stream_yields_single_answer(self, mock_anthropic_class, db_file):
+        """The streaming entry point yields the quick answer as one chunk."""
+        from ai_assistant import stream_ai_response
+
+        chunks = list(stream_ai_response("Show grades", {"student_name": "Test"}, [], "test-key"))
+
+        assert len(chunks) == 1
+        assert "Current Grades" in chunks[0]
+        mock_anthropic_class.assert_not_called()
+
+    @patch("ai_assistant.AsyncAnthropic")
+    async def test_async_answers_from_database(self, mock_async_class, db_file):
+        """The asyncio entry point answers without a client as well."""
+        from ai_assistant import get_ai_response_async
+
+        result = await get_ai_response_async(
+            "Show grades", {"student_name": "Test"}, [], "test-key"
+        )
+
+        assert "Current Grades" in result
+        mock_async_class.assert_not_called()
+
+    @patch("ai_assistant.Anthropic")
+    def test_follow_up_goes_to_claude(self, mock_anthropic_class, db_file):
+        """With earlier messages the question depends on context, so Claude answers."""
+        final_response = MagicMock()
+        final_response.stop_reason = "end_turn"
+        final_response.content = [MagicMock(text="Math: A", type="text")]
+        mock_client = MagicMock()
+        mock_anthropic_class.return_value = mock_client
+        mock_client.messages.create.return_value = final_response
+        history = [
+            {"role": "user", "content": "How is she doing in math?"},
+            {"role": "assistant", "content": "Well."},
+        ]
+
+        result = get_ai_response("Show grades", {"student_name": "Test"}, history, "test-key")
+
+        assert result == "Math: A"
+        mock_client.messages.create.assert_called_once()
+
+    def test_skipped_without_database(self, tmp_path):
+        """A missing database is left to Claude instead of being created."""
+        from ai_assistant import _quick_answer
+
+        db_path = tmp_path / "missing.db"
+        with patch("ai_assistant.get_db_path", return_value=str(db_path)):
+            assert _quick_answer("Show grades", {"student_name": "Test"}, []) is None
+
+        assert not db_path.exists()
+
+
+class TestResponseBudget:
+    """Test the output token budget of the tool loop."""
+
+    @patch("ai_assistant.Anthropic")
+    def test_direct_answer_single_call(self, mock_anthropic_class):
+        """A long direct answer is generated once, with the full budget."""
+        from ai_assistant import MAX_RESPONSE_TOKENS
+
+        mock_client = MagicMock()
+        mock_anthropic_class.return_value = mock_client
+        response = MagicMock()
+        response.stop_reason = "end_turn"
+        response.content = [MagicMock(text="Here is a long answer.", type="text")]
+        mock_client.messages.create.return_value = response
+
+        result = get_ai_response(
+            user_message="Explain the grading scale",
+            student_context={"student_name": "Test"},
+            chat_history=[],
+            api_key="test-key",
+        )
+
+        assert result == "Here is a long answer."
+        mock_client.messages.create.assert_called_once()
+        assert mock_client.messages.create.call_args.kwargs["max_tokens"] == MAX_RESPONSE_TOKENS
+
+
+class TestBuildSystemPrompt:
+    """Test the per-student system prompt."""
+
+    def test_prompt_reused_per_student(self):
+        """The prompt is built once per student name."""
+        from ai_assistant import _build_system_prompt
+
+        first = _build_system_prompt("Delilah")
+        other = _build_system_prompt("Sam")
+
+        assert _build_system_prompt("Delilah") is first
+        assert "Student name: Delilah" in first[-1]["text"]
+        assert "Student name: Sam" in other[-1]["text"]
+        # The cached instructions block is shared by every student
+        assert first[0] is other[0]
+
+
+class TestAsyncTools:
+    """Test concurrent tool execution on the async path."""
+
+    async def test_concurrency_capped(self, monkeypatch):
+        """No more than MAX_TOOL_WORKERS tools run at the same time."""
+        import threading
+        import time
+
+        from ai_assistant import _run_tools_async
+
+        monkeypatch.setattr("ai_assistant.MAX_TOOL_WORKERS", 2)
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def fake_execute(tool_name, tool_input, student_name):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return {"n": tool_input["n"]}
+
+        blocks = []
+        for n in range(5):
+            block = MagicMock()
+            block.id = f"tool_{n}"
+            block.name = "get_course_details"
+            block.input = {"n": n}
+            blocks.append(block)
+
+        with patch("ai_assistant.execute_tool", side_effect=fake_execute):
+            results = await _run_tools_async(blocks, "Test", {})
+
+        assert peak == 2
+        assert [json.loads(r["content"])["n"] for r in results] == [0, 1, 2, 3, 4]
+
+
+class TestHistorySummary:
+    """Test folding older chat history into a rolling summary."""
+
+    @staticmethod
+    def _history(count: int) -> list[dict]:
+        return [
+            {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+            for i in range(count)
+        ]
+
+    def test_short_history_left_alone(self):
+        """Nothing is summarized while the history fits the window."""
+        from ai_assistant import compact_history
+
+        history = self._history(10)
+
+        with patch("ai_assistant.summarize_history") as mock_summarize:
+            assert compact_history(history, None, "test-key") is None
+
+        mock_summarize.assert_not_called()
+        assert not any(msg.get("summarized") for msg in history)
+
+    def test_older_messages_folded_into_summary(self):
+        """Messages beyond the kept tail are summarized and flagged."""
+        from ai_assistant import HISTORY_KEEP_MESSAGES, compact_history
+
+        history = self._history(12)
+
+        with patch("ai_assistant.summarize_history", return_value="Math is an A") as mock_sum:
+            summary = compact_history(history, "Earlier notes", "test-key")
+
+        assert summary == "Math is an A"
+        evicted = mock_sum.call_args.args[0]
+        assert evicted == history[: 12 - HISTORY_KEEP_MESSAGES]
+        assert mock_sum.call_args.args[2] == "Earlier notes"
+        assert [bool(msg.get("summarized")) for msg in history] == [True] * 4 + [False] * 8
+
+    def test_long_messages_trigger_summary(self):
+        """A history over the token window is summarized even if it is short."""
+        from ai_assistant import HISTORY_WINDOW_TOKENS, compact_history
+
+        history = self._history(9)
+        history[0]["content"] = "x" * (HISTORY_WINDOW_TOKENS * 4 + 4)
+
+        with patch("ai_assistant.summarize_history", return_value="Long report") as mock_sum:
+            assert compact_history(history, None, "test-key") == "Long report"
+
+        assert mock_sum.call_args.args[0] == history[:1]
+
+    def test_failed_summary_keeps_history(self):
+        """If summarizing fails, messages stay unflagged and the old summary is kept."""
+        from ai_assistant import compact_history
+
+        history = self._history(12)
+
+        with patch("ai_assistant.summarize_history", return_value=None):
+            assert compact_history(history, "Earlier notes", "test-key") == "Earlier notes"
+
+        assert not any(msg.get("summarized") for msg in history)
+
+    @patch("ai_assistant.Anthropic")
+    def test_summary_sent_instead_of_folded_messages(self, mock_anthropic_class):
+        """Flagged messages are omitted and the summary joins the system prompt."""
+        mock_client = MagicMock()
+        mock_anthropic_class.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.stop_reason = "end_turn"
+        mock_response.content = [MagicMock(text="Still an A", type="text")]
+        mock_client.messages.create.return_value = mock_response
+
+        history = self._history(4)
+        history[0]["summarized"] = True
+        history[1]["summarized"] = True
+
+        get_ai_response(
+            user_message="And now?",
+            student_context={"student_name": "Test"},
+            chat_history=history,
+            api_key="test-key",
+            history_summary="Math is an A",
+        )
+
+        kwargs = mock_client.messages.create.call_args.kwargs
+        assert "Math is an A" in kwargs["system"][-1]["text"]
+        sent = [msg["content"] for msg in kwargs["messages"]]
+        assert "message 0" not in str(sent)
+        assert "message 2" in str(sent[0])
+
+
+class TestCapToolOutput:
+    """Test the size cap on tool results sent to the API."""
+
+    def test_large_result_truncated_with_marker(self, monkeypatch):
+        """Results over the cap are cut and say how much was dropped."""
+        from ai_assistant import _run_tools, _serialize_result
+
+        monkeypatch.setattr("ai_assistant.MAX_TOOL_RESULT_CHARS", 50)
+        block = MagicMock()
+        block.id = "tool_1"
+        block.name = "get_missing_assignments"
+        block.input = {}
+        rows = [{"assignment": f"Homework {i}"} for i in range(20)]
+
+        with patch("ai_assistant.execute_tool", return_value=rows):
+            (result,) = _run_tools([block], "Test", {})
+
+        full = _serialize_result(rows)
+        assert result["content"].startswith(full[:50])
+        assert result["content"].endswith(f"[truncated: {len(full) - 50} more characters]")
+
+    def test_small_result_unchanged(self):
+        """Results under the cap are sent as they are."""
+        from ai_assistant import _cap_tool_output
+
+        assert _cap_tool_output('{"grade": "A"}') == '{"grade": "A"}'
+
+
+class TestSharedAsyncClient:
+    """Test passing one AsyncAnthropic client to concurrent requests."""
+
+    @patch("ai_assistant.AsyncAnthropic")
+    async def test_shared_client_used_and_left_open(self, mock_async_class):
+        """A client passed in serves every request and is not closed."""
+        import asyncio
+
+        from ai_assistant import get_ai_response_async
+
+        def text_response(text: str) -> MagicMock:
+            response = MagicMock()
+            response.stop_reason = "end_turn"
+            response.content = [MagicMock(text=text, type="text")]
+            return response
+
+        client = MagicMock()
+        client.messages.create = AsyncMock(
+            side_effect=[text_response("Alice: A"), text_response("Bob: B")]
+        )
+        client.close = AsyncMock()
+
+        answers = await asyncio.gather(
+            *[
+                get_ai_response_async(
+                    user_message="Grades?",
+                    student_context={"student_name": name},
+                    chat_history=[],
+                    client=client,
+                )
+                for name in ("Alice", "Bob")
+            ]
+        )
+
+        assert sorted(answers) == ["Alice: A", "Bob: B"]
+        mock_async_class.assert_not_called()
+        client.close.assert_not_awaited()
+
+
+class TestModelRouting:
+    """Test automatic model selection."""
+
+    def test_routed_models_match_picker(self):
+        """Auto routing sends the same model IDs the sidebar picker offers."""
+        from ai_assistant import AVAILABLE_MODELS, CAPABLE_MODEL, FAST_MODEL
+
+        assert FAST_MODEL in AVAILABLE_MODELS
+        assert CAPABLE_MODEL in AVAILABLE_MODELS
+
+    @pytest.mark.parametrize(
+        "message",
+        ["What are her grades?", "Any missing assignments in Math", "attendance this month"],
+    )
+    def test_simple_lookups_use_fast_model(self, message):
+        """Short data questions are routed to the fast model."""
+        from ai_assistant import AUTO_MODEL, FAST_MODEL, _resolve_model
+
+        assert _resolve_model(AUTO_MODEL, message) == FAST_MODEL
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "Why are her grades dropping?",
+            "Help me draft an email to the math teacher about missing work",
+            "What are her grades? And is anything due?",
+            "Hello there",
+            "grades " * 30,
+        ],
+    )
+    def test_other_messages_use_capable_model(self, message):
+        """Advice, writing, several questions and long messages escalate."""
+        from ai_assistant import AUTO_MODEL, CAPABLE_MODEL, _resolve_model
+
+        assert _resolve_model(AUTO_MODEL, message) == CAPABLE_MODEL
+
+    def test_explicit_model_kept(self):
+        """A specific model choice is never overridden."""
+        from ai_assistant import _resolve_model
+
+        assert _resolve_model("claude-opus-4-5-20250514", "grades?") == "claude-opus-4-5-20250514"
+
+    @patch("ai_assistant.Anthropic")
+    def test_default_routes_per_message(self, mock_anthropic_class):
+        """Without a model, the request goes to the routed model."""
+        from ai_assistant import FAST_MODEL
+
+        mock_client = MagicMock()
+        mock_anthropic_class.return_value = mock_client
+        mock_response = MagicMock()
+        mock_response.stop_reason = "end_turn"
+        mock_response.content = [MagicMock(text="Math: A", type="text")]
+        mock_client.messages.create.return_value = mock_response
+
+        get_ai_response(
+            user_message="What are her grades?",
+            student_context={"student_name": "Test"},
+            chat_history=[],
+            api_key="test-key",
+        )
+
+        assert mock_client.messages.create.call_args.kwargs["model"] == FAST_MODEL
+
+
+class TestSystemBlocks:
+    """Test the system blocks sent with each request."""
+
+    def test_blocks_reused_until_summary_changes(self):
+        """The same blocks are sent while student and summary are unchanged."""
+        from ai_assistant import _build_system_prompt, _system_blocks
+
+        first = _system_blocks("Delilah", "Math is an A")
+
+        assert _system_blocks("Delilah", "Math is an A") is first
+        assert _system_blocks("Delilah", "Math is a B") is not first
+        assert first[:-1] == _build_system_prompt("Delilah")
+        assert _system_blocks("Delilah", None) is _build_system_prompt("Delilah")
+
+
+class TestApiTimeout:
+    """Test handling of stalled API connections."""
+
+    @patch("ai_assistant.time.sleep")
+    @patch("ai_assistant.Anthropic")
+    def test_timeout_retried_then_reported(self, mock_anthropic_class, mock_sleep):
+        """Timeouts are retried and then reported as the service being unavailable."""
+        from anthropic import APITimeoutError
+
+        mock_client = MagicMock()
+        mock_anthropic_class.return_value = mock_client
+        mock_request = Request(method="POST", url="https://api.anthropic.com/v1/messages")
+        mock_client.messages.create.side_effect = APITimeoutError(request=mock_request)
+
+        result = get_ai_response(
+            user_message="Grades?",
+            student_context={"student_name": "Test"},
+            chat_history=[],
+            api_key="test-key",
+        )
+
+        assert mock_client.messages.create.call_count == 4
+        assert result == "Error: Service temporarily unavailable. Please try again in a moment."
+
+
+class TestStudentDataBlock:
+    """Test sending the common tool results in the system prompt."""
+
+    @patch("ai_assistant.Anthropic")
+    def test_data_sent_after_cached_prefix(self, mock_anthropic_class, tmp_path):
+        """The data is an uncached block after the byte-identical cached prefix."""
+        from ai_assistant import _SYSTEM_BLOCK, _TOOL_DISPATCH, PREFETCH_TOOLS
+
+        db_file = tmp_path / "student.db"
+        db_file.write_text("")
+        tools = {name: MagicMock(return_value={"tool": name}) for name in PREFETCH_TOOLS}
+        final_response = MagicMock()
+        final_response.stop_reason = "end_turn"
+        final_response.content = [MagicMock(text="Math: A", type="text")]
+        mock_client = MagicMock()
+        mock_anthropic_class.return_value = mock_client
+        mock_client.messages.create.return_value = final_response
+
+        with (
+            patch("ai_assistant.get_db_path", return_value=str(db_file)),
+            patch.dict(_TOOL_DISPATCH, tools),
+        ):
+            result = get_ai_response(
+                user_message="Why did her grades change?",
+                student_context={"student_name": "Test"},
+                chat_history=[],
+                api_key="test-key",
+            )
+
+        assert result == "Math: A"
+        mock_client.messages.create.assert_called_once()
+        system = mock_client.messages.create.call_args.kwargs["system"]
+        assert system[0] is _SYSTEM_BLOCK
+        assert "cache_control" not in system[-1]
+        data = json.loads(system[-1]["text"].split("\n", 1)[1])
+        assert data == {name: {"tool": name} for name in PREFETCH_TOOLS}
+
+    def test_no_data_without_database(self):
+        """Nothing is queried when the database file is missing."""
+        from ai_assistant import _SYSTEM_BLOCK, _with_student_data
+
+        with patch("ai_assistant.execute_tool") as mock_execute:
+            assert _with_student_data([_SYSTEM_BLOCK], "Test", None) == [_SYSTEM_BLOCK]
+
+        mock_execute.assert_not_called()
+
+    def test_query_failure_leaves_prompt_unchanged(self):
+        """A failing query leaves the data out; Claude can still call the tools."""
+        import sqlite3
+
+        from ai_assistant import _SYSTEM_BLOCK, _with_student_data
+
+        with patch("ai_assistant.execute_tool", side_effect=sqlite3.OperationalError("locked")):
+            assert _with_student_data([_SYSTEM_BLOCK], "Test", 1.0) == [_SYSTEM_BLOCK]
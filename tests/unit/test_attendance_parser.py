@@ -251,6 +251,22 @@ class TestAttendancePatternDetection:
         assert "longest_absence_streak" in patterns
         assert patterns["longest_absence_streak"] == 3
 
+    def test_detect_absence_streaks_unsorted_input(self):
+        """Streaks are detected in date order even when records are unsorted."""
+        from src.scraper.parsers.attendance import detect_attendance_patterns
+
+        records = [
+            {"date": "2024-12-05", "status": "Absent", "code": "A"},
+            {"date": "2024-12-02", "status": "Present", "code": "."},
+            {"date": "2024-12-04", "status": "Absent", "code": "A"},
+            {"date": "2024-12-06", "status": "Present", "code": "."},
+            {"date": "2024-12-03", "status": "Absent", "code": "A"},
+        ]
+
+        patterns = detect_attendance_patterns(records)
+
+        assert patterns["longest_absence_streak"] == 3
+
     def test_pattern_summary_fields(self):
         """Pattern detection returns expected summary fields."""
         from src.scraper.parsers.attendance import detect_attendance_patterns
@@ -283,6 +299,31 @@ class TestAttendancePatternDetection:
         assert patterns["attendance_rate"] == 100.0
 
 
+class TestPatternDisplay:
+    """Tests for formatting attendance patterns."""
+
+    def test_format_patterns_orders_concerning_days_by_rate(self):
+        """Concerning days are listed highest absence rate first."""
+        from src.scraper.parsers.attendance import (
+            detect_attendance_patterns,
+            format_patterns_for_display,
+        )
+
+        records = [
+            {"date": "2024-12-02", "status": "Absent", "code": "A"},  # Monday
+            {"date": "2024-12-09", "status": "Present", "code": "."},  # Monday
+            {"date": "2024-12-04", "status": "Absent", "code": "A"},  # Wednesday
+            {"date": "2024-12-11", "status": "Absent", "code": "A"},  # Wednesday
+        ]
+
+        text = format_patterns_for_display(detect_attendance_patterns(records))
+
+        assert text.startswith("## Attendance Statistics")
+        assert "- Days Absent: 3" in text
+        assert text.index("**Wednesday**: 2/2 (100%)") < text.index("**Monday**: 1/2 (50%)")
+        assert text.endswith("\n")
+
+
 class TestNormalizationFunctions:
     """Tests for attendance status normalization."""
 
@@ -350,6 +391,26 @@ class TestDateParsing:
         result = parse_attendance_date("12/15/24")
         assert result == "2024-12-15"
 
+    def test_parse_date_eu_format(self):
+        """Falls back to EU format (DD/MM/YYYY) when month is out of range."""
+        from src.scraper.parsers.attendance import parse_attendance_date
+
+        assert parse_attendance_date("15/12/2024") == "2024-12-15"
+
+    def test_parse_date_month_name_formats(self):
+        """Parses full and abbreviated month names."""
+        from src.scraper.parsers.attendance import parse_attendance_date
+
+        assert parse_attendance_date("December 15, 2024") == "2024-12-15"
+        assert parse_attendance_date("Dec 15, 2024") == "2024-12-15"
+
+    def test_parse_date_rejects_impossible_dates(self):
+        """Rejects dates that do not exist on the calendar."""
+        from src.scraper.parsers.attendance import parse_attendance_date
+
+        assert parse_attendance_date("02/30/2024") is None
+        assert parse_attendance_date("2024-13-01") is None
+
     def test_parse_date_invalid(self):
         """Returns None for invalid dates."""
         from src.scraper.parsers.attendance import parse_attendance_date
@@ -357,3 +418,25 @@ class TestDateParsing:
         assert parse_attendance_date("not-a-date") is None
         assert parse_attendance_date("") is None
         assert parse_attendance_date(None) is None
+
+
+class TestParseMany:
+    """Tests for batch parsing of attendance pages."""
+
+    def test_parse_many_preserves_order(self):
+        """Results are returned in input order."""
+        from src.scraper.parsers.attendance import parse_many
+
+        htmls = [SAMPLE_ATTENDANCE_GRID_HTML, "", SAMPLE_DAILY_LIST_HTML]
+        results = parse_many(htmls, workers=2)
+
+        assert len(results) == 3
+        assert len(results[0]) == 10
+        assert results[1] == []
+        assert len(results[2]) == 3
+
+    def test_parse_many_empty_input(self):
+        """Empty input returns empty list."""
+        from src.scraper.parsers.attendance import parse_many
+
+        assert parse_many([]) == []
@@ -454,6 +454,16 @@ class TestStandardsParsing:
         assert len(standards) == 1
         assert standards[0] == "6.NS.1"
 
+    def test_parse_standards_skips_blank_entries(self):
+        """Parser drops empty entries and surrounding whitespace."""
+        try:
+            from src.scraper.parsers.course_scores import parse_standards
+        except ImportError:
+            pytest.skip("Parser not implemented")
+
+        standards = parse_standards(" 6.NS.1 ,, ,6.EE 2,  ")
+        assert standards == ["6.NS.1", "6.EE 2"]
+
 
 class TestPercentParsing:
     """Focused tests for percent extraction."""
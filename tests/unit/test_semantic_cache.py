@@ -0,0 +1,152 @@
+"""Tests for the persistent semantic answer cache."""
+
+import sqlite3
+from contextlib import closing
+from unittest.mock import patch
+
+import pytest
+from semantic_cache import SemanticCache, normalize_query
+
+pytestmark = pytest.mark.unit
+
+
+class TestNormalizeQuery:
+    """Test question normalization."""
+
+    def test_rewordings_normalize_equal(self):
+        """Case, punctuation, filler words, order and plurals are ignored."""
+        assert normalize_query("What are her grades?") == normalize_query("show grade")
+        assert normalize_query("Missing assignments") == normalize_query(
+            "any missing assignment, please"
+        )
+
+    def test_student_references_ignored(self):
+        """Words that only refer to the student do not change the key."""
+        assert normalize_query("What are my son's grades?") == normalize_query("grades")
+        assert normalize_query("missing work for my daughter") == normalize_query("missing work")
+
+    def test_meaningful_words_kept(self):
+        """Words that change the answer produce different keys."""
+        assert normalize_query("math grades") != normalize_query("science grades")
+        assert normalize_query("late assignments") != normalize_query("missing assignments")
+        assert normalize_query("is she not missing work") != normalize_query("is she missing work")
+
+    def test_letter_grades_kept(self):
+        """Single letters and articles are kept, since "A" may be a grade."""
+        assert normalize_query("Which classes does she have an A in?") != normalize_query(
+            "Which classes is she in?"
+        )
+
+    def test_word_order_kept(self):
+        """Questions with the same words in a different order are different."""
+        assert normalize_query("Is math better than science?") != normalize_query(
+            "Is science better than math?"
+        )
+
+    def test_tense_and_obligation_kept(self):
+        """Past tense and "have to" change what is being asked."""
+        assert normalize_query("Did she turn in the essay?") != normalize_query(
+            "Does she have to turn in the essay?"
+        )
+
+    def test_only_filler_words(self):
+        """A question with no content words normalizes to an empty string."""
+        assert normalize_query("Can you tell me?") == ""
+
+
+class TestSemanticCache:
+    """Test storing and retrieving answers."""
+
+    def test_reworded_question_hits(self, tmp_path):
+        """An equivalent question returns the stored answer."""
+        cache = SemanticCache(tmp_path / "cache.db")
+        cache.put("model", "Test", "What are her grades?", 1.0, "Math: A")
+
+        assert cache.get("model", "Test", "show grades", 1.0) == "Math: A"
+
+    def test_student_name_ignored(self, tmp_path):
+        """Naming the student matches the same question without the name."""
+        cache = SemanticCache(tmp_path / "cache.db")
+        cache.put("model", "Ava Lee", "What are Ava's grades?", 1.0, "Math: A")
+
+        assert cache.get("model", "Ava Lee", "grades", 1.0) == "Math: A"
+        assert cache.get("model", "Ava Lee", "How is Ava Lee doing?", 1.0) is None
+        cache.put("model", "Ava Lee", "How is Ava Lee doing?", 1.0, "Well")
+        assert cache.get("model", "Ava Lee", "How is she doing?", 1.0) == "Well"
+
+    def test_name_word_kept_as_content(self, tmp_path):
+        """A name part that is also a course name still counts when not possessive."""
+        cache = SemanticCache(tmp_path / "cache.db")
+        cache.put("model", "Art Lee", "Grade?", 1.0, "Math: A, Art: B")
+
+        assert cache.get("model", "Art Lee", "Art grade?", 1.0) is None
+        cache.put("model", "Art Lee", "How is she doing in class?", 1.0, "Well")
+        assert cache.get("model", "Art Lee", "How is she doing in art class?", 1.0) is None
+        assert cache.get("model", "Art Lee", "What is Art's grade?", 1.0) == "Math: A, Art: B"
+
+    def test_persists_across_instances(self, tmp_path):
+        """Answers survive a new cache object (app restart)."""
+        SemanticCache(tmp_path / "cache.db").put("model", "Test", "grades", 1.0, "Math: A")
+
+        assert SemanticCache(tmp_path / "cache.db").get("model", "Test", "grades", 1.0) == (
+            "Math: A"
+        )
+
+    def test_scoped_by_student_and_model(self, tmp_path):
+        """Answers are not shared between students or models."""
+        cache = SemanticCache(tmp_path / "cache.db")
+        cache.put("model", "Test", "grades", 1.0, "Math: A")
+
+        assert cache.get("model", "Other", "grades", 1.0) is None
+        assert cache.get("other-model", "Test", "grades", 1.0) is None
+
+    def test_database_change_invalidates(self, tmp_path):
+        """A different database mtime means the answer may be stale."""
+        cache = SemanticCache(tmp_path / "cache.db")
+        cache.put("model", "Test", "grades", 1.0, "Math: A")
+
+        assert cache.get("model", "Test", "grades", 2.0) is None
+
+    def test_day_change_invalidates(self, tmp_path):
+        """Answers are not reused on the next (UTC) day."""
+        cache = SemanticCache(tmp_path / "cache.db")
+        with patch("semantic_cache.time.strftime", side_effect=["2026-01-01", "2026-01-02"]):
+            cache.put("model", "Test", "due tomorrow", 1.0, "Essay")
+
+            assert cache.get("model", "Test", "due tomorrow", 1.0) is None
+
+    def test_expired_entry_ignored(self, tmp_path):
+        """Entries older than the TTL are not served."""
+        cache = SemanticCache(tmp_path / "cache.db", ttl=-1)
+        cache.put("model", "Test", "grades", 1.0, "Math: A")
+
+        assert cache.get("model", "Test", "grades", 1.0) is None
+
+    def test_expired_rows_deleted_on_put(self, tmp_path):
+        """Writing an answer removes expired ones from the file."""
+        cache = SemanticCache(tmp_path / "cache.db", ttl=60)
+        with patch("semantic_cache.time.time", return_value=1000.0):
+            cache.put("model", "Test", "grades", 1.0, "Math: A")
+        with patch("semantic_cache.time.time", return_value=2000.0):
+            cache.put("model", "Test", "attendance", 1.0, "95%")
+
+        with closing(sqlite3.connect(tmp_path / "cache.db")) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM semantic_cache").fetchone() == (1,)
+
+    def test_clear(self, tmp_path):
+        """clear() removes all answers."""
+        cache = SemanticCache(tmp_path / "cache.db")
+        cache.put("model", "Test", "grades", 1.0, "Math: A")
+        cache.clear()
+
+        assert cache.get("model", "Test", "grades", 1.0) is None
+
+    def test_storage_errors_are_misses(self, tmp_path):
+        """An unusable cache file degrades to cache misses."""
+        cache = SemanticCache(tmp_path / "missing-dir" / "cache.db")
+
+        cache.put("model", "Test", "grades", 1.0, "Math: A")
+        assert cache.get("model", "Test", "grades", 1.0) is None
+        # Nothing was created
+        with pytest.raises(sqlite3.OperationalError):
+            sqlite3.connect(f"file:{tmp_path / 'missing-dir' / 'cache.db'}?mode=ro", uri=True)
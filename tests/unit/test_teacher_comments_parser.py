@@ -333,3 +333,28 @@ class TestTeacherCommentsDataStructure:
                 assert value is None or isinstance(value, str), (
                     f"Field {key} should be str or None, got {type(value)}"
                 )
+
+
+class TestTeacherCommentsPage:
+    """Tests for single-parse extraction of name and comments."""
+
+    def test_parse_page_matches_separate_parsers(self, sample_comments_html: str):
+        """Combined parse returns the same data as the individual parsers."""
+        from src.scraper.parsers.teacher_comments import (
+            get_student_name_from_html,
+            parse_teacher_comments,
+            parse_teacher_comments_page,
+        )
+
+        result = parse_teacher_comments_page(sample_comments_html, comments_only=True)
+
+        assert result["student_name"] == get_student_name_from_html(sample_comments_html)
+        assert result["comments"] == parse_teacher_comments(
+            sample_comments_html, comments_only=True
+        )
+
+    def test_parse_page_empty_html(self):
+        """Empty HTML yields no name and no comments."""
+        from src.scraper.parsers.teacher_comments import parse_teacher_comments_page
+
+        assert parse_teacher_comments_page("") == {"student_name": None, "comments": []}